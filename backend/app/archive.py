@@ -0,0 +1,118 @@
+import argparse
+import asyncio
+import json
+from app.core.config import settings
+from app.services.sessions import current_session
+
+# Session rollover: moves closed sessions' payments and results into the
+# archive tables (migrations/0011_session_archive.sql), keeping the hot tables
+# down to the sessions still in use:
+#
+#   python -m app.archive --status              # rows per session, hot and archived
+#   python -m app.archive --closed              # archive every session before the current one
+#   python -m app.archive 2023/2024 2024/2025   # archive the named sessions
+#   python -m app.archive --closed --dry-run    # only show what would move
+#   python -m app.archive --restore 2024/2025   # move a session back
+#
+# A session with pending payments is skipped until they are reviewed. Each
+# session moves in its own transaction, and the tables are vacuumed once at
+# the end; the API picks up the change within ARCHIVED_SESSIONS_TTL seconds.
+
+STATUS_SQL = """
+select session,
+       sum(payments) filter (where not archived) as payments,
+       sum(payments) filter (where archived) as archived_payments,
+       sum(results) filter (where not archived) as results,
+       sum(results) filter (where archived) as archived_results,
+       sum(pending) as pending
+from (
+    select session, count(*) as payments, 0 as results, count(*) filter (where status = 'pending') as pending,
+           false as archived
+    from course_payments group by session
+    union all
+    select session, count(*), 0, 0, true from course_payments_archive group by session
+    union all
+    select session, 0, count(*), 0, false from results group by session
+    union all
+    select session, 0, count(*), 0, true from results_archive group by session
+) s
+where session is not null
+group by session
+order by session
+"""
+
+
+async def status(conn) -> list:
+    rows = await conn.fetch(STATUS_SQL)
+    print(f"{'session':<12}{'payments':>10}{'archived':>10}{'results':>10}{'archived':>10}{'pending':>9}")
+    for r in rows:
+        print(
+            f"{r['session']:<12}{r['payments'] or 0:>10}{r['archived_payments'] or 0:>10}"
+            f"{r['results'] or 0:>10}{r['archived_results'] or 0:>10}{r['pending'] or 0:>9}"
+        )
+    return rows
+
+
+async def archive(dsn: str, sessions: list, closed: bool = False, dry_run: bool = False,
+                  restore: bool = False, status_only: bool = False):
+    import asyncpg
+
+    conn = await asyncpg.connect(dsn)
+    try:
+        rows = await status(conn)
+        if status_only:
+            return
+
+        current = current_session()
+        moved = False
+        if closed:
+            sessions = [
+                r["session"] for r in rows
+                if r["session"] < current and (r["payments"] or r["results"])
+            ]
+        for session in sessions:
+            if session == current and not restore:
+                print(f"skipped  {session} (current session)")
+                continue
+            if dry_run:
+                print(f"would {'restore' if restore else 'archive'} {session}")
+                continue
+            function = "restore_session" if restore else "archive_session"
+            outcome = json.loads(await conn.fetchval(f"select {function}($1)", session))
+            if outcome["status"] == "pending_payments":
+                print(f"skipped  {session} ({outcome['pending']} pending payments)")
+            else:
+                moved = moved or bool(outcome["payments"] or outcome["results"])
+                print(f"{outcome['status']:<8} {session}: {outcome['payments']} payments, {outcome['results']} results")
+
+        if moved:
+            # Reclaim the moved rows now rather than waiting for autovacuum:
+            # until the visibility map is rebuilt, counts over the hot tables
+            # cannot use index-only scans
+            await conn.execute("vacuum (analyze) course_payments, results, course_payments_archive, results_archive")
+            print("vacuumed")
+    finally:
+        await conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive closed academic sessions")
+    parser.add_argument("sessions", nargs="*", help="Sessions to archive, e.g. 2024/2025")
+    parser.add_argument("--dsn", default=settings.database_url, help="Postgres URL (defaults to DATABASE_URL)")
+    parser.add_argument("--status", action="store_true", help="Only list rows per session")
+    parser.add_argument("--closed", action="store_true", help="Archive every session before the current one")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would move without moving it")
+    parser.add_argument("--restore", action="store_true", help="Move the named sessions back out of the archive")
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("DATABASE_URL is not set; pass --dsn")
+    if not args.status and not args.sessions and not args.closed:
+        parser.error("name the sessions to archive, or pass --closed or --status")
+    if args.restore and args.closed:
+        parser.error("--restore needs explicit sessions")
+
+    asyncio.run(archive(args.dsn, args.sessions, args.closed, args.dry_run, args.restore, args.status))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+
+# Orphaned-file garbage collection against a fake storage backend
+# (app/services/asset_gc.py):
+#
+#   python -m app.check_asset_gc
+#   python -m app.check_asset_gc --orphans 5000
+#
+# Fills a scratch local storage directory (the local backend stands in for
+# Cloudinary) and serves the referencing tables from a local stand-in for
+# PostgREST. The files cover every case the collector tells apart: live,
+# archived and shared receipts, receipts rejected long ago and recently,
+# never-finalized uploads, deleted materials, replaced profile pictures,
+# fresh uploads and files outside the GC folders. Fails when the dry run
+# deletes anything or miscounts, when the real run removes a referenced file,
+# misses an orphan or sends a delete batch early, or when a second run still
+# finds orphans. Needs no database.
+
+DEFAULT_ORPHANS = 1_200
+DELETE_INTERVAL_SECONDS = 0.1
+
+RECEIPTS = "wmou_portal/payment_receipts"
+MATERIALS = "wmou_portal/course_materials"
+PICTURES = "wmou/profile_pictures"
+
+TABLES: Dict[str, List[dict]] = {}
+
+
+class StandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        table = url.path.rsplit("/", 1)[-1]
+        selected = [name.strip() for name in query.get("select", [""])[0].split(",") if name.strip()]
+        after = int(query["id"][0].partition(".")[2]) if "id" in query else 0
+        limit = int(query.get("limit", ["1000"])[0])
+        rows = [
+            {name: row.get(name) for name in selected}
+            for row in TABLES.get(table, []) if row["id"] > after
+        ][:limit]
+
+        data = json.dumps(rows).encode()
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_stand_in() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def days_ago(days: float) -> str:
+    return (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+
+
+def build(root: str, files_url: str, orphans: int):
+    """Write the scratch files and tables; returns (kept public ids, orphan public ids)"""
+    old = time.time() - 3 * 86400
+
+    def put(public_id: str, extension: str, mtime: float = old) -> str:
+        path = os.path.join(root, f"{public_id}.{extension}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as out:
+            out.write(b"x" * 1000)
+        os.utime(path, (mtime, mtime))
+        return f"{files_url}/{public_id}.{extension}"
+
+    kept = [f"{RECEIPTS}/live", f"{RECEIPTS}/archived", f"{RECEIPTS}/shared", f"{RECEIPTS}/rejected_recently",
+            f"{RECEIPTS}/fresh_upload", f"{MATERIALS}/kept", f"{PICTURES}/current", "other_app/unrelated"]
+    doomed = [f"{RECEIPTS}/rejected_long_ago", f"{RECEIPTS}/never_finalized", f"{PICTURES}/replaced"]
+    doomed += [f"{MATERIALS}/deleted{i:05d}" for i in range(orphans - len(doomed))]
+
+    urls = {public_id: put(public_id, "pdf") for public_id in kept + doomed if public_id != f"{RECEIPTS}/fresh_upload"}
+    put(f"{RECEIPTS}/fresh_upload", "jpg", time.time())
+
+    TABLES["course_payments"] = [
+        {"id": 1, "receipt_url": urls[f"{RECEIPTS}/live"], "status": "pending", "reviewed_at": None},
+        # One checkout: rejected long ago for one course, approved for another
+        {"id": 2, "receipt_url": urls[f"{RECEIPTS}/shared"], "status": "rejected", "reviewed_at": days_ago(200)},
+        {"id": 3, "receipt_url": urls[f"{RECEIPTS}/shared"], "status": "approved", "reviewed_at": days_ago(200)},
+        {"id": 4, "receipt_url": urls[f"{RECEIPTS}/rejected_long_ago"], "status": "rejected",
+         "reviewed_at": days_ago(200)},
+        {"id": 5, "receipt_url": urls[f"{RECEIPTS}/rejected_recently"], "status": "rejected",
+         "reviewed_at": days_ago(1)},
+        {"id": 6, "receipt_url": "https://res.cloudinary.com/c/image/upload/v1/legacy.jpg", "status": "approved",
+         "reviewed_at": days_ago(3)},
+    ]
+    TABLES["course_payments_archive"] = [
+        {"id": 7, "receipt_url": urls[f"{RECEIPTS}/archived"], "status": "approved", "reviewed_at": days_ago(400)},
+    ]
+    TABLES["course_materials"] = [{"id": 1, "file_url": urls[f"{MATERIALS}/kept"]}]
+    TABLES["users"] = [{"id": 1, "profile_picture_url": urls[f"{PICTURES}/current"]}]
+    return kept, doomed
+
+
+def stored(root: str) -> set:
+    return {
+        os.path.splitext(os.path.relpath(os.path.join(folder, name), root))[0].replace(os.sep, "/")
+        for folder, _, names in os.walk(root) for name in names
+    }
+
+
+def run(orphans: int) -> int:
+    server = start_stand_in()
+    root = tempfile.mkdtemp(prefix="check_asset_gc_")
+    os.environ.update(
+        SUPABASE_URL=f"http://127.0.0.1:{server.server_port}",
+        SUPABASE_READ_URL="",
+        HTTP2_ENABLED="false",
+        STORAGE_BACKEND="local",
+        LOCAL_STORAGE_DIR=root,
+        PUBLIC_BASE_URL="http://testserver",
+        GC_DELETE_INTERVAL_SECONDS=str(DELETE_INTERVAL_SECONDS),
+    )
+    os.environ.setdefault("SUPABASE_KEY", "check-asset-gc")
+    os.environ.setdefault("SECRET_KEY", "check-asset-gc")
+
+    from app.core.storage import DELETE_BATCH_SIZE, LIST_PAGE_SIZE, get_storage
+    from app.services import asset_gc
+
+    kept, doomed = build(root, get_storage().files_url, orphans)
+    failures = 0
+
+    def report(ok: bool, scenario: str, detail: str):
+        nonlocal failures
+        failures += not ok
+        print(f"{'ok' if ok else 'FAIL':<6}{scenario}: {detail}")
+
+    try:
+        before = stored(root)
+        dry = asset_gc.collect(dry_run=True)
+        report(
+            dry["orphans"] == len(doomed) and dry["recent_skipped"] == 1 and dry["deleted"] == 0
+            and stored(root) == before,
+            "dry run",
+            f"{dry['scanned']} scanned ({LIST_PAGE_SIZE} per listing page), {dry['orphans']} orphans "
+            f"({dry['orphan_bytes']} bytes), {dry['recent_skipped']} too young, {dry['deleted']} deleted",
+        )
+
+        progress = []
+        real = asset_gc.collect(dry_run=False, report=lambda summary: progress.append((time.monotonic(), summary["deleted"])))
+        batches = [(at, done - previous) for (_, previous), (at, done) in zip(progress, progress[1:])]
+        gaps = [later - earlier for (earlier, _), (later, _) in zip(batches, batches[1:])]
+        left = stored(root)
+        report(
+            real["deleted"] == len(doomed) and not left & set(doomed) and set(kept) <= left,
+            "real run",
+            f"{real['deleted']} deleted, {len(set(kept) - left)} referenced files removed, "
+            f"{len(left & set(doomed))} orphans left",
+        )
+        report(
+            all(size <= DELETE_BATCH_SIZE for _, size in batches) and all(gap >= DELETE_INTERVAL_SECONDS * 0.9 for gap in gaps),
+            "delete batches",
+            f"{len(batches)} batches of at most {max((size for _, size in batches), default=0)}, "
+            f"shortest gap {min(gaps, default=0):.2f} s (interval {DELETE_INTERVAL_SECONDS} s)",
+        )
+
+        again = asset_gc.collect(dry_run=True)
+        report(again["orphans"] == 0, "second run", f"{again['orphans']} orphans")
+    finally:
+        server.shutdown()
+        shutil.rmtree(root, ignore_errors=True)
+
+    print(f"\n{failures} checks failed" if failures else "\nOrphans collected, references kept")
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the storage garbage collector against a fake storage backend")
+    parser.add_argument("--orphans", type=int, default=DEFAULT_ORPHANS, help="Orphaned files to create")
+    args = parser.parse_args()
+
+    sys.exit(run(args.orphans))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Cold-start guard for serverless deployments (api/index.py imports app.main
+# on every cold start):
+#
+#   python -m app.check_import_time
+#   python -m app.check_import_time --budget 1.0 --runs 5
+#
+# Imports app.main in fresh interpreters under `python -X importtime` and
+# fails when the median cumulative import time is over the budget, or when
+# a module that should only load on the routes needing it (Excel parsing,
+# Cloudinary, PDF rendering, the archive/plan-check database driver) is
+# imported at startup. Prints the slowest top-level imports either way.
+
+DEFAULT_BUDGET_SECONDS = 1.0
+DEFAULT_RUNS = 3
+HEAVY_MODULES = (
+    "pandas", "numpy", "openpyxl", "cloudinary", "reportlab", "sqlalchemy", "asyncpg", "supabase", "requests",
+)
+SLOWEST_SHOWN = 8
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse(stderr: str) -> Tuple[Dict[str, int], List[Tuple[str, int]]]:
+    """Cumulative microseconds per module, plus the modules app.main imports directly"""
+    cumulative: Dict[str, int] = {}
+    direct: List[Tuple[str, int]] = []
+    children: List[Tuple[str, int]] = []
+    # importtime prints a module after its imports, indented two spaces per level
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        module = name.strip()
+        cumulative[module] = int(cumulative_us)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            children.append((module, int(cumulative_us)))
+        elif depth == 0:
+            if module == "app.main":
+                direct = children
+            children = []
+    return cumulative, direct
+
+
+def measure() -> Tuple[Dict[str, int], List[Tuple[str, int]]]:
+    env = dict(os.environ)
+    # Settings only need to validate; nothing connects at import time
+    env.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+    env.setdefault("SUPABASE_KEY", "check-import-time")
+    env.setdefault("SECRET_KEY", "check-import-time")
+    env["PYTHONPATH"] = BACKEND_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        sys.stderr.write(completed.stderr[-2000:])
+        raise SystemExit("importing app.main failed")
+    return parse(completed.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if importing app.main is slow or loads heavy modules")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_SECONDS,
+                        help="Maximum median cumulative import time of app.main, in seconds")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="Fresh interpreters to measure")
+    args = parser.parse_args()
+
+    timings = []
+    loaded = set()
+    direct: List[Tuple[str, int]] = []
+    for _ in range(args.runs):
+        cumulative, direct = measure()
+        timings.append(cumulative["app.main"] / 1e6)
+        loaded |= {module.split(".")[0] for module in cumulative}
+
+    failures = 0
+    median = statistics.median(timings)
+    over = median > args.budget
+    failures += over
+    print(f"{'FAIL' if over else 'ok':<6}import app.main: median {median:.3f} s over {args.runs} runs "
+          f"(budget {args.budget:.2f} s; {', '.join(f'{t:.3f}' for t in timings)})")
+
+    heavy = sorted(loaded.intersection(HEAVY_MODULES))
+    failures += bool(heavy)
+    print(f"{'FAIL' if heavy else 'ok':<6}heavy modules at startup: {', '.join(heavy) or 'none'}")
+
+    print("\nslowest imports by app.main (last run):")
+    for module, us in sorted(direct, key=lambda item: item[1], reverse=True)[:SLOWEST_SHOWN]:
+        print(f"  {us / 1000:8.1f} ms  {module}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import argparse
+import ast
+import os
+import sys
+from typing import List, Tuple
+
+# Fails when a query selects unbounded columns again (app/core/projections.py):
+#
+#   python -m app.check_projections
+#
+# Scans every module under app/ for PostgREST `.select(...)` calls and flags
+# a literal or f-string containing "*" and a bare `.select()` (which PostgREST
+# treats as "*"). Selects built from names (projection constants) are checked
+# where they are defined, by columns(). It also asserts that the projection
+# read on every authenticated request never includes the password hash.
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+Finding = Tuple[str, int, str]
+
+
+def _literal_text(node: ast.AST) -> str:
+    """The constant text of a string literal or f-string ("" for anything else)"""
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.JoinedStr):
+        return "".join(part.value for part in node.values if isinstance(part, ast.Constant))
+    return ""
+
+
+def scan_file(path: str) -> List[Finding]:
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    findings = []
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "select"):
+            continue
+        if not node.args and not node.keywords:
+            findings.append((path, node.lineno, "select() without columns selects every column"))
+        for arg in node.args:
+            if "*" in _literal_text(arg):
+                findings.append((path, node.lineno, f"unbounded select {_literal_text(arg)!r}"))
+    return findings
+
+
+def scan(root: str) -> List[Finding]:
+    findings = []
+    for directory, _, files in os.walk(root):
+        for name in sorted(files):
+            if name.endswith(".py"):
+                findings.extend(scan_file(os.path.join(directory, name)))
+    return findings
+
+
+def check_current_user() -> List[Finding]:
+    from app.core import projections
+
+    selected = {name.strip() for name in projections.CURRENT_USER.split(",")}
+    if "password" in selected:
+        return [(projections.__file__, 0, "CURRENT_USER (every authenticated request) selects the password hash")]
+    return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if a query selects unbounded columns")
+    parser.add_argument("--root", default=APP_DIR, help="Directory to scan (defaults to the app package)")
+    args = parser.parse_args()
+
+    findings = scan(args.root) + check_current_user()
+    for path, line, message in findings:
+        print(f"FAIL  {os.path.relpath(path)}:{line}: {message}")
+    print(f"\n{len(findings)} unbounded selects" if findings else "All selects name their columns")
+    sys.exit(1 if findings else 0)
+
+
+if __name__ == "__main__":
+    main()
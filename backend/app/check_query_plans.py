@@ -0,0 +1,316 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import List, NamedTuple
+from app.core.config import settings
+
+# EXPLAINs the SQL behind each endpoint's hot queries and fails when one of
+# them sequentially scans a large table, i.e. when an index from
+# migrations/0005_query_indexes.sql (or a later migration) is missing or no
+# longer usable:
+#
+#   python -m app.check_query_plans --seed
+#
+# --seed fills the tables with synthetic rows first so the planner has
+# realistic statistics. Seeding, ANALYZE and the EXPLAINs all run in one
+# transaction that is rolled back, so the database is left as it was.
+#
+# Admin search (migrations/0004_search.sql) is checked as well: the pg_trgm
+# indexes must serve its matches, and each search function is timed over
+# SEARCH_RUNS calls per query, failing when the p95 is over SEARCH_P95_MS.
+
+# Tables smaller than this may be seq-scanned; for them it is the cheaper plan
+DEFAULT_MIN_ROWS = 10_000
+SEARCH_RUNS = 50
+SEARCH_P95_MS = 50.0
+
+
+class Check(NamedTuple):
+    endpoint: str
+    sql: str
+    params: tuple
+
+
+SEED_SQL = """
+insert into users (reg_no, email, full_name, department, role, status, password, created_at)
+select 'SEED' || lpad(i::text, 7, '0'),
+       'seed' || i || '@example.edu',
+       'Seed Student ' || i,
+       (array['Computer Science', 'Accounting', 'Nursing', 'Economics', 'Law'])[1 + i % 5],
+       case when i % 1000 = 0 then 'admin' else 'student' end,
+       (array['active', 'active', 'active', 'suspended', 'graduated'])[1 + i % 5],
+       'x',
+       now() - (i % 1500) * interval '1 day'
+from generate_series(1, $1::int) i;
+
+insert into courses (course_code, title, department, session, semester, fee)
+select 'SEED' || i,
+       'Seed Course ' || i,
+       (array['Computer Science', 'Accounting', 'Nursing', 'Economics', 'Law'])[1 + i % 5],
+       (array['2023/2024', '2024/2025'])[1 + i % 2],
+       (array['First Semester', 'Second Semester'])[1 + (i / 2) % 2],
+       15000
+from generate_series(1, 200) i;
+
+create temporary table seed_pairs on commit drop as
+select u.id as student_id, c.ids[1 + (u.n * 7 + k * 13) % array_length(c.ids, 1)] as course_id, u.n, k
+from (select id, row_number() over (order by id) as n from users where reg_no like 'SEED%') u,
+     (select array_agg(id order by id) as ids from courses where course_code like 'SEED%') c,
+     generate_series(1, 4) k;
+
+insert into course_registrations (student_id, course_id, registered_at)
+select student_id, course_id, now() - ((n + k) % 400) * interval '1 day' from seed_pairs where k <= 3;
+
+insert into course_payments (student_id, course_id, amount_paid, status, created_at, reviewed_at)
+select student_id, course_id, 15000, status, created_at,
+       case when status <> 'pending' then created_at + interval '2 days' end
+from (
+    select student_id, course_id,
+           case when (n + k) % 10 = 0 then 'pending' when (n + k) % 17 = 0 then 'rejected' else 'approved' end as status,
+           now() - ((n + k) % 400) * interval '1 day' as created_at
+    from seed_pairs
+) p;
+
+insert into results (student_id, course_id, session, semester, score, grade)
+select student_id, course_id, '2024/2025', 'First Semester', 40 + (n + k) % 60, 'B'
+from seed_pairs where k <= 3;
+
+insert into announcements (title, content, target_department, created_at)
+select 'Seed announcement ' || i, 'Body',
+       case when i % 4 = 0 then null else (array['Computer Science', 'Accounting', 'Nursing', 'Economics', 'Law'])[1 + i % 5] end,
+       now() - i * interval '1 hour'
+from generate_series(1, 20000) i;
+"""
+
+CHECKED_TABLES = (
+    "users", "courses", "course_registrations", "course_payments",
+    "course_materials", "results", "announcements", "jobs",
+)
+
+
+def checks(student_id, course_id, department, reg_no) -> List[Check]:
+    return [
+        Check("POST /api/auth/login", "select id, password from users where reg_no = $1", (reg_no,)),
+        Check("get_current_user", "select id, reg_no, role from users where id = $1", (student_id,)),
+        Check(
+            "GET /api/admin/users?role=",
+            "select id from users where role = $1 order by created_at desc limit 50",
+            ("admin",),
+        ),
+        Check(
+            "GET /api/admin/dashboard (new students)",
+            "select count(*) from users where role = 'student' and created_at >= now() - interval '30 days'",
+            (),
+        ),
+        Check(
+            "GET /api/admin/payments?status=",
+            "select id from course_payments where status = $1 order by created_at desc limit 30",
+            ("pending",),
+        ),
+        Check(
+            "GET /api/admin/payments",
+            "select id from course_payments where session = $1 order by created_at desc limit 30",
+            ("2024/2025",),
+        ),
+        Check(
+            "GET /api/admin/payments?status=&session=",
+            "select id from course_payments where session = $1 and status = $2 order by created_at desc limit 30",
+            ("2024/2025", "approved"),
+        ),
+        Check(
+            "GET /api/student/payment-history",
+            "select id from course_payments where student_id = $1 and session = $2 order by created_at desc limit 20",
+            (student_id, "2024/2025"),
+        ),
+        Check(
+            "GET /api/admin/dashboard (latest pending)",
+            "select id from course_payments where status = 'pending' order by created_at desc limit 5",
+            (),
+        ),
+        Check(
+            "GET /api/student/courses-with-payment-status (latest payment)",
+            "select id, status from course_payments where student_id = $1 and course_id = $2 "
+            "order by created_at desc limit 1",
+            (student_id, course_id),
+        ),
+        Check(
+            "GET /api/student/dashboard (payment counts)",
+            "select count(*) from course_payments where student_id = $1 and status = 'pending'",
+            (student_id,),
+        ),
+        Check(
+            "GET /api/student/registered-courses",
+            "select id, course_id from course_registrations where student_id = $1 limit 20",
+            (student_id,),
+        ),
+        Check(
+            "GET /api/student/materials/{course_id} (registration check)",
+            "select id from course_registrations where student_id = $1 and course_id = $2",
+            (student_id, course_id),
+        ),
+        Check(
+            "DELETE /api/admin/courses/{id} (registrations)",
+            "select id from course_registrations where course_id = $1",
+            (course_id,),
+        ),
+        Check(
+            "GET /api/student/materials/{course_id}",
+            "select id from course_materials where course_id = $1",
+            (course_id,),
+        ),
+        Check(
+            "GET /api/student/results",
+            "select id from results where student_id = $1",
+            (student_id,),
+        ),
+        Check(
+            "GET /api/student/results?session=&semester=",
+            "select id from results where student_id = $1 and session = $2 and semester = $3",
+            (student_id, "2024/2025", "First Semester"),
+        ),
+        Check(
+            "GET /api/announcements",
+            "select id from announcements where target_department = $1 or target_department is null "
+            "order by created_at desc limit 10",
+            (department,),
+        ),
+        Check(
+            "GET /api/admin/analytics/revenue (open month)",
+            "select * from analytics_series('revenue', 'day', now() - interval '30 days', now())",
+            (),
+        ),
+        Check(
+            "GET /api/admin/analytics/registrations (open month)",
+            "select * from analytics_series('registrations', 'day', now() - interval '30 days', now())",
+            (),
+        ),
+        Check(
+            "GET /api/courses?department=",
+            "select id from courses where department = $1 and session = $2 and semester = $3",
+            (department, "2024/2025", "First Semester"),
+        ),
+    ]
+
+
+# The candidate rows of search_users / search_payments, as the functions filter them
+SEARCH_USERS_SQL = (
+    "select id from users where role::text = 'student' and (reg_no ilike search_prefix($1) "
+    "or email ilike search_prefix($1) or lower(trim($1)) <% full_name)"
+)
+SEARCH_COURSES_SQL = "select id from courses where course_code ilike search_prefix($1)"
+
+# Reg no, email prefix, misspelt name and course code
+SEARCH_QUERIES = ("SEED0001234", "seed12", "sead studnt 42", "SEED1")
+
+
+def search_checks() -> List[Check]:
+    return [
+        Check("GET /api/admin/search?scope=students (reg_no)", SEARCH_USERS_SQL, ("SEED0001234",)),
+        Check("GET /api/admin/search?scope=students (name)", SEARCH_USERS_SQL, ("sead studnt 42",)),
+        Check("GET /api/admin/search?scope=payments (course_code)", SEARCH_COURSES_SQL, ("SEED1",)),
+    ]
+
+
+async def search_timings(conn) -> int:
+    """Time each search function per query; returns the number over SEARCH_P95_MS"""
+    failures = 0
+    for function, extra in (("search_users", ", 'student'"), ("search_payments", "")):
+        for query in SEARCH_QUERIES:
+            timings = []
+            for _ in range(SEARCH_RUNS):
+                started = time.perf_counter()
+                await conn.fetch(f"select * from {function}($1{extra})", query)
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            p95 = timings[int(len(timings) * 0.95) - 1]
+            slow = p95 > SEARCH_P95_MS
+            failures += slow
+            print(f"{'FAIL' if slow else 'ok':<6}{function}({query!r}): p50 {timings[len(timings) // 2]:.1f} ms, p95 {p95:.1f} ms")
+    return failures
+
+
+def seq_scans(plan: dict) -> List[str]:
+    """Relations sequentially scanned anywhere in a JSON plan tree"""
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+    return found
+
+
+async def run(dsn: str, seed: int, min_rows: int) -> int:
+    import asyncpg
+
+    conn = await asyncpg.connect(dsn)
+    failures = 0
+    try:
+        transaction = conn.transaction()
+        await transaction.start()
+        try:
+            if seed:
+                # asyncpg only binds parameters for single statements
+                await conn.execute(SEED_SQL.replace("$1::int", str(int(seed))))
+            for table in CHECKED_TABLES:
+                await conn.execute(f"analyze {table}")
+
+            sizes = {
+                r["relname"]: r["reltuples"]
+                for r in await conn.fetch(
+                    "select relname, reltuples from pg_class where relkind = 'r' and relname = any($1::text[])",
+                    list(CHECKED_TABLES),
+                )
+            }
+            sample = await conn.fetchrow(
+                "select r.student_id, r.course_id, u.department, u.reg_no "
+                "from course_registrations r join users u on u.id = r.student_id limit 1"
+            )
+            if sample is None:
+                print("No registrations to sample parameters from; run with --seed", file=sys.stderr)
+                return 2
+
+            search = await conn.fetchval("select count(*) from pg_extension where extname = 'pg_trgm'")
+            if not search:
+                failures += 1
+                print("FAIL  GET /api/admin/search: pg_trgm is not installed (apply migrations/0004_search.sql)")
+
+            for check in checks(*sample) + (search_checks() if search else []):
+                raw = await conn.fetchval(f"explain (format json) {check.sql}", *check.params)
+                plan = json.loads(raw)[0]["Plan"]
+                large = [t for t in seq_scans(plan) if sizes.get(t, 0) >= min_rows]
+                if large:
+                    failures += 1
+                    print(f"FAIL  {check.endpoint}: seq scan on {', '.join(large)}")
+                else:
+                    print(f"ok    {check.endpoint}: {plan['Node Type']}")
+
+            if search:
+                print()
+                failures += await search_timings(conn)
+        finally:
+            await transaction.rollback()
+    finally:
+        await conn.close()
+
+    print(f"\n{failures} checks failed" if failures else "\nAll checked queries use indexes")
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if endpoint queries sequentially scan large tables")
+    parser.add_argument("--dsn", default=settings.database_url, help="Postgres URL (defaults to DATABASE_URL)")
+    parser.add_argument("--seed", type=int, nargs="?", const=100_000, default=0,
+                        help="Insert this many synthetic users (default 100000) plus related rows first")
+    parser.add_argument("--min-rows", type=int, default=DEFAULT_MIN_ROWS,
+                        help="Ignore seq scans on tables with fewer rows than this")
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("DATABASE_URL is not set; pass --dsn")
+
+    sys.exit(asyncio.run(run(args.dsn, args.seed, args.min_rows)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Login throttling and limiter overhead (app/core/rate_limit.py):
+#
+#   python -m app.check_rate_limit
+#   python -m app.check_rate_limit --calls 1000000 --keys 200000
+#
+# Times MemoryBackend.take() over many keys and fails if a call costs more
+# than the budget. Then drives /api/auth/login in-process against a local
+# stand-in for PostgREST that counts user lookups, and fails if a burst on
+# one reg_no or one client IP reaches the database past its limit, or if a
+# rotated, client-written X-Forwarded-For entry buys a fresh IP bucket.
+# Needs no database.
+
+DEFAULT_CALLS = 200_000
+DEFAULT_KEYS = 50_000
+DEFAULT_BUDGET_US = 20.0
+LOGIN_LIMIT_IP = 20
+LOGIN_LIMIT_REG_NO = 5
+
+
+class LookupCounter(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    lookups = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        with LookupCounter.lock:
+            LookupCounter.lookups += 1
+        # No such user: login answers 401 without reaching verify_password
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", "2")
+        self.end_headers()
+        self.wfile.write(b"[]")
+
+
+def start_stand_in() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LookupCounter)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(calls: int, keys: int, budget_us: float) -> int:
+    server = start_stand_in()
+    os.environ.update(
+        SUPABASE_URL=f"http://127.0.0.1:{server.server_port}",
+        SUPABASE_READ_URL="",
+        HTTP2_ENABLED="false",
+        RATE_LIMIT_ENABLED="true",
+        RATE_LIMIT_BACKEND="memory",
+        LOGIN_RATE_LIMIT_IP=f"{LOGIN_LIMIT_IP}/minute",
+        LOGIN_RATE_LIMIT_REG_NO=f"{LOGIN_LIMIT_REG_NO}/minute",
+        TRUSTED_PROXY_HOPS="1",
+    )
+    os.environ.setdefault("SUPABASE_KEY", "check-rate-limit")
+    os.environ.setdefault("SECRET_KEY", "check-rate-limit")
+
+    from fastapi.testclient import TestClient
+    from app.core.rate_limit import MemoryBackend, parse_limit
+    from app.main import app
+
+    failures = 0
+
+    def report(ok: bool, scenario: str, detail: str):
+        nonlocal failures
+        failures += not ok
+        print(f"{'ok' if ok else 'FAIL':<6}{scenario}: {detail}")
+
+    backend = MemoryBackend()
+    rate, capacity = parse_limit("10/minute")
+    names = [f"login:reg_no:WMOU{n:07d}" for n in range(keys)]
+    picks = [names[i % keys] for i in range(calls)]
+    random.Random(1).shuffle(picks)
+    started = time.perf_counter()
+    for key in picks:
+        backend.take(key, rate, capacity)
+    per_call = (time.perf_counter() - started) / calls * 1e6
+    report(per_call <= budget_us, "MemoryBackend.take()",
+           f"{per_call:.2f} us per call over {calls} calls on {keys} keys (budget {budget_us:.0f} us)")
+
+    client = TestClient(app, raise_server_exceptions=False)
+
+    def attempts(n: int, reg_no, forwarded_for) -> dict:
+        codes = {}
+        for i in range(n):
+            response = client.post(
+                "/api/auth/login",
+                json={"reg_no": reg_no(i), "password": "guess"},
+                headers={"X-Forwarded-For": forwarded_for(i)},
+            )
+            codes[response.status_code] = codes.get(response.status_code, 0) + 1
+        return codes
+
+    before = LookupCounter.lookups
+    codes = attempts(LOGIN_LIMIT_REG_NO + 10, lambda i: "WMOU000001", lambda i: f"203.0.113.{i}")
+    lookups = LookupCounter.lookups - before
+    report(lookups == LOGIN_LIMIT_REG_NO and codes.get(429) == 10, "burst on one reg_no from many IPs",
+           f"{codes}, {lookups} user lookups")
+
+    before = LookupCounter.lookups
+    codes = attempts(LOGIN_LIMIT_IP + 10, lambda i: f"WMOU1{i:05d}", lambda i: f"6.6.6.{i}, 198.51.100.7")
+    lookups = LookupCounter.lookups - before
+    report(lookups == LOGIN_LIMIT_IP and codes.get(429) == 10, "burst from one IP, spoofed first hop rotated",
+           f"{codes}, {lookups} user lookups")
+
+    server.shutdown()
+    print(f"\n{failures} checks failed" if failures else "\nLogin bursts stop before the database")
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check login throttling and the rate limiter's overhead")
+    parser.add_argument("--calls", type=int, default=DEFAULT_CALLS, help="take() calls timed")
+    parser.add_argument("--keys", type=int, default=DEFAULT_KEYS, help="Distinct bucket keys the calls spread over")
+    parser.add_argument("--budget-us", type=float, default=DEFAULT_BUDGET_US,
+                        help="Maximum cost of one take() call, in microseconds")
+    args = parser.parse_args()
+
+    sys.exit(run(args.calls, args.keys, args.budget_us))
+
+
+if __name__ == "__main__":
+    main()
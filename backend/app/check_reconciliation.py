@@ -0,0 +1,104 @@
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+# Bank-statement reconciliation at scale (app/services/reconciliation.py):
+#
+#   python -m app.check_reconciliation
+#   python -m app.check_reconciliation --payments 100000 --budget 20
+#
+# Builds a synthetic CSV statement and the pending payments it pays for, then
+# times parsing and matching. Most lines carry the student's reg_no in the
+# narration, some only an amount that no other pending payment in the date
+# window shares, and some pay for nothing pending. Fails when parse + match
+# runs over the budget or when any line is matched to the wrong payment.
+# Needs no database.
+
+DEFAULT_PAYMENTS = 50_000
+DEFAULT_BUDGET_SECONDS = 10.0
+# Share of statement lines without a reg_no, and lines paying for nothing pending
+AMOUNT_ONLY_SHARE = 0.1
+NOISE_LINES = 1_000
+COURSE_FEES = (15_000, 20_000, 25_000, 30_000, 45_000)
+
+
+def synthesize(payments: int, rng: random.Random):
+    from app.services.reconciliation import PaymentGroup
+
+    start = date(2026, 9, 1)
+    amount_only = int(payments * AMOUNT_ONLY_SHARE)
+    groups, rows, expected = [], [], {}
+    for i in range(payments):
+        paid_on = start + timedelta(days=rng.randrange(60))
+        if i < payments - amount_only:
+            amount = rng.choice(COURSE_FEES) * 100 * rng.randint(1, 4)
+            narration = f"TRF FROM WMOU{i:06d} SCHOOL FEES"
+        else:
+            # Odd kobo amounts no course fee can produce, one per payment
+            amount = 1_000_001 + 2 * i
+            narration = "POS TRANSFER SCHOOL FEES"
+        groups.append(PaymentGroup([i], f"student-{i}", f"WMOU{i:06d}", amount, paid_on))
+        credited = paid_on + timedelta(days=rng.randint(0, 2))
+        rows.append((credited, narration, amount))
+        expected[len(rows) + 1] = i  # statement line numbers start after the header
+
+    for _ in range(NOISE_LINES):
+        rows.append((start + timedelta(days=rng.randrange(60)), "REVERSAL", 999_999_99))
+
+    csv_lines = ["Transaction Date,Narration,Credit"]
+    csv_lines += [f"{d:%d/%m/%Y},{narration},\"{amount / 100:,.2f}\"" for d, narration, amount in rows]
+    return "\n".join(csv_lines).encode(), groups, expected, amount_only
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time bank-statement reconciliation on synthetic data")
+    parser.add_argument("--payments", type=int, default=DEFAULT_PAYMENTS,
+                        help="Pending payments, each paid by one statement line")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_SECONDS,
+                        help="Maximum seconds for parsing plus matching")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+    os.environ.setdefault("SUPABASE_KEY", "check-reconciliation")
+    os.environ.setdefault("SECRET_KEY", "check-reconciliation")
+
+    from app.services.reconciliation import HIGH, LOW, match_statement, parse_statement, summarize
+
+    content, groups, expected, amount_only = synthesize(args.payments, random.Random(args.seed))
+    failures = 0
+
+    def report(ok: bool, scenario: str, detail: str):
+        nonlocal failures
+        failures += not ok
+        print(f"{'ok' if ok else 'FAIL':<6}{scenario}: {detail}")
+
+    started = time.perf_counter()
+    lines = parse_statement("statement.csv", content)
+    parsed = time.perf_counter()
+    result = match_statement(lines, groups)
+    matched = time.perf_counter()
+
+    total = matched - started
+    report(total <= args.budget, f"{len(lines)} lines against {len(groups)} pending payments",
+           f"parse {parsed - started:.2f} s, match {matched - parsed:.2f} s (budget {args.budget:.0f} s)")
+
+    summary = summarize(result)
+    wrong = sum(1 for m in result.matches if expected.get(m.line.line_no) != m.group.payment_ids[0])
+    confidence = summary["by_confidence"]
+    report(
+        wrong == 0 and confidence.get(HIGH) == args.payments - amount_only and confidence.get(LOW) == amount_only
+        and summary["unmatched"] == NOISE_LINES,
+        "matches",
+        f"{confidence}, {summary['unmatched']} unmatched, {wrong} matched to the wrong payment",
+    )
+
+    print(f"\n{failures} checks failed" if failures else "\nStatement reconciled within budget")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# Fault injection for the upstream layer (app/core/resilience.py): runs the
+# API in-process against a local PostgREST stand-in, injects latency and
+# errors, and fails when a scenario does not degrade the way it should:
+#
+#   python -m app.check_resilience
+#   python -m app.check_resilience --deadline 3 --seed 7
+#
+# Needs no database or network. Covers retries of flaky reads, hedging of a
+# slow tail, the breaker opening (503 + Retry-After) and closing again, hung
+# reads and RPCs ending in 504 at the deadline, a streamed export that
+# outlasts the deadline still arriving whole, and other requests staying fast
+# while upstream reads are slow (nothing blocks the event loop).
+
+DEFAULT_DEADLINE = 2.0
+BREAKER_THRESHOLD = 5
+BREAKER_RESET = 1.0
+HEDGE_AFTER = 0.05
+# Results rows served to the export scenario; EXPORT_BATCH_SIZE per page
+EXPORT_ROWS = 4500
+
+ADMIN = {
+    "id": "00000000-0000-0000-0000-000000000001", "reg_no": "ADM001", "full_name": "Check Admin",
+    "email": "admin@example.edu", "department": "Administration", "role": "admin", "status": "active",
+    "profile_picture_url": None, "created_at": "2026-01-01T00:00:00+00:00",
+}
+
+
+class Faults:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self, **faults):
+        with self.lock:
+            self.latency = 0.0          # every response
+            self.slow_every = 0         # every nth response waits slow_latency instead
+            self.slow_latency = 0.0
+            self.error_rate = 0.0       # share of reads answered 503
+            self.down = False           # every request answered 503
+            self.page_latency = 0.0     # per page of /results
+            self.hits = 0
+            for name, value in faults.items():
+                setattr(self, name, value)
+
+    def hit(self) -> int:
+        with self.lock:
+            self.hits += 1
+            return self.hits
+
+
+faults = Faults()
+
+
+class StandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status: int, body=None, headers: Dict[str, str] = None):
+        data = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def delay(self, n: int) -> float:
+        if faults.slow_every and n % faults.slow_every == 0:
+            return faults.slow_latency
+        return faults.latency
+
+    def do_GET(self):
+        n = faults.hit()
+        if faults.down:
+            return self.reply(503)
+        time.sleep(self.delay(n))
+        if random.random() < faults.error_rate:
+            return self.reply(503)
+
+        url = urlparse(self.path)
+        if url.path.endswith("/users"):
+            return self.reply(200, [ADMIN])
+        if url.path.endswith("/courses"):
+            courses = [{"id": i, "course_code": f"CHK{i}", "title": "Check", "enrolled_count": 1} for i in range(20)]
+            return self.reply(200, courses, {"content-range": "0-19/20"})
+        if url.path.endswith("/results"):
+            return self.results_page(parse_qs(url.query))
+        return self.reply(200, [])
+
+    def do_POST(self):
+        n = faults.hit()
+        self.rfile.read(int(self.headers.get("content-length") or 0))
+        if faults.down:
+            return self.reply(503)
+        time.sleep(self.delay(n))
+        return self.reply(200, [])
+
+    def results_page(self, query: dict):
+        time.sleep(faults.page_latency)
+        after = int(query["id"][0].partition(".")[2]) if "id" in query else 0
+        limit = int(query.get("limit", ["1000"])[0])
+        rows = [
+            {"id": i, "session": "2026/2027", "semester": "First Semester", "score": 70, "grade": "A",
+             "uploaded_at": None, "users": None, "courses": None}
+            for i in range(after + 1, min(after + limit, EXPORT_ROWS) + 1)
+        ]
+        return self.reply(200, rows)
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that gave up on a hung response (the point of the exercise)
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def start_stand_in() -> ThreadingHTTPServer:
+    server = StandInServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def configure(server: ThreadingHTTPServer, deadline: float):
+    """Point the app at the stand-in; must run before app modules are imported"""
+    os.environ.update(
+        SUPABASE_URL=f"http://127.0.0.1:{server.server_port}",
+        SUPABASE_READ_URL="",
+        HTTP2_ENABLED="false",
+        REQUEST_DEADLINE_SECONDS=str(deadline),
+        BREAKER_FAILURE_THRESHOLD=str(BREAKER_THRESHOLD),
+        BREAKER_RESET_SECONDS=str(BREAKER_RESET),
+        HEDGE_AFTER_SECONDS=str(HEDGE_AFTER),
+    )
+    os.environ.setdefault("SUPABASE_KEY", "check-resilience")
+    os.environ.setdefault("SECRET_KEY", "check-resilience")
+
+
+def timed(client, n: int, path: str, headers: dict) -> Tuple[Dict[int, int], List[float], object]:
+    codes: Dict[int, int] = {}
+    latencies = []
+    response = None
+    for _ in range(n):
+        started = time.perf_counter()
+        response = client.get(path, headers=headers)
+        latencies.append((time.perf_counter() - started) * 1000)
+        codes[response.status_code] = codes.get(response.status_code, 0) + 1
+    latencies.sort()
+    return codes, latencies, response
+
+
+def p(latencies: List[float], q: float) -> float:
+    return latencies[max(0, int(len(latencies) * q) - 1)]
+
+
+def run(deadline: float, seed: int) -> int:
+    random.seed(seed)
+    configure(start_stand_in(), deadline)
+
+    from fastapi.testclient import TestClient
+    from app.core import resilience
+    from app.core.http import upstream_metrics
+    from app.core.security import create_access_token
+    from app.main import app
+
+    client = TestClient(app, raise_server_exceptions=False)
+    auth = {"Authorization": "Bearer " + create_access_token({"user_id": ADMIN["id"], "role": "admin"})}
+    failures = 0
+
+    def report(ok: bool, scenario: str, detail: str):
+        nonlocal failures
+        failures += not ok
+        print(f"{'ok' if ok else 'FAIL':<6}{scenario}: {detail}")
+
+    def reset(**fault):
+        faults.reset(**fault)
+        resilience._breakers.clear()
+
+    reset()
+    codes, latencies, _ = timed(client, 50, "/api/courses", auth)
+    report(codes == {200: 50}, "healthy", f"{codes}, p50 {p(latencies, .5):.1f} ms")
+
+    reset(error_rate=0.2)
+    codes, latencies, _ = timed(client, 200, "/api/courses", auth)
+    report(codes.get(200, 0) >= 194, "20% of reads answered 503",
+           f"{codes}, p99 {p(latencies, .99):.1f} ms, {faults.hits} upstream calls (retried)")
+
+    reset(slow_every=10, slow_latency=0.5)
+    hedged = upstream_metrics.snapshot().get("hedged_requests", 0)
+    codes, latencies, _ = timed(client, 100, "/api/courses", auth)
+    hedged = upstream_metrics.snapshot().get("hedged_requests", 0) - hedged
+    report(codes == {200: 100} and p(latencies, .99) < 500, "1 in 10 reads slow (hedged)",
+           f"{codes}, p99 {p(latencies, .99):.1f} ms, {hedged} hedged")
+
+    reset(down=True)
+    codes, latencies, response = timed(client, 30, "/api/courses", auth)
+    report(
+        codes == {503: 30} and faults.hits <= BREAKER_THRESHOLD + 2 and "retry-after" in response.headers,
+        "upstream down",
+        f"{codes}, p99 {p(latencies, .99):.1f} ms, {faults.hits} upstream calls, "
+        f"Retry-After {response.headers.get('retry-after')}",
+    )
+    faults.down = False
+    time.sleep(BREAKER_RESET + 0.1)
+    codes, _, _ = timed(client, 5, "/api/courses", auth)
+    report(codes == {200: 5}, "upstream back after the breaker reset", f"{codes}, {resilience.breaker_stats()}")
+
+    reset(latency=deadline + 1)
+    codes, latencies, _ = timed(client, 2, "/api/courses", auth)
+    report(codes == {504: 2} and p(latencies, 1) < (deadline + 0.5) * 1000, "hung read",
+           f"{codes}, slowest {p(latencies, 1):.0f} ms")
+
+    # The user lookup answers at once; only the search RPC (a POST) hangs
+    reset(slow_every=2, slow_latency=deadline + 1)
+    codes, latencies, _ = timed(client, 1, "/api/admin/search?q=ab&scope=students", auth)
+    report(codes == {504: 1}, "hung RPC", f"{codes}, {p(latencies, 1):.0f} ms")
+
+    reset(page_latency=deadline / 3)
+    started = time.perf_counter()
+    response = client.get("/api/admin/results/export", headers=auth)
+    lines = response.text.count("\n") - 1
+    report(
+        response.status_code == 200 and lines == EXPORT_ROWS, "export streamed past the deadline",
+        f"{response.status_code}, {lines}/{EXPORT_ROWS} rows in {time.perf_counter() - started:.1f} s",
+    )
+
+    # One event loop for every request, as under uvicorn: slow upstream reads
+    # (and their retries) must not hold up a route that never leaves the process.
+    # Last, since leaving the block runs the lifespan shutdown
+    reset(latency=0.5)
+    with TestClient(app, raise_server_exceptions=False) as shared:
+        slow = [threading.Thread(target=shared.get, args=("/api/courses",), kwargs={"headers": auth}) for _ in range(4)]
+        for thread in slow:
+            thread.start()
+        time.sleep(0.1)
+        started = time.perf_counter()
+        status = shared.get("/api/health").status_code
+        waited = (time.perf_counter() - started) * 1000
+        for thread in slow:
+            thread.join()
+    report(status == 200 and waited < 200, "event loop free during slow reads",
+           f"/api/health answered {status} in {waited:.0f} ms with 4 reads waiting 500 ms upstream")
+
+    print(f"\n{failures} scenarios failed" if failures else "\nAll scenarios degraded as expected")
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inject upstream faults and check how the API degrades")
+    parser.add_argument("--deadline", type=float, default=DEFAULT_DEADLINE,
+                        help="Request deadline in seconds for the run (REQUEST_DEADLINE_SECONDS)")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the injected errors")
+    args = parser.parse_args()
+
+    sys.exit(run(args.deadline, args.seed))
+
+
+if __name__ == "__main__":
+    main()
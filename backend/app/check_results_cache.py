@@ -0,0 +1,186 @@
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+
+# Results-release load scenario (app/services/results_cache.py):
+#
+#   python -m app.check_results_cache
+#   python -m app.check_results_cache --students 50000 --reads 500000
+#
+# Runs the cache against a local stand-in for PostgREST holding every
+# student's results. A bulk upload bumps the shared "results" version and
+# refills the students it touched; then the whole student body reads its
+# results, first through the cache directly and then through
+# /api/student/results. Finally another worker changes one student's grades.
+# Fails when a read after the refill touches the results table, when a read
+# costs more than the budget, or when the other worker's change is still
+# hidden after CACHE_VERSION_CHECK_SECONDS. Needs no database.
+
+DEFAULT_STUDENTS = 20_000
+DEFAULT_READS = 100_000
+DEFAULT_BUDGET_US = 50.0
+RESULTS_PER_STUDENT = 8
+ENDPOINT_READS = 1_000
+VERSION_CHECK_SECONDS = 0.2
+GRADES = ("A", "B", "C", "D", "E", "F")
+
+
+class Results:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.by_student: Dict[str, List[dict]] = {}
+        self.version = 1
+        self.reads = 0
+
+    def fill(self, students: int, rng: random.Random):
+        next_id = 1
+        for s in range(students):
+            rows = []
+            for c in range(RESULTS_PER_STUDENT):
+                rows.append({
+                    "id": next_id, "student_id": student_id(s), "course_id": c + 1, "score": rng.randint(30, 95),
+                    "grade": rng.choice(GRADES), "session": "2026/2027", "semester": "First Semester",
+                    "uploaded_at": "2026-10-12T09:00:00+00:00",
+                    "courses": {"course_code": f"CRS{c + 1:03d}", "title": f"Course {c + 1}", "credit_units": 3},
+                })
+                next_id += 1
+            self.by_student[student_id(s)] = rows
+
+
+results = Results()
+
+
+def student_id(n: int) -> str:
+    return f"00000000-0000-4000-8000-{n:012d}"
+
+
+class StandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, body):
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path.endswith("/cache_versions"):
+            return self.reply([{"name": "results", "version": results.version}])
+        if not url.path.endswith("/results"):
+            return self.reply([])
+
+        with results.lock:
+            results.reads += 1
+        ids = [i.strip('"') for i in query["student_id"][0][len("in.("):-1].split(",")]
+        after = int(query["id"][0].partition(".")[2]) if "id" in query else 0
+        limit = int(query.get("limit", ["1000"])[0])
+        rows = sorted((r for i in ids for r in results.by_student.get(i, []) if r["id"] > after), key=lambda r: r["id"])
+        return self.reply(rows[:limit])
+
+
+def start_stand_in() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(students: int, reads: int, budget_us: float) -> int:
+    server = start_stand_in()
+    os.environ.update(
+        SUPABASE_URL=f"http://127.0.0.1:{server.server_port}",
+        SUPABASE_READ_URL="",
+        HTTP2_ENABLED="false",
+        CACHE_VERSION_CHECK_SECONDS=str(VERSION_CHECK_SECONDS),
+        RESULTS_CACHE_MAX_STUDENTS=str(max(students, 1)),
+    )
+    os.environ.setdefault("SUPABASE_KEY", "check-results-cache")
+    os.environ.setdefault("SECRET_KEY", "check-results-cache")
+
+    from fastapi.testclient import TestClient
+    from app.core.security import create_access_token
+    from app.main import app
+    from app.services import results_cache
+    from app.utils.validators import calculate_gpa
+
+    rng = random.Random(1)
+    results.fill(students, rng)
+    failures = 0
+
+    def report(ok: bool, scenario: str, detail: str):
+        nonlocal failures
+        failures += not ok
+        print(f"{'ok' if ok else 'FAIL':<6}{scenario}: {detail}")
+
+    # The upload's statement trigger bumps the version; the uploading worker refills
+    results.version += 1
+    started = time.perf_counter()
+    results_cache.refresh_students([student_id(s) for s in range(students)])
+    stats = results_cache.results_cache.stats()
+    report(stats["students"] == students, "refill after the bulk upload",
+           f"{students} students in {time.perf_counter() - started:.2f} s, {results.reads} results queries, "
+           f"{stats['bytes'] / 2**20:.1f} MB cached")
+
+    before = results.reads
+    started = time.perf_counter()
+    for _ in range(reads):
+        calculate_gpa(results_cache.get_student_results(student_id(rng.randrange(students))))
+    per_read = (time.perf_counter() - started) / reads * 1e6
+    report(per_read <= budget_us and results.reads == before, "release reads (cache + GPA)",
+           f"{per_read:.1f} us per read over {reads} reads (budget {budget_us:.0f} us), "
+           f"{results.reads - before} results queries")
+
+    client = TestClient(app, raise_server_exceptions=False)
+    before = results.reads
+    codes: Dict[int, int] = {}
+    started = time.perf_counter()
+    for _ in range(ENDPOINT_READS):
+        token = create_access_token({"user_id": student_id(rng.randrange(students)), "role": "student"})
+        status = client.get("/api/student/results", headers={"Authorization": f"Bearer {token}"}).status_code
+        codes[status] = codes.get(status, 0) + 1
+    per_request = (time.perf_counter() - started) / ENDPOINT_READS * 1000
+    report(codes == {200: ENDPOINT_READS} and results.reads == before, "/api/student/results",
+           f"{codes}, {per_request:.2f} ms per request, {results.reads - before} results queries")
+
+    # Another worker corrects one grade: the trigger bumps the version, nothing here refills
+    target = student_id(0)
+    results.by_student[target] = [dict(row, grade="A", score=99) for row in results.by_student[target]]
+    results.version += 1
+    time.sleep(VERSION_CHECK_SECONDS + 0.05)
+    seen = {row["grade"] for row in results_cache.get_student_results(target)}
+    report(seen == {"A"}, "change made by another worker",
+           f"grades {sorted(seen)} after {VERSION_CHECK_SECONDS + 0.05:.2f} s, "
+           f"{results_cache.results_cache.stats()['students']} students still cached")
+
+    server.shutdown()
+    print(f"\n{failures} checks failed" if failures else "\nResults release served from the cache")
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a results-release load scenario against the results cache")
+    parser.add_argument("--students", type=int, default=DEFAULT_STUDENTS, help="Students in the release")
+    parser.add_argument("--reads", type=int, default=DEFAULT_READS, help="Random student reads timed")
+    parser.add_argument("--budget-us", type=float, default=DEFAULT_BUDGET_US,
+                        help="Maximum cost of one cached read with GPA, in microseconds")
+    args = parser.parse_args()
+
+    sys.exit(run(args.students, args.reads, args.budget_us))
+
+
+if __name__ == "__main__":
+    main()
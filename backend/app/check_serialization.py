@@ -0,0 +1,138 @@
+import argparse
+import gzip
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Tuple
+
+# Serialization cost of the largest JSON responses (response models, orjson
+# and gzip in app/main.py):
+#
+#   python -m app.check_serialization
+#   python -m app.check_serialization --iterations 2000
+#
+# Builds a 50-user admin page and an admin dashboard like the routes return
+# them, then times FastAPI's untyped path (jsonable_encoder + JSONResponse)
+# against the path the routes take now (their response_model validated and
+# dumped by pydantic-core, rendered by ORJSONResponse). Fails when a route
+# loses its response model or orjson default, when the typed path is slower,
+# or when a payload falls under the gzip threshold. Needs no database.
+
+DEFAULT_ITERATIONS = 500
+PAGE_SIZE = 50
+DEPARTMENTS = ("Computer Science", "Accounting", "Nursing", "Mass Communication", "Economics")
+
+
+def user_page(rng: random.Random) -> dict:
+    created = datetime(2026, 9, 1, 10, tzinfo=timezone.utc)
+    users = [
+        {
+            "id": f"00000000-0000-4000-8000-{i:012d}", "reg_no": f"WMOU{i:06d}", "email": f"student{i}@wmou.edu.ng",
+            "full_name": f"Student Number {i}", "department": rng.choice(DEPARTMENTS), "phone": "08012345678",
+            "role": "student", "status": "active", "created_at": (created + timedelta(minutes=i)).isoformat(),
+            "address": "12 Some Street, Kaduna",
+            "profile_picture_url": f"https://res.cloudinary.com/x/image/upload/v1/wmou/profile_pictures/{i:08x}.jpg",
+            "registered_courses_count": rng.randint(0, 9), "creator": {"full_name": "Admin One"},
+            "created_by_name": "Admin One",
+        }
+        for i in range(PAGE_SIZE)
+    ]
+    return {"data": users, "total": 12000, "page": 1, "limit": PAGE_SIZE, "total_pages": 12000 // PAGE_SIZE}
+
+
+def dashboard(rng: random.Random) -> dict:
+    payments = [
+        {"id": i, "amount_paid": 25000.0, "created_at": f"2026-10-{i % 28 + 1:02d}T09:00:00+00:00",
+         "users": {"full_name": f"Student Number {i}", "reg_no": f"WMOU{i:06d}"},
+         "courses": {"title": f"Course {i}", "course_code": f"CRS{i:03d}"}}
+        for i in range(5)
+    ]
+    announcements = [
+        {"id": i, "title": f"Announcement {i}", "content": "Registration closes on Friday. " * 10,
+         "created_at": "2026-10-01T08:00:00+00:00"}
+        for i in range(5)
+    ]
+    return {
+        "student_metrics": {
+            "total_active": 11873, "new_students_30d": 412,
+            "by_department": [{"name": name, "value": rng.randint(100, 4000)} for name in DEPARTMENTS],
+        },
+        "course_metrics": {
+            "total_courses": 214, "most_enrolled": {"title": "Course 1", "count": 911}, "total_materials": 1630,
+        },
+        "financial_metrics": {
+            "total_revenue": 148250000.0, "pending_count": 318,
+            "revenue_trend": [{"name": f"2026-{m:02d}", "amount": rng.randint(10**6, 10**7)} for m in range(1, 13)],
+        },
+        "activity": {
+            "status_distribution": [{"name": s, "value": rng.randint(10, 9000)} for s in ("approved", "pending", "rejected")],
+            "latest_pending_payments": payments,
+            "latest_announcements": announcements,
+        },
+    }
+
+
+def per_call(render: Callable[[], bytes], iterations: int) -> Tuple[float, bytes]:
+    body = render()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        render()
+    return (time.perf_counter() - started) / iterations * 1000, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time and size the largest JSON responses")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS, help="Renders timed per payload and path")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+    os.environ.setdefault("SUPABASE_KEY", "check-serialization")
+    os.environ.setdefault("SECRET_KEY", "check-serialization")
+
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse, ORJSONResponse
+    from pydantic import TypeAdapter
+    from app.core.config import settings
+    from app.main import app
+
+    rng = random.Random(1)
+    routes = {(route.path, tuple(sorted(route.methods))): route for route in app.routes if hasattr(route, "methods")}
+    failures = 0
+
+    def report(ok: bool, scenario: str, detail: str):
+        nonlocal failures
+        failures += not ok
+        print(f"{'ok' if ok else 'FAIL':<6}{scenario}: {detail}")
+
+    default_class = getattr(app.router.default_response_class, "value", app.router.default_response_class)
+    report(default_class is ORJSONResponse, "default response class", default_class.__name__)
+
+    for path, payload in (("/api/admin/users", user_page(rng)), ("/api/admin/dashboard", dashboard(rng))):
+        route = routes.get((path, ("GET",)))
+        model = route.response_model if route else None
+        if model is None:
+            report(False, path, "no response_model declared")
+            continue
+
+        adapter = TypeAdapter(model)
+        untyped_ms, untyped_body = per_call(lambda: JSONResponse(jsonable_encoder(payload)).body, args.iterations)
+        typed_ms, typed_body = per_call(
+            lambda: ORJSONResponse(adapter.dump_python(adapter.validate_python(payload), mode="json")).body,
+            args.iterations,
+        )
+        report(typed_ms <= untyped_ms, f"{path} render",
+               f"{untyped_ms:.3f} ms untyped -> {typed_ms:.3f} ms typed ({model.__name__})")
+
+        compressed = len(gzip.compress(typed_body, compresslevel=9))
+        report(len(typed_body) >= settings.gzip_minimum_size, f"{path} on the wire",
+               f"{len(untyped_body) / 1024:.1f} KB untyped, {len(typed_body) / 1024:.1f} KB orjson, "
+               f"{compressed / 1024:.1f} KB gzip (threshold {settings.gzip_minimum_size} B)")
+
+    print(f"\n{failures} checks failed" if failures else "\nLarge responses are typed, orjson-rendered and gzipped")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
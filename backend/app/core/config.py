@@ -4,18 +4,17 @@ class Settings(BaseSettings):
     # Supabase
     supabase_url: str
     supabase_key: str
-    database_url: str
+    database_url: str = ""
 
-    
     # Security
     secret_key: str
     algorithm: str = "HS256"
     access_token_expire_days: int = 7
     
     # Cloudinary
-    cloudinary_cloud_name: str
-    cloudinary_api_key: str
-    cloudinary_api_secret: str
+    cloudinary_cloud_name: str = ""
+    cloudinary_api_key: str = ""
+    cloudinary_api_secret: str = ""
     
     # Email (Optional)
     smtp_host: str = "smtp.gmail.com"
@@ -26,8 +25,121 @@ class Settings(BaseSettings):
     # Application
     app_name: str = "School Portal"
     default_password: str = ""
+
+    # Routers to mount (comma-separated names from app.routers.ROUTER_MODULES,
+    # or "all"). A student-only deployment can also switch off the admin routes.
+    enabled_routers: str = "all"
+    enable_admin_routes: bool = True
+
+    # Responses smaller than this many bytes are sent uncompressed
+    gzip_minimum_size: int = 1024
+
+    # Rate limiting ("<count>/<second|minute|hour>"); backend is "memory" or "module:Class"
+    rate_limit_enabled: bool = True
+    rate_limit_backend: str = "memory"
+    login_rate_limit_ip: str = "20/minute"
+    login_rate_limit_reg_no: str = "5/minute"
+    # Proxies in front of the API that append to X-Forwarded-For (Vercel: 1);
+    # 0 ignores the header and limits by the socket peer
+    trusted_proxy_hops: int = 1
+    upload_rate_limit: str = "10/minute"
+    export_rate_limit: str = "5/minute"
+
+    # Per-process caches re-read their shared version counters this often
+    # (see app/services/cache_versions.py)
+    cache_version_check_seconds: float = 5.0
+
+    # Per-student results cache (see app/services/results_cache.py)
+    results_cache_max_students: int = 50_000
+    results_cache_ttl_seconds: int = 6 * 3600
+
+
+    # Background jobs: "postgres" (jobs table) or "sqlite" for local runs
+    job_store: str = "postgres"
+    job_sqlite_path: str = "jobs.db"
+    job_max_attempts: int = 5
+    job_lease_seconds: int = 300
+    worker_concurrency: int = 4
+    worker_batch_size: int = 50
+    worker_poll_interval: float = 2.0
+    # Cron-driven draining (app/routers/jobs.py, for Vercel): requests must
+    # carry "Authorization: Bearer <CRON_SECRET>"; each run stops claiming new
+    # batches after JOB_DRAIN_SECONDS, within the function's time limit
+    cron_secret: str = ""
+    job_drain_seconds: float = 8.0
+
+    # Announcement broadcasts: SMTP send rate and messages per connection
+    broadcast_rate_per_second: float = 10.0
+    smtp_messages_per_connection: int = 100
+
+    # Search: other workers see course changes in the catalog index after this
+    course_index_ttl_seconds: int = 300
+
+    # Read replica for heavy GETs (empty URL = everything on the primary)
+    supabase_read_url: str = ""
+    supabase_read_key: str = ""
+    replica_max_lag_seconds: float = 10.0
+    replica_lag_check_interval: float = 5.0
+    # A user's reads stay on the primary this long after they write
+    read_your_writes_seconds: float = 15.0
+
+    # Shared upstream HTTP client (app/core/http.py)
+    http2_enabled: bool = True
+    http_max_connections: int = 50
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 60.0
+    http_connect_timeout: float = 5.0
+    http_read_timeout: float = 30.0
+    http_pool_timeout: float = 10.0
+    # Upstream resilience (app/core/resilience.py): a total deadline per API
+    # request, a circuit breaker per upstream host, jittered retries of reads,
+    # and hedging of the critical reads (0 = off)
+    request_deadline_seconds: float = 20.0
+    breaker_failure_threshold: int = 5
+    breaker_reset_seconds: float = 15.0
+    upstream_retry_attempts: int = 3
+    upstream_retry_base_delay: float = 0.1
+    upstream_retry_max_delay: float = 1.0
+    hedge_after_seconds: float = 0.3
+
+    # File storage: "cloudinary", or "local" (files on disk, served by the API)
+    # as a stand-in for development and tests
+    storage_backend: str = "cloudinary"
+    local_storage_dir: str = "/tmp/wmou_uploads"
+    # Public base URL of this API, used for local storage upload/file URLs
+    public_base_url: str = "http://localhost:8000"
+    # Signed direct uploads: how long a client has to upload and finalize
+    upload_token_ttl_seconds: int = 900
+
+    # Analytics: buckets are local periods in this timezone; academic sessions
+    # start on the first of this month
+    analytics_timezone: str = "Africa/Lagos"
+    academic_session_start_month: int = 9
+    analytics_cache_max_points: int = 100_000
+    # Session lists default to, e.g. "2026/2027"; derived from today when empty
+    current_session: str = ""
+
+    # Material access: each student's registered course ids, cached per worker
+    # and dropped when the shared "registrations" version moves
+    registration_cache_max_students: int = 50_000
+    registration_cache_ttl_seconds: int = 3600
+    # Signed material links stay valid for one to two of these windows. Links
+    # issued within the same window are identical, so a CDN keeps one copy.
+    material_url_window_seconds: int = 6 * 3600
+
+    # Audit log: events buffered in memory, written in batches in the background
+    audit_buffer_size: int = 10_000
+    audit_batch_size: int = 500
+    audit_flush_interval_seconds: float = 1.0
+
+    # Storage garbage collection (app/services/asset_gc.py)
+    gc_min_age_hours: int = 24
+    gc_rejected_receipt_days: int = 90
+    gc_delete_interval_seconds: float = 2.0
+    gc_max_deletes_per_run: int = 10_000
     
     class Config:
         env_file = ".env"
+        extra = "ignore"
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -0,0 +1,83 @@
+import hashlib
+import hmac
+import time
+from fastapi import HTTPException, Request
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from app.core.config import settings
+from app.core.http import get_http_client
+from app.core.storage import get_storage
+
+# Time-limited links for course materials.
+#
+# The materials list hands out /api/files/materials/{id}?expires=...&signature=...
+# instead of the raw storage URL. The link needs no login, so a CDN or the
+# browser can cache it, but it stops working once it expires. Expiry is
+# rounded up to the end of the next MATERIAL_URL_WINDOW_SECONDS window: every
+# link issued for a material within one window is byte-identical, so shared
+# caches keep one copy, and a link is valid for one to two windows.
+#
+# Responses carry Cache-Control: public, immutable with max-age set to the
+# link's remaining lifetime. Range, If-Range and conditional headers are
+# honoured, so PDF viewers and video players can seek without downloading
+# the whole file.
+
+# Request headers forwarded to storage, and response headers passed back
+_FORWARD_REQUEST = ("range", "if-range", "if-none-match", "if-modified-since")
+_FORWARD_RESPONSE = (
+    "content-type", "content-length", "content-range", "accept-ranges",
+    "etag", "last-modified", "content-disposition",
+)
+_PASSTHROUGH_STATUS = (200, 206, 304, 416)
+
+def _signature(kind: str, item_id: int, expires: int) -> str:
+    message = f"{kind}:{item_id}:{expires}".encode()
+    return hmac.new(settings.secret_key.encode(), message, hashlib.sha256).hexdigest()
+
+def signed_material_url(material_id: int) -> str:
+    window = settings.material_url_window_seconds
+    expires = (int(time.time()) // window + 2) * window
+    signature = _signature("material", material_id, expires)
+    return (
+        f"{settings.public_base_url.rstrip('/')}/api/files/materials/{material_id}"
+        f"?expires={expires}&signature={signature}"
+    )
+
+def verify_material_link(material_id: int, expires: int, signature: str) -> int:
+    """Seconds the link has left; 403 for a forged link, 410 for an expired one"""
+    if not hmac.compare_digest(_signature("material", material_id, expires), signature):
+        raise HTTPException(status_code=403, detail="Invalid link")
+    remaining = expires - int(time.time())
+    if remaining <= 0:
+        raise HTTPException(status_code=410, detail="Link expired")
+    return remaining
+
+def serve(url: str, request: Request, max_age: int, public: bool = True):
+    """Stream a stored file with range support and cache headers (shared caches only when `public`)"""
+    cache_control = f"{'public' if public else 'private'}, max-age={max_age}, immutable"
+
+    path = get_storage().local_path(url)
+    if path is not None:
+        return FileResponse(path, headers={"Cache-Control": cache_control})
+
+    client = get_http_client()
+    upstream = client.send(
+        client.build_request(
+            "GET", url,
+            headers={k: v for k, v in request.headers.items() if k.lower() in _FORWARD_REQUEST},
+        ),
+        stream=True,
+    )
+    if upstream.status_code not in _PASSTHROUGH_STATUS:
+        upstream.close()
+        status_code = 404 if upstream.status_code == 404 else 502
+        raise HTTPException(status_code=status_code, detail="File not available")
+
+    headers = {k: v for k, v in upstream.headers.items() if k.lower() in _FORWARD_RESPONSE}
+    headers["Cache-Control"] = cache_control
+    return StreamingResponse(
+        upstream.iter_raw(),
+        status_code=upstream.status_code,
+        headers=headers,
+        background=BackgroundTask(upstream.close),
+    )
@@ -0,0 +1,30 @@
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app.core.enums import UserRole
+from app.core.projections import CURRENT_USER
+from app.core.resilience import hedged
+from app.core.security import decode_token
+from app.core.supabase import get_supabase
+
+security = HTTPBearer()
+
+async def get_token_payload(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    """Verified token claims (user_id, role) without a database lookup"""
+    return decode_token(credentials.credentials)
+
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    token = credentials.credentials
+    payload = decode_token(token)
+    user_id = payload.get("user_id")
+    
+    with hedged():
+        response = get_supabase().table("users").select(CURRENT_USER).eq("id", user_id).execute()
+    if not response.data:
+        raise HTTPException(status_code=401, detail="User not found")
+    
+    return response.data[0]
+
+async def get_admin_user(current_user: dict = Depends(get_current_user)):
+    if current_user["role"] != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
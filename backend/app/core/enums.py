@@ -0,0 +1,66 @@
+from enum import Enum
+
+class UserRole(str, Enum):
+    ADMIN = "admin"
+    STUDENT = "student"
+
+class PaymentStatus(str, Enum):
+    PENDING = "pending"
+    APPROVED = "approved"
+    REJECTED = "rejected"
+
+class StudentStatus(str, Enum):
+    ACTIVE = "active"
+    SUSPENDED = "suspended"
+    GRADUATED = "graduated"
+
+class AdminStatus(str, Enum):
+    ACTIVE = "active"
+    SUSPENDED = "suspended"
+
+class Semester(str, Enum):
+    FIRST = "First Semester"
+    SECOND = "Second Semester"
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    XLSX = "xlsx"
+
+class SearchScope(str, Enum):
+    ALL = "all"
+    STUDENTS = "students"
+    COURSES = "courses"
+    PAYMENTS = "payments"
+
+class UploadPurpose(str, Enum):
+    PAYMENT_RECEIPT = "payment_receipt"
+    COURSE_MATERIAL = "course_material"
+    PROFILE_PICTURE = "profile_picture"
+
+class AnalyticsMetric(str, Enum):
+    REVENUE = "revenue"
+    PAYMENTS = "payments"
+    NEW_STUDENTS = "new_students"
+    REGISTRATIONS = "registrations"
+
+class Granularity(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+    SESSION = "session"
+
+class AuditAction(str, Enum):
+    USER_CREATED = "user.created"
+    USER_STATUS_CHANGED = "user.status_changed"
+    COURSE_CREATED = "course.created"
+    COURSE_UPDATED = "course.updated"
+    COURSE_DELETED = "course.deleted"
+    REGISTRATION_REMOVED = "registration.removed"
+    PAYMENT_APPROVED = "payment.approved"
+    PAYMENT_REJECTED = "payment.rejected"
+    MATERIAL_UPLOADED = "material.uploaded"
+    MATERIAL_DELETED = "material.deleted"
+    RESULTS_UPLOADED = "results.uploaded"
+    ANNOUNCEMENT_CREATED = "announcement.created"
+    ANNOUNCEMENT_DELETED = "announcement.deleted"
+    STORAGE_GC_STARTED = "storage.gc_started"
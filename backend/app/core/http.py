@@ -0,0 +1,105 @@
+import threading
+from collections import Counter
+from functools import lru_cache
+from typing import TYPE_CHECKING
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    import httpx
+
+# One pooled HTTP client for every upstream API (PostgREST, Supabase storage
+# and auth, Cloudinary). Sharing it means one set of warm TLS connections per
+# upstream host instead of one per SDK, and HTTP/2 multiplexes concurrent
+# requests to the same host over a single connection. Pool limits and
+# timeouts come from settings rather than each library's defaults, and every
+# request passes through the deadline/breaker/retry layer in
+# app/core/resilience.py.
+
+
+class UpstreamMetrics:
+    """Counters fed by httpx's trace hook: requests, TCP connects, TLS handshakes"""
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counts[name] += amount
+
+    def trace(self, event_name: str, info: dict):
+        if event_name == "connection.connect_tcp.complete":
+            self.incr("tcp_connects")
+        elif event_name == "connection.start_tls.complete":
+            self.incr("tls_handshakes")
+
+    def on_request(self, request: "httpx.Request"):
+        request.extensions["trace"] = self.trace
+        self.incr("requests")
+
+    def on_response(self, response: "httpx.Response"):
+        self.incr(f"responses_{response.http_version.replace('/', '').replace('.', '').lower()}")
+        if response.status_code >= 500:
+            self.incr("responses_5xx")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        requests = counts.get("requests", 0)
+        counts["tls_handshakes_per_1k_requests"] = (
+            round(counts.get("tls_handshakes", 0) * 1000 / requests, 1) if requests else 0.0
+        )
+        return counts
+
+
+upstream_metrics = UpstreamMetrics()
+
+
+@lru_cache(maxsize=1)
+def get_http_client() -> "httpx.Client":
+    import httpx
+    from app.core.resilience import ResilientTransport
+
+    pool = httpx.HTTPTransport(
+        http2=settings.http2_enabled,
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        ),
+    )
+    return httpx.Client(
+        transport=ResilientTransport(pool),
+        timeout=httpx.Timeout(
+            settings.http_read_timeout,
+            connect=settings.http_connect_timeout,
+            pool=settings.http_pool_timeout,
+        ),
+        follow_redirects=True,
+        event_hooks={"request": [upstream_metrics.on_request], "response": [upstream_metrics.on_response]},
+    )
+
+
+def pool_stats() -> dict:
+    """Connection pool usage plus the request/handshake counters"""
+    stats = upstream_metrics.snapshot()
+    if get_http_client.cache_info().currsize == 0:
+        return {**stats, "connections": 0}
+
+    pool = get_http_client()._transport._transport._pool
+    connections = list(pool.connections)
+    return {
+        **stats,
+        "connections": len(connections),
+        "idle_connections": sum(1 for c in connections if c.is_idle()),
+        "http2_connections": sum(1 for c in connections if "HTTP/2" in c.info()),
+        "max_connections": settings.http_max_connections,
+        "max_keepalive_connections": settings.http_max_keepalive_connections,
+    }
+
+
+def close_http_client():
+    """Release pooled connections at shutdown (only if the client was ever built)"""
+    if get_http_client.cache_info().currsize:
+        get_http_client().close()
+        get_http_client.cache_clear()
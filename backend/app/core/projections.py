@@ -0,0 +1,59 @@
+# Declared column projections for the API's queries.
+#
+# Hot paths select exactly the columns their responses use instead of "*",
+# which pulled every column (including the password hash) on each request.
+# Build select strings with `columns()` / `embed()` so an unbounded select
+# fails loudly at import time instead of quietly widening a query;
+# `python -m app.check_projections` catches hand-written ones.
+
+def columns(*names: str) -> str:
+    """Join column names (or embeds) into a PostgREST select string"""
+    for name in names:
+        if "*" in name:
+            raise ValueError(f"Unbounded column selection {name!r} in projection; list the columns instead")
+    return ", ".join(names)
+
+def embed(relation: str, projection: str) -> str:
+    """Embed a related table, e.g. embed("courses", COURSE_SUMMARY) -> "courses(course_code, title)" """
+    return f"{relation}({columns(projection)})"
+
+# ---------- users ----------
+USER_PROFILE = columns(
+    "id", "reg_no", "email", "full_name", "department", "phone", "address",
+    "role", "status", "profile_picture_url", "created_by", "created_at",
+)
+# get_current_user: every authenticated request, so never the password hash
+CURRENT_USER = USER_PROFILE
+# login is the only read that needs the hash
+LOGIN_USER = columns(USER_PROFILE, "password")
+USER_NAME = columns("full_name")
+STUDENT_SUMMARY = columns("full_name", "reg_no")
+
+# ---------- courses ----------
+COURSE = columns(
+    "id", "course_code", "title", "department", "session", "semester", "fee",
+    "capacity", "enrolled_count", "created_at",
+)
+COURSE_SUMMARY = columns("course_code", "title")
+
+# ---------- payments ----------
+PAYMENT = columns(
+    "id", "student_id", "course_id", "amount_paid", "receipt_url", "status",
+    "rejection_reason", "reviewed_by", "reviewed_at", "created_at", "session",
+)
+PAYMENT_STATUS = columns("id", "course_id", "amount_paid", "status", "rejection_reason", "created_at")
+
+# ---------- registrations ----------
+REGISTRATION = columns("id", "student_id", "course_id", "registered_at")
+
+# ---------- materials ----------
+MATERIAL = columns("id", "course_id", "title", "file_url", "file_type", "uploaded_by", "uploaded_at")
+
+# ---------- results ----------
+RESULT = columns("id", "student_id", "course_id", "session", "semester", "score", "grade", "uploaded_at")
+
+# ---------- announcements ----------
+ANNOUNCEMENT = columns("id", "title", "content", "target_department", "created_by", "created_at")
+
+# ---------- audit log ----------
+AUDIT_EVENT = columns("id", "created_at", "actor_id", "action", "target_type", "target_id", "details")
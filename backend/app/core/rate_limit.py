@@ -0,0 +1,96 @@
+import math
+import threading
+import time
+from functools import lru_cache
+from importlib import import_module
+from typing import Dict, Tuple
+from fastapi import Depends, HTTPException, Request
+from app.core.config import settings
+from app.core.deps import get_current_user
+
+# Token-bucket rate limiting. Buckets live in a pluggable backend: the default
+# keeps them in this process, a shared backend (set RATE_LIMIT_BACKEND to
+# "package.module:ClassName") lets several workers enforce one budget.
+
+_UNITS = {"second": 1, "minute": 60, "hour": 3600}
+
+def parse_limit(limit: str) -> Tuple[float, int]:
+    """Turn "10/minute" into (refill rate in tokens per second, burst capacity)"""
+    count, _, unit = limit.partition("/")
+    capacity = int(count)
+    period = _UNITS.get(unit.strip().rstrip("s"))
+    if capacity <= 0 or period is None:
+        raise ValueError(f"Invalid rate limit {limit!r}, expected e.g. '10/minute'")
+    return capacity / period, capacity
+
+class RateLimitBackend:
+    def take(self, key: str, rate: float, capacity: int, cost: int = 1) -> float:
+        """Take `cost` tokens from the bucket; return 0 if allowed, else seconds until it would be"""
+        raise NotImplementedError
+
+class MemoryBackend(RateLimitBackend):
+    """In-process buckets: one (tokens, last_refill) tuple per key, oldest keys evicted first"""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, capacity: int, cost: int = 1) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - last) * rate)
+
+            if tokens >= cost:
+                tokens -= cost
+                wait = 0.0
+            else:
+                wait = (cost - tokens) / rate
+
+            # Re-inserting keeps the dict ordered by last use, so eviction drops idle keys
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                del self._buckets[next(iter(self._buckets))]
+
+        return wait
+
+@lru_cache(maxsize=1)
+def get_rate_limit_backend() -> RateLimitBackend:
+    if settings.rate_limit_backend == "memory":
+        return MemoryBackend()
+
+    module_name, _, class_name = settings.rate_limit_backend.partition(":")
+    return getattr(import_module(module_name), class_name)()
+
+def client_ip(request: Request) -> str:
+    """
+    The address our own proxies saw: the TRUSTED_PROXY_HOPS-th hop from the
+    right of X-Forwarded-For. Hops further left are written by the client and
+    cannot be trusted. Falls back to the socket peer.
+    """
+    hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    if settings.trusted_proxy_hops and hops:
+        return hops[-min(settings.trusted_proxy_hops, len(hops))]
+    return request.client.host if request.client else "unknown"
+
+def enforce(key: str, limit: str):
+    """Raise 429 with Retry-After when the bucket for `key` is empty"""
+    if not settings.rate_limit_enabled:
+        return
+
+    rate, capacity = parse_limit(limit)
+    wait = get_rate_limit_backend().take(key, rate, capacity)
+    if wait > 0:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests, please try again later",
+            headers={"Retry-After": str(math.ceil(wait))}
+        )
+
+def rate_limit(scope: str, limit: str):
+    """Route dependency limiting each authenticated user to `limit` calls within `scope`"""
+    def dependency(current_user: dict = Depends(get_current_user)):
+        enforce(f"{scope}:user:{current_user['id']}", limit)
+
+    return dependency
@@ -0,0 +1,131 @@
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+from fastapi import HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.security import decode_token
+
+# Read/write routing between the primary and a read replica.
+#
+# Every route reads from the primary unless it is annotated with
+#
+#     dependencies=[Depends(replica_reads)]
+#
+# which routes that request's get_supabase() calls to the replica when it is
+# safe to do so:
+#   - SUPABASE_READ_URL is configured,
+#   - the caller has not written anything in the last READ_YOUR_WRITES_SECONDS
+#     (stickiness, so a student sees their own upload straight away),
+#   - the replica's replay lag, checked at most every
+#     REPLICA_LAG_CHECK_INTERVAL seconds, is under REPLICA_MAX_LAG_SECONDS.
+# Only annotate routes that never write. The choice lives in a ContextVar, so
+# it is scoped to the request's task and never leaks into other requests.
+
+_use_replica: ContextVar[bool] = ContextVar("use_replica", default=False)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def reads_from_replica() -> bool:
+    return _use_replica.get()
+
+
+class RecentWriters:
+    """user_id -> time until which that user's reads stay on the primary"""
+
+    def __init__(self, max_users: int = 100_000):
+        self.max_users = max_users
+        self._until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, user_id: str, seconds: float):
+        with self._lock:
+            self._until.pop(user_id, None)
+            self._until[user_id] = time.monotonic() + seconds
+            while len(self._until) > self.max_users:
+                self._until.pop(next(iter(self._until)))
+
+    def is_sticky(self, user_id: Optional[str]) -> bool:
+        if user_id is None:
+            return False
+        with self._lock:
+            until = self._until.get(user_id)
+            if until is None:
+                return False
+            if until < time.monotonic():
+                del self._until[user_id]
+                return False
+            return True
+
+
+class ReplicaHealth:
+    """Cached answer to "is the replica close enough to the primary?" """
+
+    def __init__(self, max_lag: float, check_interval: float):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag: Optional[float] = None
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def needs_check(self) -> bool:
+        return self._checked_at is None or time.monotonic() - self._checked_at >= self.check_interval
+
+    def check(self):
+        # Only one request per process pays for the round-trip; the rest keep
+        # using the previous answer until it is refreshed
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            from app.core.supabase import get_replica_supabase
+
+            try:
+                self.lag = float(get_replica_supabase().rpc("replica_lag_seconds", {}).execute().data)
+            except Exception:
+                self.lag = None  # unreachable replica counts as unhealthy
+            self._checked_at = time.monotonic()
+        finally:
+            self._lock.release()
+
+    def healthy(self) -> bool:
+        return self.lag is not None and self.lag <= self.max_lag
+
+    def status(self) -> dict:
+        return {"lag_seconds": self.lag, "max_lag_seconds": self.max_lag, "healthy": self.healthy()}
+
+
+recent_writers = RecentWriters()
+replica_health = ReplicaHealth(settings.replica_max_lag_seconds, settings.replica_lag_check_interval)
+
+
+def _user_id(request: Request) -> Optional[str]:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return decode_token(token).get("user_id")
+    except HTTPException:
+        return None
+
+
+async def replica_reads(request: Request):
+    """Route annotation: this request's reads may be served by the replica"""
+    if not settings.supabase_read_url:
+        return
+    if recent_writers.is_sticky(_user_id(request)):
+        return
+    if replica_health.needs_check():
+        await run_in_threadpool(replica_health.check)
+    if replica_health.healthy():
+        _use_replica.set(True)
+
+
+def note_write(request: Request, status_code: int):
+    """Called after each response: successful writes pin the caller to the primary for a while"""
+    if request.method in SAFE_METHODS or status_code >= 400 or not settings.supabase_read_url:
+        return
+    user_id = _user_id(request)
+    if user_id:
+        recent_writers.mark(user_id, settings.read_your_writes_seconds)
@@ -0,0 +1,314 @@
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+import httpx
+from app.core.config import settings
+
+# Deadlines, circuit breakers, retries and hedging for upstream calls.
+#
+# Every request to an upstream API goes through ResilientTransport, which the
+# shared HTTP client (app/core/http.py) wraps around its connection pool:
+#   - Deadline: DeadlineMiddleware gives each API request REQUEST_DEADLINE_SECONDS
+#     in total. Every upstream call it makes has its timeouts capped at what is
+#     left, and once it is spent further calls fail at once with 504 instead
+#     of queueing behind a slow upstream. The deadline covers producing the
+#     response only: once the status line is sent it is lifted, so streamed
+#     bodies (exports, file downloads) keep the client's own timeouts per batch
+#     rather than being cut off midway.
+#   - Circuit breaker, one per upstream host: BREAKER_FAILURE_THRESHOLD
+#     consecutive failures (connection errors, timeouts, 502/503/504) open it,
+#     and calls then fail at once with 503 and a Retry-After. After
+#     BREAKER_RESET_SECONDS one probe is let through; its outcome closes the
+#     breaker or opens it again.
+#   - Retries: GET and HEAD are retried up to UPSTREAM_RETRY_ATTEMPTS times in
+#     total on those same failures, after a full-jitter backoff, and only while
+#     the deadline leaves room. Writes and RPCs are never retried. A failure that
+#     is not retried, or still fails on the last attempt, becomes a 503 (a 504
+#     when it is a timeout cut short by the deadline).
+#   - Hedging: inside `with hedged():` (the user lookup behind get_current_user
+#     and the course list), a GET still unanswered after HEDGE_AFTER_SECONDS is
+#     sent a second time and the first answer wins. 0 turns hedging off.
+# Code outside a request (the worker, the audit flusher) has no deadline and
+# keeps the client's own timeouts.
+#
+# All of this is synchronous: backoff sleeps, hedge waits and the upstream
+# calls themselves block the calling thread. Routes and dependencies that reach
+# an upstream are therefore plain `def`, which FastAPI runs in its threadpool;
+# an `async def` route must hand such calls to run_in_threadpool, or it stalls
+# every request on the event loop.
+#
+# `python -m app.check_resilience` replays these behaviours against a local
+# upstream stand-in with injected latency and errors.
+
+IDEMPOTENT_METHODS = ("GET", "HEAD")
+RETRYABLE_STATUS = (502, 503, 504)
+
+class _Deadline:
+    # Shared by every context copied from the request's, so lifting it in the
+    # middleware reaches the threads the response body is produced in
+    __slots__ = ("at",)
+
+    def __init__(self, at: Optional[float]):
+        self.at = at
+
+
+_deadline: ContextVar[Optional[_Deadline]] = ContextVar("upstream_deadline", default=None)
+_hedge: ContextVar[bool] = ContextVar("upstream_hedge", default=False)
+
+
+class UpstreamUnavailable(Exception):
+    """An upstream is failing or its breaker is open; answered with 503"""
+
+    status_code = 503
+    detail = "A backing service is unavailable, please try again shortly"
+
+    def __init__(self, upstream: str, reason: str, retry_after: Optional[float] = None):
+        super().__init__(f"{upstream}: {reason}")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(UpstreamUnavailable):
+    """The request's deadline ran out before an upstream call could be made; answered with 504"""
+
+    status_code = 504
+    detail = "The request took too long, please try again"
+
+
+# ============= DEADLINES =============
+
+def remaining() -> Optional[float]:
+    """Seconds left on the current request's deadline, or None outside a request"""
+    deadline = _deadline.get()
+    return None if deadline is None or deadline.at is None else deadline.at - time.monotonic()
+
+@contextmanager
+def deadline(seconds: float):
+    current = _Deadline(time.monotonic() + seconds)
+    token = _deadline.set(current)
+    try:
+        yield current
+    finally:
+        _deadline.reset(token)
+
+@contextmanager
+def hedged():
+    """Hedge the GETs made inside this block (critical read paths only)"""
+    token = _hedge.set(True)
+    try:
+        yield
+    finally:
+        _hedge.reset(token)
+
+
+class DeadlineMiddleware:
+    """Start each HTTP request's upstream deadline; lift it once the response has started"""
+
+    def __init__(self, app, seconds: float):
+        self.app = app
+        self.seconds = seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.seconds:
+            await self.app(scope, receive, send)
+            return
+        with deadline(self.seconds) as current:
+            async def send_and_lift(message):
+                if message["type"] == "http.response.start":
+                    current.at = None
+                await send(message)
+
+            await self.app(scope, receive, send_and_lift)
+
+
+# ============= CIRCUIT BREAKERS =============
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; in the half-open state only one probe at a time"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_seconds or self._probing:
+                self.rejected += 1
+                return False
+            self._probing = True
+            return True
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self.reset_seconds - (time.monotonic() - self._opened_at))
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or (self._opened_at is None and self.failures >= self.failure_threshold):
+                if self._opened_at is None:
+                    self.opened += 1
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def release(self):
+        """A call was let through but never reached the upstream (e.g. the deadline ran out)"""
+        with self._lock:
+            self._probing = False
+
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at < self.reset_seconds:
+                return "open"
+            return "half_open"
+
+    def status(self) -> dict:
+        return {"state": self.state(), "failures": self.failures, "opened": self.opened, "rejected": self.rejected}
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(upstream: str) -> CircuitBreaker:
+    with _breakers_lock:
+        breaker = _breakers.get(upstream)
+        if breaker is None:
+            breaker = _breakers[upstream] = CircuitBreaker(
+                upstream, settings.breaker_failure_threshold, settings.breaker_reset_seconds
+            )
+        return breaker
+
+def breaker_stats() -> dict:
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.status() for breaker in breakers}
+
+
+# ============= TRANSPORT =============
+
+_hedge_pool: Optional[ThreadPoolExecutor] = None
+_hedge_pool_lock = threading.Lock()
+
+
+def _get_hedge_pool() -> ThreadPoolExecutor:
+    global _hedge_pool
+    with _hedge_pool_lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(max_workers=settings.http_max_connections, thread_name_prefix="hedge")
+        return _hedge_pool
+
+def _close_response(future):
+    if future.exception() is None:
+        future.result().close()
+
+def _backoff(attempt: int) -> float:
+    return random.uniform(0, min(settings.upstream_retry_max_delay, settings.upstream_retry_base_delay * 2 ** (attempt - 1)))
+
+
+class ResilientTransport(httpx.BaseTransport):
+    def __init__(self, transport: httpx.BaseTransport):
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        upstream = request.url.host
+        breaker = get_breaker(upstream)
+        attempts = settings.upstream_retry_attempts if request.method in IDEMPOTENT_METHODS else 1
+
+        for attempt in range(1, attempts + 1):
+            left = remaining()
+            if left is not None and left <= 0:
+                raise DeadlineExceeded(upstream, "request deadline exceeded")
+            if not breaker.allow():
+                raise UpstreamUnavailable(upstream, "circuit open", breaker.retry_after())
+            capped = False
+            if left is not None:
+                # No single wait on the upstream may outlast the deadline
+                timeouts = request.extensions.get("timeout", {})
+                capped = any(value is None or value > left for value in timeouts.values())
+                request.extensions["timeout"] = {
+                    key: left if value is None else min(value, left) for key, value in timeouts.items()
+                }
+
+            delay = _backoff(attempt)
+            last = attempt == attempts or (remaining() is not None and remaining() <= delay)
+            try:
+                response = self._send(request)
+            except httpx.TransportError as exc:
+                breaker.record_failure()
+                if last:
+                    if capped and isinstance(exc, httpx.TimeoutException):
+                        raise DeadlineExceeded(upstream, "request deadline exceeded") from exc
+                    raise UpstreamUnavailable(upstream, type(exc).__name__, breaker.retry_after() or None) from exc
+                time.sleep(delay)
+                continue
+            except BaseException:
+                breaker.release()
+                raise
+
+            if response.status_code not in RETRYABLE_STATUS:
+                breaker.record_success()
+                return response
+            breaker.record_failure()
+            response.close()
+            if last:
+                raise UpstreamUnavailable(upstream, f"HTTP {response.status_code}", breaker.retry_after() or None)
+            time.sleep(delay)
+
+    def _send(self, request: httpx.Request) -> httpx.Response:
+        if not (_hedge.get() and settings.hedge_after_seconds > 0 and request.method in IDEMPOTENT_METHODS):
+            return self._transport.handle_request(request)
+
+        pool = _get_hedge_pool()
+        first = pool.submit(self._send_and_read, request)
+        done, _ = wait([first], timeout=settings.hedge_after_seconds)
+        if done:
+            return first.result()
+
+        from app.core.http import upstream_metrics
+
+        upstream_metrics.incr("hedged_requests")
+        pending = {first, pool.submit(self._send_and_read, request)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    # The slower copy is closed whenever it finishes
+                    for loser in pending:
+                        loser.add_done_callback(_close_response)
+                    return future.result()
+        return first.result()
+
+    def _send_and_read(self, request: httpx.Request) -> httpx.Response:
+        response = self._transport.handle_request(request)
+        try:
+            response.read()
+        except BaseException:
+            response.close()
+            raise
+        return response
+
+    def close(self):
+        self._transport.close()
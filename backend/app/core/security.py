@@ -1,30 +1,52 @@
+import base64
+import hashlib
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
-from jose import JWTError, jwt
+import jwt
+from fastapi import HTTPException
 from passlib.context import CryptContext
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
-
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
+    expire = datetime.utcnow() + (expires_delta or timedelta(days=settings.access_token_expire_days))
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-    return encoded_jwt
+    return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+
+@lru_cache(maxsize=1)
+def _fernet():
+    from cryptography.fernet import Fernet
+
+    key = hashlib.sha256(b"sealed-payload:" + settings.secret_key.encode()).digest()
+    return Fernet(base64.urlsafe_b64encode(key))
+
+def seal(value: str) -> str:
+    """Encrypt a secret (e.g. a temporary password) for a job payload; only this app's SECRET_KEY opens it"""
+    return _fernet().encrypt(value.encode()).decode()
+
+def unseal(token: str, max_age_seconds: int) -> str:
+    """Decrypt a sealed value; raises ValueError once it is older than max_age_seconds or was tampered with"""
+    from cryptography.fernet import InvalidToken
+
+    try:
+        return _fernet().decrypt(token.encode(), ttl=max_age_seconds).decode()
+    except InvalidToken:
+        raise ValueError("Sealed value is invalid or expired")
 
-def decode_access_token(token: str):
+def decode_token(token: str):
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
         return payload
-    except JWTError:
-        return None
\ No newline at end of file
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token expired")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
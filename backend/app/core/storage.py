@@ -0,0 +1,329 @@
+import hashlib
+import hmac
+import os
+import re
+import shutil
+import time
+import uuid
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from fastapi import HTTPException
+from app.core.config import settings
+from app.core.http import get_http_client
+
+# File storage. Two backends share one shape: server-side `upload`, a signed
+# `direct_upload` target so clients can send bytes straight to storage, and
+# `verify_result` to check what the client says storage returned.
+#
+# Cloudinary uploads go straight to its REST upload API over the shared
+# upstream client (app/core/http.py) instead of the SDK's own urllib3 pool,
+# whose one-connection-per-host default reconnected for concurrent uploads.
+# The local backend (STORAGE_BACKEND=local) mimics the same API on disk so
+# the direct-upload flow can be exercised without a Cloudinary account.
+
+CLOUDINARY_API = "https://api.cloudinary.com/v1_1"
+CLOUDINARY_DELIVERY = "https://res.cloudinary.com"
+
+# Cloudinary refuses signed requests older than this; the local backend agrees
+SIGNATURE_MAX_AGE = 3600
+
+# Transformation keys the routes use, in Cloudinary's URL shorthand
+_TRANSFORMATION_KEYS = {
+    "width": "w", "height": "h", "crop": "c", "gravity": "g",
+    "quality": "q", "fetch_format": "f", "radius": "r", "angle": "a",
+}
+
+# Assets per listing page; Cloudinary's admin API allows at most 500
+LIST_PAGE_SIZE = 500
+# Public ids per bulk delete call; Cloudinary's admin API allows at most 100
+DELETE_BATCH_SIZE = 100
+
+# Form fields that are never part of a signature
+_UNSIGNED_FIELDS = ("file", "api_key", "signature", "resource_type", "cloud_name")
+
+def _transformation(value) -> str:
+    """[{"width": 400, "crop": "fill"}] -> "c_fill,w_400" (chained with "/")"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        value = [value]
+    return "/".join(
+        ",".join(sorted(f"{_TRANSFORMATION_KEYS.get(k, k)}_{v}" for k, v in step.items()))
+        for step in value
+    )
+
+def sign(params: dict, secret: str) -> str:
+    """Cloudinary API signature: sha1 of the sorted params followed by the secret"""
+    payload = "&".join(f"{k}={params[k]}" for k in sorted(params) if params[k] not in (None, ""))
+    return hashlib.sha1((payload + secret).encode()).hexdigest()
+
+def _signed_params(options: dict, secret: str) -> dict:
+    params = {"timestamp": int(time.time())}
+    for key, value in options.items():
+        params[key] = _transformation(value) if key == "transformation" else value
+    params["signature"] = sign(params, secret)
+    return params
+
+
+class StorageBackend:
+    secret = ""
+    # Resource types assets may be stored under (listing walks each of them)
+    resource_types: Tuple[str, ...] = ("image", "raw", "video")
+
+    def upload(self, file, resource_type: str = "image", **options) -> dict:
+        """Upload a file object; returns Cloudinary-shaped fields (public_id, version, bytes, secure_url, ...)"""
+        raise NotImplementedError
+
+    def direct_upload(self, public_id: str, resource_type: str, options: dict) -> dict:
+        """Signed target a client can post a file to: {"url": ..., "fields": {...}}"""
+        raise NotImplementedError
+
+    def url(self, result: dict) -> str:
+        """Delivery URL for an upload result, built from its verified fields only"""
+        raise NotImplementedError
+
+    def resource(self, public_id: str, resource_type: str = "image") -> Optional[dict]:
+        """What storage holds for a public id (bytes, format, version), or None"""
+        raise NotImplementedError
+
+    def delete(self, public_id: str, resource_type: str = "image"):
+        raise NotImplementedError
+
+    def local_path(self, url: str) -> Optional[str]:
+        """Path on this server's disk for a delivery URL, when the backend keeps files locally"""
+        return None
+
+    def list_resources(self, resource_type: str, prefix: str, cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """One page of stored assets under a prefix: ([{public_id, bytes, created_at}, ...], next_cursor)"""
+        raise NotImplementedError
+
+    def public_id(self, url: str) -> Optional[str]:
+        """Public id behind one of this backend's delivery URLs, or None for foreign URLs"""
+        raise NotImplementedError
+
+    def delete_many(self, public_ids: List[str], resource_type: str = "image"):
+        """Delete up to DELETE_BATCH_SIZE assets"""
+        for public_id in public_ids:
+            self.delete(public_id, resource_type)
+
+    def verify_result(self, result: dict) -> bool:
+        """True when the result's signature covers its public_id and version"""
+        expected = sign({"public_id": result.get("public_id"), "version": result.get("version")}, self.secret)
+        return hmac.compare_digest(expected, str(result.get("signature") or ""))
+
+
+class CloudinaryStorage(StorageBackend):
+    def __init__(self):
+        self.cloud_name = settings.cloudinary_cloud_name
+        self.api_key = settings.cloudinary_api_key
+        self.secret = settings.cloudinary_api_secret
+
+    def _post(self, resource_type: str, action: str, params: dict, files: Optional[dict] = None) -> dict:
+        response = get_http_client().post(
+            f"{CLOUDINARY_API}/{self.cloud_name}/{resource_type}/{action}",
+            data={k: str(v) for k, v in {**params, "api_key": self.api_key}.items()},
+            files=files,
+        )
+        if response.status_code != 200:
+            try:
+                message = response.json()["error"]["message"]
+            except (ValueError, KeyError, TypeError):
+                message = response.text[:200]
+            raise HTTPException(status_code=502, detail=f"File {action} failed: {message}")
+        return response.json()
+
+    def upload(self, file, resource_type="image", **options):
+        return self._post(resource_type, "upload", _signed_params(options, self.secret), files={"file": file})
+
+    def direct_upload(self, public_id, resource_type, options):
+        return {
+            "url": f"{CLOUDINARY_API}/{self.cloud_name}/{resource_type}/upload",
+            "fields": {**_signed_params({"public_id": public_id, **options}, self.secret), "api_key": self.api_key},
+        }
+
+    def url(self, result):
+        suffix = f".{result['format']}" if result.get("format") else ""
+        return (
+            f"{CLOUDINARY_DELIVERY}/{self.cloud_name}/{result.get('resource_type') or 'image'}/upload/"
+            f"v{result['version']}/{result['public_id']}{suffix}"
+        )
+
+    def resource(self, public_id, resource_type="image"):
+        response = get_http_client().get(
+            f"{CLOUDINARY_API}/{self.cloud_name}/resources/{resource_type}/upload/{public_id}",
+            auth=(self.api_key, self.secret),
+        )
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            raise HTTPException(status_code=502, detail="File lookup failed")
+        return response.json()
+
+    def delete(self, public_id, resource_type="image"):
+        self._post(resource_type, "destroy", _signed_params({"public_id": public_id, "invalidate": "true"}, self.secret))
+
+    def _admin(self, method: str, path: str, params) -> dict:
+        response = get_http_client().request(
+            method, f"{CLOUDINARY_API}/{self.cloud_name}/{path}",
+            params=params, auth=(self.api_key, self.secret),
+        )
+        if response.status_code != 200:
+            raise HTTPException(status_code=502, detail=f"Storage admin API returned {response.status_code}")
+        return response.json()
+
+    def list_resources(self, resource_type, prefix, cursor=None):
+        params = {"type": "upload", "prefix": prefix, "max_results": LIST_PAGE_SIZE}
+        if cursor:
+            params["next_cursor"] = cursor
+        page = self._admin("GET", f"resources/{resource_type}", params)
+        return page.get("resources", []), page.get("next_cursor")
+
+    def public_id(self, url):
+        base = f"{CLOUDINARY_DELIVERY}/{self.cloud_name}/"
+        if not url.startswith(base):
+            return None
+        resource_type, _, rest = url[len(base):].partition("/upload/")
+        segments = rest.split("/")
+        # Transformations come before the version segment, the public id after it
+        versions = [i for i, segment in enumerate(segments) if re.fullmatch(r"v\d+", segment)]
+        if versions:
+            segments = segments[versions[0] + 1:]
+        public_id = "/".join(segments)
+        # Raw assets keep their extension in the public id
+        return public_id if resource_type == "raw" else os.path.splitext(public_id)[0]
+
+    def delete_many(self, public_ids, resource_type="image"):
+        self._admin("DELETE", f"resources/{resource_type}/upload", [("public_ids[]", p) for p in public_ids])
+
+
+class LocalStorage(StorageBackend):
+    """Files under LOCAL_STORAGE_DIR, uploaded to and served by app/routers/uploads.py"""
+
+    # Files are not split by type on disk
+    resource_types = ("raw",)
+
+    def __init__(self, root: str):
+        self.root = os.path.realpath(root)
+        self.secret = settings.secret_key
+        self.base_url = settings.public_base_url.rstrip("/")
+
+    def path(self, name: str) -> str:
+        path = os.path.realpath(os.path.join(self.root, name))
+        if not path.startswith(self.root + os.sep):
+            raise HTTPException(status_code=400, detail="Invalid file path")
+        return path
+
+    def upload(self, file, resource_type="image", public_id=None, folder=None, filename=None, **options):
+        public_id = public_id or "/".join(filter(None, [folder, uuid.uuid4().hex]))
+        extension = os.path.splitext(filename or "")[1].lstrip(".").lower()
+        path = self.path(f"{public_id}.{extension}" if extension else public_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as out:
+            shutil.copyfileobj(file, out, 1024 * 1024)
+
+        version = int(time.time())
+        result = {
+            "public_id": public_id,
+            "version": version,
+            "signature": sign({"public_id": public_id, "version": version}, self.secret),
+            "resource_type": "raw" if resource_type == "auto" else resource_type,
+            "format": extension or None,
+            "bytes": os.path.getsize(path),
+        }
+        result["secure_url"] = self.url(result)
+        return result
+
+    def direct_upload(self, public_id, resource_type, options):
+        return {
+            "url": f"{self.base_url}/api/uploads/local/{resource_type}/upload",
+            "fields": {**_signed_params({"public_id": public_id, **options}, self.secret), "api_key": "local"},
+        }
+
+    def receive(self, fields: dict, file, filename: Optional[str], resource_type: str) -> dict:
+        """Accept a direct upload the way Cloudinary does: signed params, fresh timestamp"""
+        params = {k: v for k, v in fields.items() if k not in _UNSIGNED_FIELDS}
+        if not hmac.compare_digest(sign(params, self.secret), str(fields.get("signature") or "")):
+            raise HTTPException(status_code=401, detail="Invalid upload signature")
+        if time.time() - int(params.get("timestamp") or 0) > SIGNATURE_MAX_AGE:
+            raise HTTPException(status_code=401, detail="Upload signature expired")
+        return self.upload(file, resource_type, public_id=params.get("public_id"), filename=filename)
+
+    def url(self, result):
+        suffix = f".{result['format']}" if result.get("format") else ""
+        return f"{self.files_url}/{result['public_id']}{suffix}"
+
+    @property
+    def files_url(self) -> str:
+        return f"{self.base_url}/api/uploads/local/files"
+
+    def local_path(self, url):
+        if not url.startswith(self.files_url + "/"):
+            return None
+        path = self.path(url[len(self.files_url) + 1:])
+        return path if os.path.isfile(path) else None
+
+    def list_resources(self, resource_type, prefix, cursor=None):
+        # Public ids in sorted order; the cursor is the last one returned
+        directory = self.path(prefix.rstrip("/"))
+        entries = []
+        for folder, _, names in os.walk(directory):
+            for name in names:
+                path = os.path.join(folder, name)
+                public_id = os.path.splitext(os.path.relpath(path, self.root))[0].replace(os.sep, "/")
+                if cursor is None or public_id > cursor:
+                    entries.append((public_id, path))
+        entries.sort()
+
+        page = []
+        for public_id, path in entries[:LIST_PAGE_SIZE]:
+            stat = os.stat(path)
+            page.append({
+                "public_id": public_id,
+                "bytes": stat.st_size,
+                "created_at": datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat(),
+            })
+        return page, page[-1]["public_id"] if len(entries) > LIST_PAGE_SIZE else None
+
+    def public_id(self, url):
+        if not url.startswith(self.files_url + "/"):
+            return None
+        return os.path.splitext(url[len(self.files_url) + 1:])[0]
+
+    def _files(self, public_id: str):
+        directory, name = os.path.split(self.path(public_id))
+        if not os.path.isdir(directory):
+            return []
+        return [
+            os.path.join(directory, entry) for entry in os.listdir(directory)
+            if entry == name or os.path.splitext(entry)[0] == name
+        ]
+
+    def resource(self, public_id, resource_type="image"):
+        for path in self._files(public_id):
+            stat = os.stat(path)
+            return {
+                "public_id": public_id,
+                "resource_type": resource_type,
+                "format": os.path.splitext(path)[1].lstrip(".") or None,
+                "version": int(stat.st_mtime),
+                "bytes": stat.st_size,
+            }
+        return None
+
+    def delete(self, public_id, resource_type="image"):
+        for path in self._files(public_id):
+            os.remove(path)
+
+
+@lru_cache(maxsize=1)
+def get_storage() -> StorageBackend:
+    if settings.storage_backend == "local":
+        return LocalStorage(settings.local_storage_dir)
+    if settings.storage_backend == "cloudinary":
+        return CloudinaryStorage()
+    raise ValueError(f"Unknown STORAGE_BACKEND {settings.storage_backend!r}, expected 'cloudinary' or 'local'")
+
+def upload_file(file, resource_type: str = "image", **options) -> dict:
+    """Upload a file object through the API server and return the upload result"""
+    return get_storage().upload(file, resource_type, **options)
@@ -1,7 +1,37 @@
-from supabase import create_client, Client
+from functools import lru_cache
+from typing import TYPE_CHECKING
 from app.core.config import settings
+from app.core.http import get_http_client
+from app.core.read_routing import reads_from_replica
 
-supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+if TYPE_CHECKING:
+    from supabase import Client
 
-def get_supabase() -> Client:
-    return supabase
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_primary_supabase() -> "Client":
+    """Build the Supabase client on first use so cold starts don't pay for it"""
+    from supabase import create_client
+    from supabase.lib.client_options import SyncClientOptions
+
+    return create_client(settings.supabase_url, settings.supabase_key, SyncClientOptions(httpx_client=get_http_client()))
+
+@lru_cache(maxsize=1)
+def get_replica_supabase() -> "Client":
+    """Client for the read replica (SUPABASE_READ_URL)"""
+    from supabase import create_client
+    from supabase.lib.client_options import SyncClientOptions
+
+    return create_client(
+        settings.supabase_read_url,
+        settings.supabase_read_key or settings.supabase_key,
+        SyncClientOptions(httpx_client=get_http_client())
+    )
+
+def get_supabase() -> "Client":
+    """
+    The client for the current request: the replica inside routes annotated
+    with `replica_reads` (see app/core/read_routing.py), the primary otherwise.
+    """
+    if reads_from_replica():
+        return get_replica_supabase()
+    return get_primary_supabase()
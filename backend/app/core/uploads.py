@@ -0,0 +1,131 @@
+import mimetypes
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+import jwt
+from fastapi import HTTPException
+from app.core.config import settings
+from app.core.enums import UploadPurpose, UserRole
+from app.core.storage import get_storage
+from app.core.supabase import get_primary_supabase
+
+# Signed direct uploads. Instead of streaming files through the API, a client
+# asks for an upload ticket, posts the file straight to storage, then sends the
+# storage response back to a "finalize" route, which checks it here before any
+# row is written:
+#   1. the upload token (a short-lived JWT) is ours, unexpired, and was issued
+#      to this user for this purpose;
+#   2. the public id is the one the token was issued for;
+#   3. storage's signature over (public_id, version) is valid;
+#   4. the stored file (looked up in storage under the resource type the token
+#      was issued for, not the one the client reports) is within the
+#      purpose's size limit; oversized files are deleted;
+#   5. the upload has not been finalized before (claim_upload,
+#      migrations/0019_upload_finalizations.sql), so a replayed token cannot
+#      attach one file to a second row.
+# Upload tokens carry an audience, so they are rejected as access tokens.
+
+UPLOAD_AUDIENCE = "upload"
+
+MB = 1024 * 1024
+
+@dataclass(frozen=True)
+class UploadPolicy:
+    folder: str
+    resource_type: str
+    max_bytes: int
+    admin_only: bool = False
+    options: dict = field(default_factory=dict)
+
+UPLOAD_POLICIES = {
+    UploadPurpose.PAYMENT_RECEIPT: UploadPolicy("wmou_portal/payment_receipts", "image", 10 * MB),
+    UploadPurpose.COURSE_MATERIAL: UploadPolicy("wmou_portal/course_materials", "auto", 100 * MB, admin_only=True),
+    UploadPurpose.PROFILE_PICTURE: UploadPolicy(
+        "wmou/profile_pictures", "image", 5 * MB,
+        options={"transformation": [{"width": 400, "height": 400, "crop": "fill"}]}
+    ),
+}
+
+def issue_upload(user: dict, purpose: UploadPurpose) -> dict:
+    """Upload ticket: where to post the file, the signed form fields, and the token to finalize with"""
+    policy = UPLOAD_POLICIES[purpose]
+    if policy.admin_only and user["role"] != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    public_id = f"{policy.folder}/{uuid.uuid4().hex}"
+    expires_at = datetime.now(timezone.utc) + timedelta(seconds=settings.upload_token_ttl_seconds)
+    token = jwt.encode(
+        {
+            "aud": UPLOAD_AUDIENCE,
+            "sub": user["id"],
+            "purpose": purpose.value,
+            "public_id": public_id,
+            "resource_type": policy.resource_type,
+            "max_bytes": policy.max_bytes,
+            "exp": expires_at,
+        },
+        settings.secret_key,
+        algorithm=settings.algorithm
+    )
+    target = get_storage().direct_upload(public_id, policy.resource_type, policy.options)
+
+    return {
+        "upload_token": token,
+        "upload_url": target["url"],
+        "fields": target["fields"],
+        "max_bytes": policy.max_bytes,
+        "expires_at": expires_at.isoformat(),
+    }
+
+def finalize_upload(user: dict, purpose: UploadPurpose, upload_token: str, result: dict) -> dict:
+    """Verify a direct upload; returns {"url", "public_id", "bytes", "content_type"}"""
+    try:
+        claims = jwt.decode(upload_token, settings.secret_key, algorithms=[settings.algorithm], audience=UPLOAD_AUDIENCE)
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=400, detail="Upload token expired, please upload again")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=400, detail="Invalid upload token")
+
+    if claims.get("sub") != user["id"] or claims.get("purpose") != purpose.value:
+        raise HTTPException(status_code=403, detail="Upload token was issued for something else")
+
+    storage = get_storage()
+    if result.get("public_id") != claims["public_id"] or not storage.verify_result(result):
+        raise HTTPException(status_code=400, detail="Upload could not be verified")
+
+    # Sizes, formats and the resource type in the client's copy of the result
+    # are not signed. "auto" lets storage pick the type, so look the file up
+    # under each type it may have (the client's answer is only tried first)
+    claimed_type = claims.get("resource_type", UPLOAD_POLICIES[purpose].resource_type)
+    if claimed_type == "auto":
+        candidates = sorted(storage.resource_types, key=lambda t: t != result.get("resource_type"))
+    else:
+        candidates = [claimed_type]
+
+    stored = None
+    for resource_type in candidates:
+        stored = storage.resource(result["public_id"], resource_type)
+        if stored is not None:
+            break
+    if stored is None:
+        raise HTTPException(status_code=400, detail="Uploaded file not found")
+    if stored["bytes"] > claims["max_bytes"]:
+        storage.delete(result["public_id"], resource_type)
+        raise HTTPException(status_code=413, detail=f"File is larger than {claims['max_bytes'] // MB} MB")
+
+    claimed = get_primary_supabase().rpc("claim_upload", {
+        "p_public_id": result["public_id"],
+        "p_user_id": user["id"],
+        "p_purpose": purpose.value,
+        "p_expires_at": datetime.fromtimestamp(claims["exp"], timezone.utc).isoformat(),
+    }).execute().data
+    if not claimed:
+        raise HTTPException(status_code=409, detail="This upload has already been finalized")
+
+    verified = {**stored, "public_id": result["public_id"], "version": result["version"], "resource_type": resource_type}
+    return {
+        "url": storage.url(verified),
+        "public_id": result["public_id"],
+        "bytes": stored["bytes"],
+        "content_type": mimetypes.guess_type(f"file.{stored['format']}")[0] if stored.get("format") else None,
+    }
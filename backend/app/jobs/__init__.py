@@ -0,0 +1,71 @@
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+from app.core.config import settings
+from app.jobs.store import JobStore, PostgresJobStore, SQLiteJobStore
+
+# Durable background jobs. The API only enqueues (one insert); `python -m
+# app.worker` claims, runs, retries and dead-letters them. Handlers register
+# themselves in app/jobs/handlers.py.
+
+@dataclass
+class JobHandler:
+    kind: str
+    func: Callable
+    # Batch handlers receive a list of payloads and return a list of errors
+    # (None for success) in the same order, e.g. to share one SMTP connection.
+    # Other handlers are called as func(payload, progress) and may return a
+    # result dict.
+    batch: bool = False
+    # Payload is wiped once the job succeeds or is dead-lettered (it carries a
+    # sealed password, say)
+    sensitive: bool = False
+    # Whether the cron drain (a time-boxed serverless function) may run it:
+    # the job either finishes in seconds or checkpoints and raises JobPaused
+    # when its time is up. Others need `python -m app.worker`.
+    cron: bool = True
+
+HANDLERS: Dict[str, JobHandler] = {}
+
+class JobPaused(Exception):
+    """Raised by a handler that reported its progress and stopped because its time was up"""
+
+class JobProgress:
+    """Lets a long-running handler publish progress (and resume after a retry or pause)"""
+
+    def __init__(self, store: JobStore, job: dict, deadline: Optional[float] = None):
+        self.store = store
+        self.job_id = job["id"]
+        # Whatever the previous attempt last reported, e.g. a keyset cursor
+        self.previous: dict = job.get("result") or {}
+        # time.monotonic() by which the handler should pause; None in the worker
+        self.deadline = deadline
+
+    def report(self, result: dict):
+        self.store.update_result(self.job_id, result)
+
+    def out_of_time(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+def job_handler(kind: str, batch: bool = False, sensitive: bool = False, cron: bool = True):
+    def register(func: Callable) -> Callable:
+        HANDLERS[kind] = JobHandler(kind, func, batch, sensitive, cron)
+        return func
+    return register
+
+@lru_cache(maxsize=1)
+def get_job_store() -> JobStore:
+    if settings.job_store == "sqlite":
+        return SQLiteJobStore(settings.job_sqlite_path)
+    return PostgresJobStore()
+
+def enqueue(kind: str, payload: dict, run_at: Optional[datetime] = None, max_attempts: Optional[int] = None) -> dict:
+    """Persist a job for the worker; returns the stored job row"""
+    return get_job_store().enqueue(kind, payload, max_attempts or settings.job_max_attempts, run_at)
+
+def enqueue_many(kind: str, payloads: List[dict]):
+    """Enqueue a batch of same-kind jobs with a single insert"""
+    if payloads:
+        get_job_store().enqueue_many(kind, payloads, settings.job_max_attempts)
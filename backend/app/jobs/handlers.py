@@ -0,0 +1,162 @@
+from typing import List, Optional
+from app.core.config import settings
+from app.core.enums import UserRole, StudentStatus
+from app.core.projections import ANNOUNCEMENT
+from app.core.security import unseal
+from app.core.supabase import get_supabase
+from app.jobs import JobPaused, JobProgress, job_handler
+from app.services import asset_gc, documents
+from app.utils.email_service import get_email_service
+from app.utils.export import iter_keyset
+
+# Job kinds run by the worker. Email jobs are batched so one SMTP login covers
+# every message claimed in the same poll; announcement broadcasts are one job
+# each and pace themselves (see EmailService.send_bulk).
+
+USER_WELCOME_EMAIL = "email.user_welcome"
+PAYMENT_APPROVAL_EMAIL = "email.payment_approval"
+ANNOUNCEMENT_BROADCAST = "email.announcement_broadcast"
+STORAGE_GC = "storage.gc"
+DOCUMENT_RENDER = documents.RENDER_JOB
+
+# Students fetched per round-trip while resolving broadcast recipients
+BROADCAST_PAGE_SIZE = 1000
+# A welcome email whose sealed password is older than this is dead-lettered
+# rather than sent; the admin resets the password instead
+WELCOME_PASSWORD_MAX_AGE = 7 * 24 * 3600
+
+
+@job_handler(USER_WELCOME_EMAIL, batch=True, sensitive=True)
+def send_user_welcome_emails(payloads: List[dict]) -> List[Optional[str]]:
+    service = get_email_service()
+    errors: List[Optional[str]] = [None] * len(payloads)
+    messages, slots = [], []
+    for i, p in enumerate(payloads):
+        try:
+            password = unseal(p["sealed_password"], WELCOME_PASSWORD_MAX_AGE)
+        except ValueError as exc:
+            # Only this job fails; the rest of the batch is still sent
+            errors[i] = str(exc)
+            continue
+        subject, body = service.user_welcome_message(p["full_name"], p["reg_no"], password)
+        messages.append((p["student_email"], subject, body))
+        slots.append(i)
+    for i, error in zip(slots, service.send_batch(messages) if messages else []):
+        errors[i] = error
+    return errors
+
+
+@job_handler(PAYMENT_APPROVAL_EMAIL, batch=True)
+def send_payment_approval_emails(payloads: List[dict]) -> List[Optional[str]]:
+    service = get_email_service()
+    messages = []
+    for p in payloads:
+        subject, body = service.payment_approval_message(p["course_name"], p["approved"], p.get("rejection_reason"))
+        messages.append((p["student_email"], subject, body))
+    return service.send_batch(messages)
+
+
+@job_handler(ANNOUNCEMENT_BROADCAST)
+def broadcast_announcement(payload: dict, progress: JobProgress) -> dict:
+    """
+    Email an announcement to every active student it targets. Recipients come
+    from one keyset walk over users; the message is rendered once per
+    department. Progress (with the keyset cursor) is stored on the job, so a
+    retried broadcast resumes after the last student already handled. Under
+    the cron drain it pauses when its time is up and resumes on the next run.
+    """
+    announcement = (
+        get_supabase().table("announcements")
+        .select(ANNOUNCEMENT)
+        .eq("id", payload["announcement_id"])
+        .limit(1)
+        .execute()
+        .data
+    )
+    if not announcement:
+        return {"skipped": "Announcement no longer exists"}
+    announcement = announcement[0]
+
+    service = get_email_service()
+    if not service.is_configured:
+        return {"skipped": "Email not configured"}
+
+    department = announcement.get("target_department")
+
+    def build_query(**select_options):
+        query = (
+            get_supabase().table("users")
+            .select("id, email, department", **select_options)
+            .eq("role", UserRole.STUDENT)
+            .eq("status", StudentStatus.ACTIVE)
+            .not_.is_("email", "null")
+        )
+        if department:
+            query = query.eq("department", department)
+        return query
+
+    previous = progress.previous
+    total = previous.get("total")
+    if total is None:
+        total = build_query(count="exact").limit(1).execute().count or 0
+    done_before = previous.get("processed", 0)
+
+    rendered = {}
+    cursor = {"id": previous.get("cursor"), "processed": done_before, "paused": False}
+
+    def recipients():
+        for user in iter_keyset(build_query, batch_size=BROADCAST_PAGE_SIZE, start_after=cursor["id"]):
+            if progress.out_of_time():
+                # Everyone up to the cursor has been handled; pick up from there
+                cursor["paused"] = True
+                return
+            dept = user.get("department")
+            if dept not in rendered:
+                rendered[dept] = service.render_bulk(*service.announcement_message(
+                    announcement["title"], announcement["content"], dept
+                ))
+            cursor["id"] = user["id"]
+            cursor["processed"] += 1
+            yield user["email"], rendered[dept]
+
+    def report(stats: dict):
+        # Called between connections, so every yielded recipient has been handled
+        progress.report({
+            **stats,
+            "total": total,
+            "processed": cursor["processed"],
+            "cursor": cursor["id"],
+            "announcement_id": announcement["id"],
+        })
+
+    stats = service.send_bulk(
+        recipients(),
+        settings.broadcast_rate_per_second,
+        settings.smtp_messages_per_connection,
+        report
+    )
+    if cursor["paused"]:
+        raise JobPaused()
+    return {
+        **stats,
+        "total": total,
+        "processed": cursor["processed"],
+        "cursor": cursor["id"],
+        "announcement_id": announcement["id"],
+    }
+
+
+@job_handler(STORAGE_GC, cron=False)
+def collect_orphaned_files(payload: dict, progress: JobProgress) -> dict:
+    """
+    Delete stored files no row refers to (see app/services/asset_gc.py); a
+    dry run only reports them. Deleting is idempotent, so a retried run just
+    starts the scan over.
+    """
+    return asset_gc.collect(payload.get("dry_run", True), progress.report)
+
+
+@job_handler(DOCUMENT_RENDER)
+def render_document(payload: dict, progress: JobProgress) -> dict:
+    """Render a requested PDF and put it in storage (see app/services/documents.py)"""
+    return documents.render_and_store(payload["student_id"], payload["document_id"], payload["kind"], payload["data"])
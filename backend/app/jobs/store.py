@@ -0,0 +1,256 @@
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from postgrest.types import ReturnMethod
+from app.core.supabase import get_supabase
+
+# Job storage backends. Postgres (the `jobs` table from
+# migrations/0003_jobs.sql, reached through Supabase) is the durable default;
+# SQLite gives the same semantics on a laptop without a database.
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+DEAD = "dead"
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobStore:
+    def enqueue(self, kind: str, payload: dict, max_attempts: int, run_at: Optional[datetime] = None) -> dict:
+        raise NotImplementedError
+
+    def enqueue_many(self, kind: str, payloads: List[dict], max_attempts: int):
+        """One insert for a batch of jobs of the same kind"""
+        raise NotImplementedError
+
+    def claim(self, worker_id: str, limit: int, lease_seconds: int, kinds: Optional[List[str]] = None) -> List[dict]:
+        """Mark up to `limit` due jobs (of `kinds`, if given) as running for this worker and return them"""
+        raise NotImplementedError
+
+    def release(self, job_id: int, attempts: int):
+        """Requeue a claimed job without counting the attempt (it paused, or was never started)"""
+        raise NotImplementedError
+
+    def complete(self, job_ids: List[int], result: Optional[dict] = None, clear_payload: bool = False):
+        """Mark jobs done; `clear_payload` drops payloads holding secrets (e.g. temporary passwords)"""
+        raise NotImplementedError
+
+    def update_result(self, job_id: int, result: dict):
+        """Store progress of a running job; also renews its lease so long jobs are not reclaimed"""
+        raise NotImplementedError
+
+    def fail(self, job_id: int, error: str, retry_at: Optional[datetime], clear_payload: bool = False):
+        """Record a failure; requeue at `retry_at`, or dead-letter the job when it is None (wiping its payload if asked)"""
+        raise NotImplementedError
+
+    def get(self, job_id: int) -> Optional[dict]:
+        raise NotImplementedError
+
+    def find_latest(self, kind: str, match: dict) -> Optional[dict]:
+        """Newest job of `kind` whose payload has the given top-level values: {id, status}"""
+        raise NotImplementedError
+
+
+class PostgresJobStore(JobStore):
+    def enqueue(self, kind, payload, max_attempts, run_at=None):
+        row = {"kind": kind, "payload": payload, "max_attempts": max_attempts}
+        if run_at:
+            row["run_at"] = run_at.isoformat()
+        return get_supabase().table("jobs").insert(row).execute().data[0]
+
+    def enqueue_many(self, kind, payloads, max_attempts):
+        rows = [{"kind": kind, "payload": p, "max_attempts": max_attempts} for p in payloads]
+        get_supabase().table("jobs").insert(rows, returning=ReturnMethod.minimal).execute()
+
+    def claim(self, worker_id, limit, lease_seconds, kinds=None):
+        params = {"p_worker": worker_id, "p_limit": limit, "p_lease_seconds": lease_seconds}
+        if kinds is not None:
+            params["p_kinds"] = kinds
+        return get_supabase().rpc("claim_jobs", params).execute().data or []
+
+    def release(self, job_id, attempts):
+        get_supabase().table("jobs").update({
+            "status": QUEUED,
+            "attempts": max(attempts - 1, 0),
+            "run_at": _now().isoformat(),
+            "locked_by": None,
+        }).eq("id", job_id).execute()
+
+    def complete(self, job_ids, result=None, clear_payload=False):
+        update = {"status": DONE, "finished_at": _now().isoformat(), "locked_by": None}
+        if result is not None:
+            update["result"] = result
+        if clear_payload:
+            update["payload"] = {}
+        get_supabase().table("jobs").update(update).in_("id", job_ids).execute()
+
+    def update_result(self, job_id, result):
+        get_supabase().table("jobs").update({"result": result, "locked_at": _now().isoformat()}).eq("id", job_id).execute()
+
+    def fail(self, job_id, error, retry_at, clear_payload=False):
+        update = {"last_error": error[:2000], "locked_by": None}
+        if retry_at is None:
+            update.update({"status": DEAD, "finished_at": _now().isoformat()})
+            if clear_payload:
+                update["payload"] = {}
+        else:
+            update.update({"status": QUEUED, "run_at": retry_at.isoformat()})
+        get_supabase().table("jobs").update(update).eq("id", job_id).execute()
+
+    def get(self, job_id):
+        rows = get_supabase().table("jobs")\
+            .select("id, kind, status, attempts, max_attempts, run_at, last_error, result, created_at, finished_at")\
+            .eq("id", job_id)\
+            .execute()\
+            .data
+        return rows[0] if rows else None
+
+    def find_latest(self, kind, match):
+        query = get_supabase().table("jobs").select("id, status").eq("kind", kind)
+        for key, value in match.items():
+            query = query.eq(f"payload->>{key}", value)
+        rows = query.order("id", desc=True).limit(1).execute().data
+        return rows[0] if rows else None
+
+
+class SQLiteJobStore(JobStore):
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("""
+                create table if not exists jobs (
+                    id integer primary key autoincrement,
+                    kind text not null,
+                    payload text not null,
+                    status text not null default 'queued',
+                    attempts integer not null default 0,
+                    max_attempts integer not null default 5,
+                    run_at text not null,
+                    locked_at text,
+                    locked_by text,
+                    last_error text,
+                    result text,
+                    created_at text not null,
+                    finished_at text
+                )
+            """)
+            conn.execute("create index if not exists jobs_claimable_idx on jobs (status, run_at)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row(row: sqlite3.Row) -> dict:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job.get("result") else None
+        return job
+
+    def enqueue(self, kind, payload, max_attempts, run_at=None):
+        now = _now().isoformat()
+        with self._lock, self._connect() as conn:
+            cursor = conn.execute(
+                "insert into jobs (kind, payload, max_attempts, run_at, created_at) values (?, ?, ?, ?, ?)",
+                (kind, json.dumps(payload), max_attempts, (run_at.isoformat() if run_at else now), now)
+            )
+            return self._row(conn.execute("select * from jobs where id = ?", (cursor.lastrowid,)).fetchone())
+
+    def enqueue_many(self, kind, payloads, max_attempts):
+        now = _now().isoformat()
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "insert into jobs (kind, payload, max_attempts, run_at, created_at) values (?, ?, ?, ?, ?)",
+                [(kind, json.dumps(p), max_attempts, now, now) for p in payloads]
+            )
+
+    def claim(self, worker_id, limit, lease_seconds, kinds=None):
+        now = _now()
+        stale = (now - timedelta(seconds=lease_seconds)).isoformat()
+        kind_filter = f" and kind in ({','.join('?' * len(kinds))})" if kinds is not None else ""
+        with self._lock, self._connect() as conn:
+            conn.execute("begin immediate")
+            rows = conn.execute(
+                f"""
+                select id from jobs
+                where ((status = 'queued' and run_at <= ?) or (status = 'running' and locked_at < ?)){kind_filter}
+                order by run_at limit ?
+                """,
+                (now.isoformat(), stale, *(kinds or ()), limit)
+            ).fetchall()
+            ids = [r["id"] for r in rows]
+            if ids:
+                marks = ",".join("?" * len(ids))
+                conn.execute(
+                    f"update jobs set status = 'running', locked_at = ?, locked_by = ?, attempts = attempts + 1 where id in ({marks})",
+                    (now.isoformat(), worker_id, *ids)
+                )
+            conn.execute("commit")
+            if not ids:
+                return []
+            return [self._row(r) for r in conn.execute(f"select * from jobs where id in ({marks})", ids).fetchall()]
+
+    def complete(self, job_ids, result=None, clear_payload=False):
+        marks = ",".join("?" * len(job_ids))
+        payload = "case when ? then '{}' else payload end"
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                f"update jobs set status = 'done', finished_at = ?, locked_by = null, result = coalesce(?, result), "
+                f"payload = {payload} where id in ({marks})",
+                (_now().isoformat(), json.dumps(result) if result is not None else None, clear_payload, *job_ids)
+            )
+
+    def release(self, job_id, attempts):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "update jobs set status = 'queued', attempts = ?, run_at = ?, locked_by = null where id = ?",
+                (max(attempts - 1, 0), _now().isoformat(), job_id)
+            )
+
+    def update_result(self, job_id, result):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "update jobs set result = ?, locked_at = ? where id = ?",
+                (json.dumps(result), _now().isoformat(), job_id)
+            )
+
+    def fail(self, job_id, error, retry_at, clear_payload=False):
+        with self._lock, self._connect() as conn:
+            if retry_at is None:
+                conn.execute(
+                    "update jobs set status = 'dead', last_error = ?, finished_at = ?, locked_by = null, "
+                    "payload = case when ? then '{}' else payload end where id = ?",
+                    (error[:2000], _now().isoformat(), clear_payload, job_id)
+                )
+            else:
+                conn.execute(
+                    "update jobs set status = 'queued', last_error = ?, run_at = ?, locked_by = null where id = ?",
+                    (error[:2000], retry_at.isoformat(), job_id)
+                )
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute("select * from jobs where id = ?", (job_id,)).fetchone()
+            return self._row(row) if row else None
+
+    def find_latest(self, kind, match):
+        conditions = "".join(" and json_extract(payload, ?) = ?" for _ in match)
+        params = [value for key, v in match.items() for value in (f"$.{key}", v)]
+        with self._connect() as conn:
+            row = conn.execute(
+                f"select id, status from jobs where kind = ?{conditions} order by id desc limit 1",
+                (kind, *params)
+            ).fetchone()
+            return dict(row) if row else None
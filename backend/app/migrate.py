@@ -0,0 +1,64 @@
+import argparse
+import asyncio
+from pathlib import Path
+from app.core.config import settings
+
+# Applies migrations/*.sql in filename order and records each one in
+# schema_migrations, so a database only runs what it has not seen yet:
+#
+#   python -m app.migrate            # apply pending migrations
+#   python -m app.migrate --status   # list applied / pending
+#
+# Every file is also safe to run by hand (psql or the Supabase SQL editor);
+# databases migrated that way just re-apply them once here as no-ops.
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+
+
+def migration_files():
+    return sorted(MIGRATIONS_DIR.glob("[0-9][0-9][0-9][0-9]_*.sql"))
+
+
+async def migrate(dsn: str, status_only: bool = False):
+    import asyncpg
+
+    conn = await asyncpg.connect(dsn)
+    try:
+        await conn.execute("""
+            create table if not exists schema_migrations (
+                version text primary key,
+                applied_at timestamptz not null default now()
+            )
+        """)
+        applied = {r["version"] for r in await conn.fetch("select version from schema_migrations")}
+
+        for path in migration_files():
+            version = path.stem
+            if version in applied:
+                print(f"applied  {version}")
+                continue
+            if status_only:
+                print(f"pending  {version}")
+                continue
+
+            async with conn.transaction():
+                await conn.execute(path.read_text())
+                await conn.execute("insert into schema_migrations (version) values ($1)", version)
+            print(f"migrated {version}")
+    finally:
+        await conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply database migrations")
+    parser.add_argument("--dsn", default=settings.database_url, help="Postgres URL (defaults to DATABASE_URL)")
+    parser.add_argument("--status", action="store_true", help="Only list applied and pending migrations")
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("DATABASE_URL is not set; pass --dsn")
+
+    asyncio.run(migrate(args.dsn, args.status))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+# Domain routers, mounted by app.main according to settings.enabled_routers.
+# Each module exposes `router` (student/shared routes) and, where it has
+# any, `admin_router` (routes under /api/admin).
+ROUTER_MODULES = {
+    "auth": "app.routers.auth",
+    "users": "app.routers.users",
+    "courses": "app.routers.courses",
+    "payments": "app.routers.payments",
+    "materials": "app.routers.materials",
+    "results": "app.routers.results",
+    "announcements": "app.routers.announcements",
+    "dashboard": "app.routers.dashboard",
+    "analytics": "app.routers.analytics",
+    "audit": "app.routers.audit",
+    "documents": "app.routers.documents",
+    "search": "app.routers.search",
+    "cart": "app.routers.cart",
+    "system": "app.routers.system",
+    "uploads": "app.routers.uploads",
+    "jobs": "app.routers.jobs",
+}
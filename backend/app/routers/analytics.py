@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from datetime import date, timedelta
+from app.core.config import settings
+from app.core.deps import get_admin_user
+from app.core.enums import AnalyticsMetric, Granularity
+from app.core.read_routing import replica_reads
+from app.services import analytics
+
+router = APIRouter(tags=["Analytics"])
+admin_router = APIRouter(tags=["Analytics (Admin)"])
+
+# Range shown when the caller gives no start date
+DEFAULT_SPAN = {
+    Granularity.DAY: timedelta(days=29),
+    Granularity.WEEK: timedelta(weeks=11),
+    Granularity.MONTH: timedelta(days=334),
+    Granularity.SESSION: timedelta(days=4 * 365),
+}
+
+# ============= ANALYTICS =============
+
+@admin_router.get("/api/admin/analytics/{metric}", dependencies=[Depends(replica_reads)])
+def get_analytics_series(
+    metric: AnalyticsMetric,
+    granularity: Granularity = Granularity.MONTH,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    admin: dict = Depends(get_admin_user)
+):
+    """
+    Revenue, payment volume, new students or registrations per day, week,
+    month or academic session. Both dates are inclusive and the range is
+    widened to whole buckets; buckets with no activity are returned as zero.
+    """
+    end = end or analytics.local_now().date()
+    start = start or end - DEFAULT_SPAN[granularity]
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+
+    try:
+        points = analytics.series(metric, granularity, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "metric": metric,
+        "granularity": granularity,
+        "timezone": settings.analytics_timezone,
+        "start": points[0]["bucket"],
+        "end": end.isoformat(),
+        "total": sum(p["total"] for p in points),
+        "count": sum(p["count"] for p in points),
+        "points": points,
+    }
@@ -0,0 +1,91 @@
+from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime, timezone
+from app.core.deps import get_current_user, get_admin_user, get_token_payload
+from app.core.enums import AuditAction, UserRole
+from app.core.projections import ANNOUNCEMENT, USER_NAME, columns, embed
+from app.core.read_routing import replica_reads
+from app.core.supabase import get_supabase
+from app.jobs import enqueue, get_job_store
+from app.jobs.handlers import ANNOUNCEMENT_BROADCAST
+from app.schemas.announcement import AnnouncementCreate
+from app.services import audit
+
+router = APIRouter(tags=["Announcements"])
+admin_router = APIRouter(tags=["Announcements (Admin)"])
+
+# ============= ANNOUNCEMENTS =============
+
+@admin_router.post("/api/admin/announcements")
+def create_announcement(announcement: AnnouncementCreate, admin: dict = Depends(get_admin_user)):
+    """Create announcement; with broadcast, email it to the targeted students in the background"""
+    announcement_data = {
+        **announcement.dict(exclude={"broadcast"}),
+        "created_by": admin["id"],
+        "created_at": datetime.utcnow().isoformat()
+    }
+    response = get_supabase().table("announcements").insert(announcement_data).execute()
+    created = response.data[0]
+    audit.record(admin, AuditAction.ANNOUNCEMENT_CREATED, "announcement", created["id"], broadcast=announcement.broadcast)
+
+    if not announcement.broadcast:
+        return {"message": "Announcement created", "announcement": created}
+
+    # The worker resolves recipients and sends; the request only pays for one insert
+    job = enqueue(ANNOUNCEMENT_BROADCAST, {"announcement_id": created["id"]})
+    return {"message": "Announcement created, broadcast queued", "announcement": created, "broadcast_job_id": job["id"]}
+
+@admin_router.get("/api/admin/announcements/broadcasts/{job_id}")
+def get_broadcast_status(job_id: int, admin: dict = Depends(get_admin_user)):
+    """Progress of a broadcast: sent/failed/processed of total, send rate and elapsed time"""
+    job = get_job_store().get(job_id)
+    if not job or job["kind"] != ANNOUNCEMENT_BROADCAST:
+        raise HTTPException(status_code=404, detail="Broadcast not found")
+
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "progress": job.get("result") or {},
+        "last_error": job.get("last_error"),
+        "created_at": job.get("created_at"),
+        "finished_at": job.get("finished_at"),
+    }
+
+@router.get("/api/announcements", dependencies=[Depends(replica_reads)])
+def get_announcements(
+    current_user: dict = Depends(get_current_user),
+    page: int = 1,
+    limit: int = 10
+):
+    """Get announcements for user's department"""
+    offset = (page - 1) * limit
+    
+    query = get_supabase().table("announcements").select(columns(ANNOUNCEMENT, embed("users", USER_NAME)), count="exact")
+    
+    if current_user["role"] == UserRole.STUDENT:
+        query = query.or_(f"target_department.eq.{current_user['department']},target_department.is.null")
+    
+    response = query.order("created_at", desc=True).range(offset, offset + limit - 1).execute()
+    return {
+        "data": response.data,
+        "total": response.count,
+        "page": page,
+        "limit": limit,
+        "total_pages": (response.count + limit - 1) // limit
+    }
+
+@router.post("/api/announcements/mark-read")
+def mark_announcements_read(token: dict = Depends(get_token_payload)):
+    """Clear the unread count on the student home screen"""
+    get_supabase().table("users")\
+        .update({"announcements_seen_at": datetime.now(timezone.utc).isoformat()})\
+        .eq("id", token["user_id"])\
+        .execute()
+    return {"message": "Announcements marked as read"}
+
+@admin_router.delete("/api/admin/announcements/{announcement_id}")
+def delete_announcement(announcement_id: int, admin: dict = Depends(get_admin_user)):
+    """Delete announcement"""
+    get_supabase().table("announcements").delete().eq("id", announcement_id).execute()
+    audit.record(admin, AuditAction.ANNOUNCEMENT_DELETED, "announcement", announcement_id)
+    return {"message": "Announcement deleted successfully"}
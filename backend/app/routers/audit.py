@@ -0,0 +1,66 @@
+import base64
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from app.core.deps import get_admin_user
+from app.core.enums import AuditAction
+from app.core.projections import AUDIT_EVENT
+from app.core.read_routing import replica_reads
+from app.core.supabase import get_supabase
+
+router = APIRouter(tags=["Audit"])
+admin_router = APIRouter(tags=["Audit (Admin)"])
+
+# ============= AUDIT LOG =============
+# Newest first, paged by a (created_at, id) cursor rather than an offset, so
+# deep pages cost the same as the first and no exact count is taken over an
+# ever-growing table. Each filter maps onto one of the audit_log indexes.
+
+def encode_cursor(row: dict) -> str:
+    return base64.urlsafe_b64encode(f"{row['created_at']}|{row['id']}".encode()).decode()
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, event_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at).isoformat(), int(event_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@admin_router.get("/api/admin/audit", dependencies=[Depends(replica_reads)])
+def get_audit_log(
+    admin: dict = Depends(get_admin_user),
+    actor_id: Optional[str] = None,
+    action: Optional[AuditAction] = None,
+    target_type: Optional[str] = None,
+    target_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200)
+):
+    """Audit events, newest first; pass `next_cursor` back as `cursor` for the next page"""
+    query = get_supabase().table("audit_log").select(AUDIT_EVENT)
+    if actor_id:
+        query = query.eq("actor_id", actor_id)
+    if action:
+        query = query.eq("action", action.value)
+    if target_type:
+        query = query.eq("target_type", target_type)
+    if target_id:
+        query = query.eq("target_id", target_id)
+    # Time bounds also prune monthly partitions
+    if since:
+        query = query.gte("created_at", since.isoformat())
+    if until:
+        query = query.lt("created_at", until.isoformat())
+    if cursor:
+        created_at, event_id = decode_cursor(cursor)
+        query = query.lte("created_at", created_at).or_(f'created_at.lt."{created_at}",id.lt.{event_id}')
+
+    rows = query.order("created_at", desc=True).order("id", desc=True).limit(limit + 1).execute().data
+
+    return {
+        "data": rows[:limit],
+        "next_cursor": encode_cursor(rows[limit - 1]) if len(rows) > limit else None,
+        "limit": limit
+    }
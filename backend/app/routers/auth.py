@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from app.core.config import settings
+from app.core.deps import get_current_user
+from app.core.enums import UserRole, StudentStatus
+from app.core.projections import LOGIN_USER
+from app.core.rate_limit import client_ip, enforce
+from app.core.security import hash_password, verify_password, create_access_token
+from app.core.supabase import get_supabase
+from app.schemas.auth import LoginRequest, TokenResponse, PasswordChange
+
+router = APIRouter(tags=["Auth"])
+
+@router.post("/api/auth/login", response_model=TokenResponse)
+def login(request: LoginRequest, http_request: Request):
+    # Throttle before touching the database or running the (deliberately slow) hash check
+    enforce(f"login:ip:{client_ip(http_request)}", settings.login_rate_limit_ip)
+    enforce(f"login:reg_no:{request.reg_no.strip().upper()}", settings.login_rate_limit_reg_no)
+
+    response = get_supabase().table("users").select(LOGIN_USER).eq("reg_no", request.reg_no).execute()
+    
+    if not response.data:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    
+    user = response.data[0]
+    
+    if not verify_password(request.password, user["password"]):
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    
+    if user["role"] == UserRole.STUDENT and user.get("status") == StudentStatus.SUSPENDED:
+        raise HTTPException(status_code=403, detail="Account suspended")
+    
+    token = create_access_token({"user_id": str(user["id"]), "role": user["role"]})
+    
+    user_data = {k: v for k, v in user.items() if k != "password"}
+    
+    return TokenResponse(access_token=token, user=user_data)
+
+@router.post("/api/auth/change-password")
+def change_password(data: PasswordChange, current_user: dict = Depends(get_current_user)):
+    """Change user password"""
+    # Old-password guesses draw on the same per-reg_no budget as login
+    enforce(f"login:reg_no:{current_user['reg_no'].strip().upper()}", settings.login_rate_limit_reg_no)
+    # current_user never carries the hash, fetch it for this check only
+    stored = get_supabase().table("users").select("password").eq("id", current_user["id"]).single().execute()
+    if not verify_password(data.old_password, stored.data["password"]):
+        raise HTTPException(status_code=400, detail="Incorrect old password")
+    
+    new_hashed = hash_password(data.new_password)
+    get_supabase().table("users").update({"password": new_hashed}).eq("id", current_user["id"]).execute()
+    
+    return {"message": "Password changed successfully"}
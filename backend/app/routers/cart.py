@@ -0,0 +1,92 @@
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from typing import Optional
+from app.core.config import settings
+from app.core.deps import get_current_user
+from app.core.enums import UploadPurpose
+from app.core.rate_limit import rate_limit
+from app.core.storage import upload_file
+from app.core.uploads import finalize_upload
+from app.schemas.registration import CartCheckoutFinalize, CartItemsAdd
+from app.services import cart
+
+router = APIRouter(tags=["Registration Cart"])
+
+# ============= REGISTRATION CART =============
+
+def raise_for_problems(problems: list):
+    raise HTTPException(
+        status_code=cart.problem_status_code(problems),
+        detail={"message": "Some courses cannot be registered", "problems": problems}
+    )
+
+@router.get("/api/student/cart")
+def get_cart(session: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    """Cart contents with the fee total and anything that would block checkout"""
+    return cart.validate(current_user["id"], session=session)
+
+@router.post("/api/student/cart/items")
+def add_cart_items(data: CartItemsAdd, current_user: dict = Depends(get_current_user)):
+    """Add courses to the cart (courses already in it are ignored)"""
+    if cart.cart_size(current_user["id"]) + len(data.course_ids) > cart.MAX_CART_ITEMS:
+        raise HTTPException(status_code=400, detail=f"A cart holds at most {cart.MAX_CART_ITEMS} courses")
+
+    cart.add_items(current_user["id"], data.course_ids)
+    return cart.validate(current_user["id"])
+
+@router.delete("/api/student/cart/items/{course_id}")
+def remove_cart_item(course_id: int, current_user: dict = Depends(get_current_user)):
+    cart.remove_item(current_user["id"], course_id)
+    return cart.validate(current_user["id"])
+
+@router.delete("/api/student/cart")
+def clear_cart(current_user: dict = Depends(get_current_user)):
+    cart.clear(current_user["id"])
+    return {"message": "Cart cleared"}
+
+@router.post("/api/student/cart/checkout", dependencies=[Depends(rate_limit("upload", settings.upload_rate_limit))])
+def checkout_cart(
+    total_amount: float,
+    session: Optional[str] = None,
+    file: UploadFile = File(...),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Pay for the whole cart with one receipt. The cart is validated before the
+    receipt is uploaded, then validated again and turned into pending payments
+    in a single database call.
+    """
+    summary = validate_cart(current_user, total_amount, session)
+    upload_result = upload_file(file.file, folder="wmou_portal/payment_receipts")
+    return checkout_with_receipt(current_user, total_amount, session, summary, upload_result["secure_url"])
+
+@router.post("/api/student/cart/checkout/finalize")
+def finalize_cart_checkout(data: CartCheckoutFinalize, current_user: dict = Depends(get_current_user)):
+    """Checkout with a receipt uploaded directly to storage (ticket from /api/uploads/sign)"""
+    summary = validate_cart(current_user, data.total_amount, data.session)
+    upload = finalize_upload(current_user, UploadPurpose.PAYMENT_RECEIPT, data.upload_token, data.upload.model_dump())
+    return checkout_with_receipt(current_user, data.total_amount, data.session, summary, upload["url"])
+
+def validate_cart(current_user: dict, total_amount: float, session: Optional[str]) -> dict:
+    summary = cart.validate(current_user["id"], session=session)
+    if not summary["items"]:
+        raise HTTPException(status_code=400, detail="Cart is empty")
+    if summary["problems"]:
+        raise_for_problems(summary["problems"])
+    if abs(total_amount - summary["total"]) > 0.01:
+        raise HTTPException(status_code=400, detail=f"Amount mismatch. Expected: {summary['total']}, Received: {total_amount}")
+    return summary
+
+def checkout_with_receipt(current_user: dict, total_amount: float, session: Optional[str], summary: dict, receipt_url: str) -> dict:
+    outcome = cart.checkout(current_user["id"], receipt_url, total_amount, session=session)
+    if outcome["status"] == cart.INVALID:
+        raise_for_problems(outcome["problems"])
+    if outcome["status"] != cart.OK:
+        # The cart changed between validation and checkout (another tab, say)
+        raise HTTPException(status_code=409, detail="Cart changed during checkout, please review it and retry")
+
+    return {
+        "message": f"Payment proof uploaded for {len(outcome['payments'])} courses",
+        "courses": [line["course_code"] for line in summary["items"]],
+        "total_amount": outcome["total"],
+        "payments": outcome["payments"]
+    }
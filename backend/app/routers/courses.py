@@ -0,0 +1,240 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from datetime import datetime
+from functools import lru_cache
+from app.core.deps import get_current_user, get_admin_user
+from app.core.enums import AuditAction, UserRole
+from app.core.projections import COURSE, PAYMENT_STATUS, REGISTRATION, columns, embed
+from app.core.read_routing import replica_reads
+from app.core.resilience import hedged
+from app.core.supabase import get_supabase
+from app.schemas.course import CourseCreate, CourseUpdate
+from app.services import audit, sessions
+from app.services.course_index import course_index
+from app.services.registrations import release_seat
+
+router = APIRouter(tags=["Courses"])
+admin_router = APIRouter(tags=["Courses (Admin)"])
+
+# ============= COURSE MANAGEMENT =============
+
+@admin_router.post("/api/admin/courses")
+def create_course(course: CourseCreate, admin: dict = Depends(get_admin_user)):
+    """Create new course"""
+    course_data = {
+        **course.dict(),
+        "created_at": datetime.utcnow().isoformat()
+    }
+    response = get_supabase().table("courses").insert(course_data).execute()
+    invalidate_course_caches()
+    audit.record(admin, AuditAction.COURSE_CREATED, "course", response.data[0]["id"], course_code=course.course_code)
+    return {"message": "Course created successfully", "course": response.data[0]}
+
+@router.get("/api/courses", dependencies=[Depends(replica_reads)])
+def get_courses(
+    session: Optional[str] = None,
+    semester: Optional[str] = None,
+    department: Optional[str] = None,
+    page: int = 1,
+    limit: int = 20,
+    current_user: dict = Depends(get_current_user)
+):
+    offset = (page - 1) * limit
+
+    # --------------------------------------------------------------------
+    # STEP 1: COUNT QUERY (SAFE)
+    # --------------------------------------------------------------------
+    count_query = get_supabase().table("courses").select("id", count="exact")
+
+    if current_user["role"] == UserRole.STUDENT:
+        count_query = count_query.eq("department", current_user["department"])
+    elif department:
+        count_query = count_query.eq("department", department)
+
+    if session:
+        count_query = count_query.eq("session", session)
+
+    if semester:
+        count_query = count_query.eq("semester", semester)
+
+    with hedged():
+        count_res = count_query.execute()
+    total_count = count_res.count or 0
+    total_pages = (total_count + limit - 1) // limit
+
+    # If page is out of range, return empty data
+    if total_count == 0 or page > total_pages:
+        return {
+            "data": [],
+            "total": total_count,
+            "page": page,
+            "limit": limit,
+            "total_pages": total_pages
+        }
+
+    # --------------------------------------------------------------------
+    # STEP 2: MAIN QUERY (enrolled_count is maintained on the course row)
+    # --------------------------------------------------------------------
+    query = (
+        get_supabase()
+        .table("courses")
+        .select(COURSE)
+    )
+
+    if current_user["role"] == UserRole.STUDENT:
+        query = query.eq("department", current_user["department"])
+    elif department:
+        query = query.eq("department", department)
+
+    if session:
+        query = query.eq("session", session)
+
+    if semester:
+        query = query.eq("semester", semester)
+
+    with hedged():
+        response = query.range(offset, offset + limit - 1).execute()
+
+    # --------------------------------------------------------------------
+    # STEP 3: TRANSFORM TO MATCH FRONTEND
+    # --------------------------------------------------------------------
+    courses = [
+        {**c, "students_count": c.get("enrolled_count") or 0}
+        for c in response.data
+    ]
+
+    return {
+        "data": courses,
+        "total": total_count,
+        "page": page,
+        "limit": limit,
+        "total_pages": total_pages
+    }
+
+
+@lru_cache(maxsize=1)
+def get_cached_courses():
+    response = (
+        get_supabase()
+        .table("courses")
+        .select("id, title, course_code")
+        .order("title")
+        .execute()
+    )
+
+    if response.data is None:
+        raise Exception("Failed to fetch courses")
+
+    return response.data
+
+def invalidate_course_caches():
+    """Drop this process's copies of the catalog after a course write"""
+    get_cached_courses.cache_clear()
+    course_index.invalidate()
+
+@router.get("/api/courses_dropdown")
+def get_courses_dropdown(
+    current_user: dict = Depends(get_current_user)
+):
+    return {
+        "data": get_cached_courses()
+    }
+
+@admin_router.patch("/api/admin/courses/{course_id}")
+def update_course(course_id: int, course: CourseUpdate, admin: dict = Depends(get_admin_user)):
+    """Update course details"""
+    update_data = {k: v for k, v in course.dict().items() if v is not None}
+    get_supabase().table("courses").update(update_data).eq("id", course_id).execute()
+    invalidate_course_caches()
+    audit.record(admin, AuditAction.COURSE_UPDATED, "course", course_id, changes=update_data)
+    return {"message": "Course updated successfully"}
+
+@admin_router.delete("/api/admin/courses/{course_id}")
+def delete_course(course_id: int, admin: dict = Depends(get_admin_user)):
+    """Delete a course"""
+    get_supabase().table("courses").delete().eq("id", course_id).execute()
+    invalidate_course_caches()
+    audit.record(admin, AuditAction.COURSE_DELETED, "course", course_id)
+    return {"message": "Course deleted successfully"}
+
+# ============= COURSE REGISTRATION =============
+
+@admin_router.delete("/api/admin/courses/{course_id}/registrations/{student_id}")
+def remove_registration(course_id: int, student_id: str, admin: dict = Depends(get_admin_user)):
+    """Drop a student's registration and release the seat"""
+    if not release_seat(student_id, course_id):
+        raise HTTPException(status_code=404, detail="Registration not found")
+    audit.record(admin, AuditAction.REGISTRATION_REMOVED, "course", course_id, student_id=student_id)
+    return {"message": "Registration removed successfully"}
+
+@router.get("/api/student/registered-courses")
+def get_registered_courses(
+    current_user: dict = Depends(get_current_user),
+    page: int = 1,
+    limit: int = 20
+):
+    """Get all courses registered by student with payment status"""
+    offset = (page - 1) * limit
+    
+    response = get_supabase().table("course_registrations")\
+        .select(columns(REGISTRATION, embed("courses", COURSE)), count="exact")\
+        .eq("student_id", current_user["id"])\
+        .range(offset, offset + limit - 1)\
+        .execute()
+    
+    registrations = []
+    for reg in response.data:
+        # Registrations outlive their session; its payments may be archived
+        course = reg.get("courses") or {}
+        table = sessions.payments_table(course["session"]) if course.get("session") else "course_payments"
+        payment = get_supabase().table(table)\
+            .select(PAYMENT_STATUS)\
+            .eq("student_id", current_user["id"])\
+            .eq("course_id", reg["course_id"])\
+            .order("created_at", desc=True)\
+            .limit(1)\
+            .execute()
+        
+        reg["payment_status"] = payment.data[0] if payment.data else None
+        registrations.append(reg)
+    
+    return {
+        "data": registrations,
+        "total": response.count,
+        "page": page,
+        "limit": limit,
+        "total_pages": (response.count + limit - 1) // limit
+    }
+
+@router.get("/api/student/courses-with-payment-status")
+def get_courses_with_payment_status(
+    session: str,
+    semester: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get all available courses with payment status for student"""
+    # Get all courses for student's department
+    courses = get_supabase().table("courses")\
+        .select(COURSE)\
+        .eq("department", current_user["department"])\
+        .eq("session", session)\
+        .eq("semester", semester)\
+        .execute()
+    
+    # Check payment status for each course
+    payments_table = sessions.payments_table(session)
+    courses_with_status = []
+    for course in courses.data:
+        # Check latest payment
+        payment = get_supabase().table(payments_table)\
+            .select(PAYMENT_STATUS)\
+            .eq("student_id", current_user["id"])\
+            .eq("course_id", course["id"])\
+            .order("created_at", desc=True)\
+            .limit(1)\
+            .execute()
+        
+        course["payment"] = payment.data[0] if payment.data else None
+        courses_with_status.append(course)
+    
+    return courses_with_status
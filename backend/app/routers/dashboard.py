@@ -0,0 +1,209 @@
+from fastapi import APIRouter, Depends, HTTPException
+from datetime import date, datetime, timedelta, timezone
+from collections import Counter
+from app.core.deps import get_admin_user, get_token_payload
+from app.core.enums import AnalyticsMetric, Granularity, UserRole, PaymentStatus
+from app.core.projections import ANNOUNCEMENT, PAYMENT
+from app.core.read_routing import replica_reads
+from app.core.supabase import get_supabase
+from app.schemas.dashboard import AdminDashboard
+from app.services import analytics
+from app.utils.validators import calculate_gpa
+
+router = APIRouter(tags=["Dashboard"])
+admin_router = APIRouter(tags=["Dashboard (Admin)"])
+
+# ============= DASHBOARD STATS (FIXED) =============
+@admin_router.get("/api/admin/dashboard", response_model=AdminDashboard, dependencies=[Depends(replica_reads)])
+def get_admin_dashboard(admin: dict = Depends(get_admin_user)):
+    """
+    Retrieve comprehensive admin dashboard metrics, including student, course, 
+    financial, and activity summaries.
+    """
+    
+    # Setup for Time-Based Filters
+    # from datetime import timezone # Moved to top-level imports
+    
+    # Calculate the exact UTC datetime 30 days ago
+    thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
+    
+    # Format the datetime object into a clean ISO 8601 string (YYYY-MM-DDTHH:MM:SSZ)
+    thirty_days_ago_iso = thirty_days_ago.strftime('%Y-%m-%dT%H:%M:%SZ')
+    
+    # ================== 1. Student Metrics ==================
+
+    # Total Active Students and Department Grouping (Fetch all relevant students once)
+    students_query = (
+        get_supabase().table("users")
+        .select("id, status, department, created_at")
+        .eq("role", UserRole.STUDENT)
+        .execute()
+    )
+    students = students_query.data
+
+    # Count: Total Active Students (Robust check using strip)
+    total_active_students = len([
+        s for s in students
+        if s.get("status") and s["status"].strip().lower() == "active"
+    ])
+
+    # Count: New Students (Last 30 days) - Performed via Supabase filter for reliability
+    new_students_count = (
+        get_supabase().table("users")
+        .select("id", count="exact")
+        .eq("role", UserRole.STUDENT)
+        .gte("created_at", thirty_days_ago_iso) # Using the clean ISO string
+        .execute()
+        .count
+    )
+
+    # Group by department
+    dept_counts = Counter(s.get("department") for s in students if s.get("department"))
+    students_by_dept = [
+        {"name": dept, "value": count}
+        for dept, count in dept_counts.items()
+    ]
+
+
+    # ================== 2. Course Metrics ==================
+
+    # Most enrolled course straight off the enrolled_count counter, plus the total
+    courses_query = (
+        get_supabase().table("courses")
+        .select("id, title, enrolled_count", count="exact")
+        .order("enrolled_count", desc=True)
+        .limit(1)
+        .execute()
+    )
+    total_courses = courses_query.count or 0
+
+    most_enrolled = (
+        {
+            "title": courses_query.data[0]["title"],
+            "count": courses_query.data[0].get("enrolled_count") or 0,
+        }
+        if courses_query.data else {"title": "N/A", "count": 0}
+    )
+
+    # Count total materials
+    materials_count = (
+        get_supabase().table("course_materials")
+        .select("id", count="exact")
+        .execute()
+        .count
+    )
+
+    # ================== 3. Payment Metrics ==================
+
+    # Revenue and its monthly trend come from the analytics series, which only
+    # recomputes the current month/session (see app/services/analytics.py)
+    total_revenue, _ = analytics.all_time(AnalyticsMetric.REVENUE)
+
+    # Count pending payments
+    pending_payments_count = (
+        get_supabase().table("course_payments")
+        .select("id", count="exact")
+        .eq("status", PaymentStatus.PENDING)
+        .limit(1)
+        .execute()
+        .count
+    ) or 0
+
+    # Revenue Trend: the last 12 months, oldest first (zero months included)
+    today = analytics.local_now().date()
+    year, month = divmod(today.year * 12 + today.month - 12, 12)
+    revenue_dynamics = [
+        {"name": point["label"], "amount": point["total"]}
+        for point in analytics.series(AnalyticsMetric.REVENUE, Granularity.MONTH, date(year, month + 1, 1), today)
+    ]
+
+    # ================== 4. Activity ==================
+
+    # Overall Status Chart (Student Status Distribution)
+    status_counts = Counter(
+        s.get("status", "Unknown").capitalize()
+        for s in students
+        if s.get("status")
+    )
+    overall_status_chart = [
+        {"name": k, "value": v}
+        for k, v in status_counts.items()
+    ]
+
+    # Latest pending payments (Simple fetch)
+    latest_pending_payments = (
+        get_supabase().table("course_payments")
+        .select(PAYMENT)
+        .eq("status", PaymentStatus.PENDING)
+        .order("created_at", desc=True)
+        .limit(5)
+        .execute()
+        .data
+    )
+
+    # Latest announcements
+    latest_announcements = (
+        get_supabase().table("announcements")
+        .select(ANNOUNCEMENT)
+        .order("created_at", desc=True)
+        .limit(5)
+        .execute()
+        .data
+    )
+
+    # ================== Final Return Structure ==================
+    return {
+        "student_metrics": {
+            "total_active": total_active_students,
+            "new_students_30d": new_students_count,
+            "by_department": students_by_dept,
+        },
+        "course_metrics": {
+            "total_courses": total_courses,
+            "most_enrolled": most_enrolled,
+            "total_materials": materials_count,
+        },
+        "financial_metrics": {
+            "total_revenue": total_revenue,
+            "pending_count": pending_payments_count,
+            "revenue_trend": revenue_dynamics,
+        },
+        "activity": {
+            "status_distribution": overall_status_chart,
+            "latest_pending_payments": latest_pending_payments,
+            "latest_announcements": latest_announcements,
+        },
+    }
+
+def load_student_home(student_id: str) -> dict:
+    """Profile, counts, recent results and announcements from one RPC (migrations/0009_student_home.sql)"""
+    home = get_supabase().rpc("student_home", {"p_student_id": student_id}).execute().data
+    if not home:
+        raise HTTPException(status_code=401, detail="User not found")
+
+    # Statuses with no payments are missing from the grouped counts
+    home["payments"] = {status.value: home["payments"].get(status.value, 0) for status in PaymentStatus}
+    home["gpa"] = calculate_gpa(home["recent_results"])
+    return home
+
+@router.get("/api/student/home")
+def get_student_home(token: dict = Depends(get_token_payload)):
+    """
+    Everything the student home screen shows in a single database round-trip:
+    profile, payment counts by status, registered course count, recent results
+    with GPA, and the latest announcements with an unread count.
+    """
+    return load_student_home(token["user_id"])
+
+@router.get("/api/student/dashboard")
+def get_student_dashboard(token: dict = Depends(get_token_payload)):
+    """Get student dashboard statistics"""
+    home = load_student_home(token["user_id"])
+    
+    return {
+        "registered_courses": home["registered_courses"],
+        "pending_payments": home["payments"][PaymentStatus.PENDING.value],
+        "approved_payments": home["payments"][PaymentStatus.APPROVED.value],
+        "gpa": home["gpa"],
+        "recent_results": home["recent_results"]
+    }
@@ -0,0 +1,94 @@
+from itertools import groupby
+from fastapi import APIRouter, Depends, HTTPException, Request
+from app.core import delivery
+from app.core.deps import get_current_user
+from app.core.supabase import get_supabase
+from app.services import documents, results_cache
+from app.utils.validators import calculate_gpa
+
+router = APIRouter(tags=["Documents"])
+
+# Documents are content-addressed, so a downloaded copy never goes stale
+DOCUMENT_MAX_AGE = 24 * 3600
+
+# ============= PRINTABLE DOCUMENTS =============
+
+def student_header(user: dict) -> dict:
+    return {k: user.get(k) for k in ("full_name", "reg_no", "department")}
+
+@router.post("/api/student/documents/transcript")
+def request_transcript(current_user: dict = Depends(get_current_user)):
+    """Queue (or fetch from cache) a PDF transcript of all released results, archived sessions included"""
+    results = sorted(
+        results_cache.get_archived_results(current_user["id"]) + results_cache.get_student_results(current_user["id"]),
+        key=lambda r: (r.get("session") or "", r.get("semester") or "", (r.get("courses") or {}).get("course_code") or "")
+    )
+
+    terms = []
+    for (session, semester), term_results in groupby(results, key=lambda r: (r.get("session"), r.get("semester"))):
+        term_results = list(term_results)
+        terms.append({
+            "session": session,
+            "semester": semester,
+            "gpa": calculate_gpa(term_results),
+            "results": [
+                {
+                    "course_code": (r.get("courses") or {}).get("course_code"),
+                    "title": (r.get("courses") or {}).get("title"),
+                    "score": r.get("score"),
+                    "grade": r.get("grade"),
+                }
+                for r in term_results
+            ],
+        })
+
+    data = {"student": student_header(current_user), "terms": terms, "cgpa": calculate_gpa(results)}
+    return documents.request_document(current_user["id"], "transcript", data)
+
+@router.post("/api/student/documents/registration-slip")
+def request_registration_slip(session: str, semester: str, current_user: dict = Depends(get_current_user)):
+    """Queue (or fetch from cache) a PDF course-registration slip for one semester"""
+    registrations = get_supabase().table("course_registrations")\
+        .select("registered_at, courses!inner(course_code, title, fee, session, semester)")\
+        .eq("student_id", current_user["id"])\
+        .eq("courses.session", session)\
+        .eq("courses.semester", semester)\
+        .execute()
+
+    courses = sorted(
+        (
+            {
+                "course_code": reg["courses"]["course_code"],
+                "title": reg["courses"]["title"],
+                "fee": reg["courses"]["fee"] or 0,
+                "registered_at": (reg.get("registered_at") or "")[:10],
+            }
+            for reg in registrations.data
+        ),
+        key=lambda c: c["course_code"]
+    )
+
+    data = {"student": student_header(current_user), "session": session, "semester": semester, "courses": courses}
+    return documents.request_document(current_user["id"], "registration-slip", data)
+
+@router.get("/api/student/documents/{document_id}")
+def get_document_status(document_id: str, current_user: dict = Depends(get_current_user)):
+    """Check whether a requested document has been rendered"""
+    if not document_id.isalnum():
+        raise HTTPException(status_code=404, detail="Document not found")
+    return {"document_id": document_id, "status": documents.document_status(current_user["id"], document_id)}
+
+@router.get("/api/student/documents/{document_id}/download")
+def download_document(document_id: str, request: Request, current_user: dict = Depends(get_current_user)):
+    """Download a rendered document (streamed from storage; only its owner's id resolves it)"""
+    if not document_id.isalnum():
+        raise HTTPException(status_code=404, detail="Document not found")
+
+    url = documents.document_url(current_user["id"], document_id)
+    if url is None:
+        raise HTTPException(status_code=404, detail="Document not found or still rendering")
+
+    response = delivery.serve(url, request, DOCUMENT_MAX_AGE, public=False)
+    response.headers["Content-Type"] = "application/pdf"
+    response.headers["Content-Disposition"] = f'attachment; filename="{document_id[:12]}.pdf"'
+    return response
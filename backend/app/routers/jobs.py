@@ -0,0 +1,25 @@
+import contextvars
+import hmac
+from fastapi import APIRouter, HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app import worker
+
+router = APIRouter(tags=["Jobs"])
+
+# ============= CRON DRAIN =============
+# For deployments without a long-running worker process (Vercel): the cron in
+# vercel.json calls this every minute and the queue is worked off in the
+# function itself. Docker deployments run `python -m app.worker` instead.
+
+def _authorized(request: Request) -> bool:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    return bool(settings.cron_secret) and scheme.lower() == "bearer" and hmac.compare_digest(token, settings.cron_secret)
+
+@router.get("/api/internal/jobs/run", include_in_schema=False)
+async def run_jobs(request: Request):
+    """Run queued background jobs for up to JOB_DRAIN_SECONDS"""
+    if not _authorized(request):
+        raise HTTPException(status_code=401, detail="Not authorized")
+    # A fresh context: the jobs are not bound by this request's upstream deadline
+    return await run_in_threadpool(contextvars.Context().run, worker.drain, settings.job_drain_seconds)
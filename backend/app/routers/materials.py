@@ -0,0 +1,132 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File
+from typing import Optional
+from datetime import datetime
+from app.core.config import settings
+from app.core.delivery import serve, signed_material_url, verify_material_link
+from app.core.deps import get_admin_user, get_token_payload
+from app.core.enums import AuditAction, UploadPurpose
+from app.core.rate_limit import rate_limit
+from app.core.read_routing import replica_reads
+from app.core.storage import upload_file
+from app.core.projections import COURSE_SUMMARY, MATERIAL, columns, embed
+from app.core.supabase import get_supabase
+from app.core.uploads import finalize_upload
+from app.schemas.material import MaterialFinalize
+from app.services import audit
+from app.services.registration_cache import is_registered
+
+router = APIRouter(tags=["Materials"])
+admin_router = APIRouter(tags=["Materials (Admin)"])
+
+# ============= COURSE MATERIALS =============
+
+@admin_router.post("/api/admin/materials", dependencies=[Depends(rate_limit("upload", settings.upload_rate_limit))])
+def upload_material(
+    course_id: int,
+    title: str,
+    file: UploadFile = File(...),
+    admin: dict = Depends(get_admin_user)
+):
+    """Upload course material"""
+    # Upload to Cloudinary
+    upload_result = upload_file(
+        file.file,
+        folder="wmou_portal/course_materials",
+        resource_type="auto"
+    )
+    
+    return create_material(admin, course_id, title, upload_result["secure_url"], file.content_type)
+
+@admin_router.post("/api/admin/materials/finalize")
+def finalize_material(data: MaterialFinalize, admin: dict = Depends(get_admin_user)):
+    """Record course material uploaded directly to storage (ticket from /api/uploads/sign)"""
+    upload = finalize_upload(admin, UploadPurpose.COURSE_MATERIAL, data.upload_token, data.upload.model_dump())
+    return create_material(admin, data.course_id, data.title, upload["url"], upload["content_type"] or data.file_type)
+
+def create_material(admin: dict, course_id: int, title: str, file_url: str, file_type: Optional[str]) -> dict:
+    material_data = {
+        "course_id": course_id,
+        "title": title,
+        "file_url": file_url,
+        "file_type": file_type,
+        "uploaded_by": admin["id"],
+        "uploaded_at": datetime.utcnow().isoformat()
+    }
+    
+    response = get_supabase().table("course_materials").insert(material_data).execute()
+    audit.record(admin, AuditAction.MATERIAL_UPLOADED, "material", response.data[0]["id"], course_id=course_id, title=title)
+    return {"message": "Material uploaded successfully", "material": response.data[0]}
+
+@router.get("/api/student/materials/{course_id}")
+def get_course_materials(
+    course_id: int, 
+    token: dict = Depends(get_token_payload),
+    page: int = 1,
+    limit: int = 20
+):
+    """Get materials for a registered course; file links are signed and expire"""
+    if not is_registered(token["user_id"], course_id):
+        raise HTTPException(status_code=403, detail="You must register and pay for this course")
+    
+    offset = (page - 1) * limit
+    
+    materials = get_supabase().table("course_materials")\
+        .select(MATERIAL, count="exact")\
+        .eq("course_id", course_id)\
+        .range(offset, offset + limit - 1)\
+        .execute()
+    
+    for material in materials.data:
+        material["file_url"] = signed_material_url(material["id"])
+    
+    return {
+        "data": materials.data,
+        "total": materials.count,
+        "page": page,
+        "limit": limit,
+        "total_pages": (materials.count + limit - 1) // limit
+    }
+
+@router.get("/api/files/materials/{material_id}")
+def download_material(material_id: int, expires: int, signature: str, request: Request):
+    """Deliver a material through a signed link (no login; cacheable until the link expires)"""
+    remaining = verify_material_link(material_id, expires, signature)
+    
+    material = get_supabase().table("course_materials")\
+        .select("file_url")\
+        .eq("id", material_id)\
+        .execute()
+    
+    if not material.data:
+        raise HTTPException(status_code=404, detail="Material not found")
+    
+    return serve(material.data[0]["file_url"], request, remaining)
+
+@admin_router.get("/api/admin/materials", dependencies=[Depends(replica_reads)])
+def get_all_materials(
+    admin: dict = Depends(get_admin_user),
+    page: int = 1,
+    limit: int = 20
+):
+    """Get all course materials"""
+    offset = (page - 1) * limit
+    
+    materials = get_supabase().table("course_materials")\
+        .select(columns(MATERIAL, embed("courses", COURSE_SUMMARY)), count="exact")\
+        .range(offset, offset + limit - 1)\
+        .execute()
+    
+    return {
+        "data": materials.data,
+        "total": materials.count,
+        "page": page,
+        "limit": limit,
+        "total_pages": (materials.count + limit - 1) // limit
+    }
+
+@admin_router.delete("/api/admin/materials/{material_id}")
+def delete_material(material_id: int, admin: dict = Depends(get_admin_user)):
+    """Delete course material"""
+    get_supabase().table("course_materials").delete().eq("id", material_id).execute()
+    audit.record(admin, AuditAction.MATERIAL_DELETED, "material", material_id)
+    return {"message": "Material deleted successfully"}
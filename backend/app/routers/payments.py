@@ -0,0 +1,379 @@
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
+from typing import Optional, List
+from datetime import datetime, timezone
+from app.core.config import settings
+from app.core.deps import get_current_user, get_admin_user
+from app.core.enums import AnalyticsMetric, AuditAction, PaymentStatus, ExportFormat, UploadPurpose
+from app.core.projections import COURSE_SUMMARY, PAYMENT, STUDENT_SUMMARY, USER_NAME, columns, embed
+from app.core.rate_limit import rate_limit
+from app.core.read_routing import replica_reads
+from app.core.storage import upload_file
+from app.core.supabase import get_supabase
+from app.core.uploads import finalize_upload
+from app.jobs import enqueue, enqueue_many
+from app.jobs.handlers import PAYMENT_APPROVAL_EMAIL
+from app.schemas.common import Page
+from app.schemas.payment import (
+    PaymentApproval, PaymentBatchApproval, PaymentListItem, PaymentProofFinalize, BulkPaymentProofFinalize
+)
+from app.services.payments import approve_payments
+from app.services import analytics, audit, cart, reconciliation, sessions
+from app.services.registrations import reserve_seat, COURSE_FULL
+from app.utils.export import iter_keyset, export_response
+
+router = APIRouter(tags=["Payments"])
+admin_router = APIRouter(tags=["Payments (Admin)"])
+
+# ============= PAYMENT FLOW =============
+
+@router.post("/api/student/payment/upload-proof", dependencies=[Depends(rate_limit("upload", settings.upload_rate_limit))])
+def upload_payment_proof(
+    course_id: int,
+    amount_paid: float,
+    file: UploadFile = File(...),
+    current_user: dict = Depends(get_current_user)
+):
+    """Student uploads payment receipt"""
+    # Upload to Cloudinary
+    upload_result = upload_file(file.file, folder="wmou_portal/payment_receipts")
+    return create_payment(current_user, course_id, amount_paid, upload_result["secure_url"])
+
+@router.post("/api/student/payment/finalize")
+def finalize_payment_proof(data: PaymentProofFinalize, current_user: dict = Depends(get_current_user)):
+    """Record a receipt uploaded directly to storage (ticket from /api/uploads/sign)"""
+    upload = finalize_upload(current_user, UploadPurpose.PAYMENT_RECEIPT, data.upload_token, data.upload.model_dump())
+    return create_payment(current_user, data.course_id, data.amount_paid, upload["url"])
+
+def create_payment(current_user: dict, course_id: int, amount_paid: float, receipt_url: str) -> dict:
+    # Create payment record
+    payment_data = {
+        "student_id": current_user["id"],
+        "course_id": course_id,
+        "amount_paid": amount_paid,
+        "receipt_url": receipt_url,
+        "status": PaymentStatus.PENDING,
+        "created_at": datetime.utcnow().isoformat()
+    }
+    
+    response = get_supabase().table("course_payments").insert(payment_data).execute()
+    
+    return {
+        "message": "Payment proof uploaded successfully",
+        "payment": response.data[0]
+    }
+
+@admin_router.get("/api/admin/payments", response_model=Page[PaymentListItem], dependencies=[Depends(replica_reads)])
+def get_all_payments(
+    admin: dict = Depends(get_admin_user), 
+    status: Optional[str] = None,
+    session: Optional[str] = None,
+    page: int = 1,
+    limit: int = 30
+):
+    """Get payments with reviewer info (Task 5); the current session unless `session` is given"""
+    offset = (page - 1) * limit
+    session = sessions.resolve(session)
+    table = sessions.payments_table(session)
+    
+    # Task 5: Select reviewer name
+    query = get_supabase().table(table)\
+        .select(columns(
+            PAYMENT,
+            embed(f"users!{table}_student_id_fkey", STUDENT_SUMMARY),
+            embed("courses", COURSE_SUMMARY),
+            embed(f"reviewer:users!{table}_reviewed_by_fkey", USER_NAME)
+        ), count="exact")\
+        .eq("session", session)
+        
+    if status:
+        query = query.eq("status", status)
+    
+    response = query.order("created_at", desc=True).range(offset, offset + limit - 1).execute()
+    
+    payments = []
+    for p in response.data:
+        p['reviewed_by_name'] = p.get('reviewer', {}).get('full_name', 'N/A') if p.get('reviewer') else 'N/A'
+        payments.append(p)
+
+    return {
+        "data": payments,
+        "total": response.count,
+        "page": page,
+        "limit": limit,
+        "total_pages": (response.count + limit - 1) // limit
+    }
+
+PAYMENT_EXPORT_COLUMNS = [
+    ("Payment ID", "id"),
+    ("Reg No", "student.reg_no"),
+    ("Student", "student.full_name"),
+    ("Course Code", "courses.course_code"),
+    ("Course Title", "courses.title"),
+    ("Department", "courses.department"),
+    ("Session", "courses.session"),
+    ("Amount Paid", "amount_paid"),
+    ("Status", "status"),
+    ("Submitted At", "created_at"),
+    ("Reviewed By", "reviewer.full_name"),
+    ("Reviewed At", "reviewed_at"),
+    ("Rejection Reason", "rejection_reason"),
+    ("Receipt URL", "receipt_url"),
+]
+
+@admin_router.get("/api/admin/payments/export", dependencies=[Depends(replica_reads), Depends(rate_limit("export", settings.export_rate_limit))])
+def export_payments(
+    admin: dict = Depends(get_admin_user),
+    status: Optional[str] = None,
+    department: Optional[str] = None,
+    session: Optional[str] = None,
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format")
+):
+    """Stream one session's payment ledger (the current one by default) as CSV/XLSX, paging by id"""
+    session = sessions.resolve(session)
+    table = sessions.payments_table(session)
+    # !inner turns the course embed into a join so its columns can be filtered on
+    courses_embed = "courses!inner" if department else "courses"
+
+    def build_query():
+        query = get_supabase().table(table).select(
+            "id, amount_paid, status, created_at, reviewed_at, rejection_reason, receipt_url, "
+            f"student:users!{table}_student_id_fkey(full_name, reg_no), "
+            f"{courses_embed}(course_code, title, department, session), "
+            f"reviewer:users!{table}_reviewed_by_fkey(full_name)"
+        ).eq("session", session)
+        if status:
+            query = query.eq("status", status)
+        if department:
+            query = query.eq("courses.department", department)
+        return query
+
+    return export_response(iter_keyset(build_query), PAYMENT_EXPORT_COLUMNS, export_format, "payments")
+
+@router.post("/api/student/payment/upload-proof-bulk", dependencies=[Depends(rate_limit("upload", settings.upload_rate_limit))])
+def upload_payment_proof_bulk(
+    course_ids: List[int],
+    total_amount: float,
+    file: UploadFile = File(...),
+    current_user: dict = Depends(get_current_user)
+):
+    """Student uploads single payment receipt for multiple courses"""
+    summary = validate_bulk_payment(current_user, course_ids, total_amount)
+    
+    # Upload receipt once
+    upload_result = upload_file(file.file, folder="wmou_portal/payment_receipts")
+    return checkout_bulk_payment(current_user, course_ids, total_amount, summary, upload_result["secure_url"])
+
+@router.post("/api/student/payment/finalize-bulk")
+def finalize_payment_proof_bulk(data: BulkPaymentProofFinalize, current_user: dict = Depends(get_current_user)):
+    """Bulk variant of /api/student/payment/finalize: one directly uploaded receipt for several courses"""
+    summary = validate_bulk_payment(current_user, data.course_ids, data.total_amount)
+    upload = finalize_upload(current_user, UploadPurpose.PAYMENT_RECEIPT, data.upload_token, data.upload.model_dump())
+    return checkout_bulk_payment(current_user, data.course_ids, data.total_amount, summary, upload["url"])
+
+def validate_bulk_payment(current_user: dict, course_ids: List[int], total_amount: float) -> dict:
+    # Validate every course in one query: exists, department, no registration
+    # or pending/approved payment already, no duplicates in the list
+    summary = cart.validate(current_user["id"], course_ids=course_ids)
+    if summary["problems"]:
+        raise HTTPException(
+            status_code=cart.problem_status_code(summary["problems"]),
+            detail={"message": "Some courses cannot be paid for", "problems": summary["problems"]}
+        )
+    
+    # Calculate expected total
+    expected_total = summary["total"]
+    if abs(total_amount - expected_total) > 0.01:
+        raise HTTPException(status_code=400, detail=f"Amount mismatch. Expected: {expected_total}, Received: {total_amount}")
+    return summary
+
+def checkout_bulk_payment(current_user: dict, course_ids: List[int], total_amount: float, summary: dict, receipt_url: str) -> dict:
+    # Re-validate and create every payment record in a single insert
+    outcome = cart.checkout(current_user["id"], receipt_url, total_amount, course_ids=course_ids)
+    if outcome["status"] != cart.OK:
+        raise HTTPException(status_code=409, detail="Payments changed while uploading, please retry")
+    
+    return {
+        "message": f"Payment proof uploaded for {len(course_ids)} courses",
+        "courses": [line["course_code"] for line in summary["items"]],
+        "total_amount": total_amount,
+        "payments": outcome["payments"]
+    }
+
+@router.get("/api/student/payment-history", response_model=Page[PaymentListItem], dependencies=[Depends(replica_reads)])
+def get_student_payment_history(
+    current_user: dict = Depends(get_current_user),
+    session: Optional[str] = None,
+    page: int = 1,
+    limit: int = 20
+):
+    """Get student's payment history for a session (the current one by default)"""
+    offset = (page - 1) * limit
+    session = sessions.resolve(session)
+    table = sessions.payments_table(session)
+    
+    query = get_supabase().table(table)\
+        .select(columns(
+            PAYMENT,
+            embed("courses", COURSE_SUMMARY),
+            embed(f"reviewer:users!{table}_reviewed_by_fkey", USER_NAME)
+        ), count="exact")\
+        .eq("student_id", current_user["id"])\
+        .eq("session", session)
+    
+    response = query.order("created_at", desc=True).range(offset, offset + limit - 1).execute()
+    
+    payments = []
+    for p in response.data:
+        p['reviewed_by_name'] = p.get('reviewer', {}).get('full_name', 'N/A') if p.get('reviewer') else 'N/A'
+        payments.append(p)
+
+    return {
+        "data": payments,
+        "total": response.count,
+        "page": page,
+        "limit": limit,
+        "total_pages": (response.count + limit - 1) // limit
+    }
+
+def record_approvals(admin: dict, payments: List[dict], source: str):
+    for payment in payments:
+        audit.record(
+            admin, AuditAction.PAYMENT_APPROVED, "payment", payment["id"],
+            student_id=payment["student_id"], course_id=payment["course_id"], source=source
+        )
+
+def queue_approval_emails(payments: List[dict]):
+    enqueue_many(PAYMENT_APPROVAL_EMAIL, [
+        {
+            "student_email": payment["student"]["email"],
+            "course_name": payment["courses"]["title"],
+            "approved": True
+        }
+        for payment in payments
+    ])
+
+@admin_router.patch("/api/admin/payments/approve-batch")
+def approve_payments_batch(
+    data: PaymentBatchApproval,
+    admin: dict = Depends(get_admin_user)
+):
+    """Approve many pending payments at once"""
+    outcome = approve_payments(data.payment_ids, admin["id"])
+    record_approvals(admin, outcome["approved"], "batch")
+    queue_approval_emails(outcome["approved"])
+
+    return {
+        "message": f"{len(outcome['approved'])} payments approved",
+        "approved_ids": [p["id"] for p in outcome["approved"]],
+        "course_full_ids": outcome["course_full"]
+    }
+
+@admin_router.post("/api/admin/payments/reconcile", dependencies=[Depends(rate_limit("upload", settings.upload_rate_limit))])
+def reconcile_payments(
+    file: UploadFile = File(...),
+    window_days: int = Query(3, ge=0, le=31),
+    auto_approve: bool = False,
+    admin: dict = Depends(get_admin_user)
+):
+    """
+    Match a bank statement (CSV/XLSX) against pending payments. Returns proposed
+    matches; with auto_approve, high-confidence matches go through batch approval.
+    """
+    try:
+        lines = reconciliation.parse_statement(file.filename or "", file.file.read())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    result = reconciliation.match_statement(lines, reconciliation.load_pending_groups(), window_days)
+    summary = reconciliation.summarize(result)
+
+    if auto_approve:
+        confident_ids = [
+            payment_id
+            for m in result.matches if m.confidence == reconciliation.HIGH
+            for payment_id in m.group.payment_ids
+        ]
+        outcome = approve_payments(confident_ids, admin["id"])
+        record_approvals(admin, outcome["approved"], "reconciliation")
+        queue_approval_emails(outcome["approved"])
+        summary["auto_approved_ids"] = [p["id"] for p in outcome["approved"]]
+        summary["course_full_ids"] = outcome["course_full"]
+
+    return summary
+
+@admin_router.patch("/api/admin/payments/{payment_id}/approve")
+def approve_payment(
+    payment_id: int,
+    review_data: PaymentApproval,
+    admin: dict = Depends(get_admin_user)
+):
+    approved = review_data.approved
+    rejection_reason = review_data.rejection_reason
+
+    reviewed_at = datetime.now(timezone.utc).isoformat()
+
+    update_data = {
+        "status": PaymentStatus.APPROVED if approved else PaymentStatus.REJECTED,
+        "reviewed_at": reviewed_at,
+        "reviewed_by": admin["id"]
+    }
+
+    if not approved and rejection_reason:
+        update_data["rejection_reason"] = rejection_reason
+
+    # STEP 1: LOAD THE PAYMENT WITH EXPLICIT RELATIONSHIPS
+    payment_response = (
+        get_supabase().table("course_payments")
+        .select(
+            "student_id, course_id, status, "
+            "student:users!course_payments_student_id_fkey(email, full_name), "
+            "courses(title)"
+        )
+        .eq("id", payment_id)
+        .limit(1)
+        .execute()
+    )
+
+    if not payment_response.data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Payment with ID {payment_id} not found."
+        )
+
+    payment_record = payment_response.data[0]
+
+    # STEP 2: RESERVE A SEAT (REGISTERS THE STUDENT) BEFORE APPROVING
+    if approved:
+        seat = reserve_seat(payment_record["student_id"], payment_record["course_id"])
+        if seat == COURSE_FULL:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Course is full; reject the payment or raise the course capacity."
+            )
+
+    # STEP 3: UPDATE
+    get_supabase().table("course_payments")\
+        .update(update_data)\
+        .eq("id", payment_id)\
+        .execute()
+
+    # Re-reviewing an approved payment moves revenue out of a closed period; the
+    # trigger has bumped the version, so pick it up here without waiting
+    if payment_record["status"] == PaymentStatus.APPROVED:
+        analytics.closed_periods.sync(AnalyticsMetric.REVENUE, force=True)
+
+    audit.record(
+        admin, AuditAction.PAYMENT_APPROVED if approved else AuditAction.PAYMENT_REJECTED, "payment", payment_id,
+        student_id=payment_record["student_id"], course_id=payment_record["course_id"],
+        previous_status=payment_record["status"], rejection_reason=update_data.get("rejection_reason")
+    )
+
+    # STEP 4: EMAIL NOTIFICATION
+    enqueue(PAYMENT_APPROVAL_EMAIL, {
+        "student_email": payment_record["student"]["email"],
+        "course_name": payment_record["courses"]["title"],
+        "approved": approved,
+        "rejection_reason": rejection_reason
+    })
+
+    return {"message": "Payment processed successfully"}
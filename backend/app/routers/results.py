@@ -0,0 +1,132 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Optional, List
+from datetime import datetime
+from app.core.config import settings
+from app.core.deps import get_token_payload, get_admin_user
+from app.core.enums import AuditAction, ExportFormat
+from app.core.rate_limit import rate_limit
+from app.core.read_routing import replica_reads
+from app.core.supabase import get_supabase
+from app.schemas.result import ResultCreate
+from app.services import audit, results_cache, sessions
+from app.utils.export import iter_keyset, export_response
+from app.utils.validators import calculate_gpa
+
+router = APIRouter(tags=["Results"])
+admin_router = APIRouter(tags=["Results (Admin)"])
+
+# ============= RESULTS =============
+
+@admin_router.post("/api/admin/results/bulk-upload", dependencies=[Depends(rate_limit("upload", settings.upload_rate_limit))])
+def bulk_upload_results(
+    session: str,
+    semester: str,
+    results: List[ResultCreate],
+    admin: dict = Depends(get_admin_user)
+):
+    """Bulk upload results (from Excel parsing)"""
+    results_data = [
+        {
+            **result.dict(),
+            "session": session,
+            "semester": semester,
+            "uploaded_at": datetime.utcnow().isoformat()
+        }
+        for result in results
+    ]
+    
+    get_supabase().table("results").upsert(results_data).execute()
+
+    # Warm the cache for the affected students only, before they come looking
+    results_cache.refresh_students(result.student_id for result in results)
+
+    audit.record(
+        admin, AuditAction.RESULTS_UPLOADED, "results", None,
+        session=session, semester=semester, count=len(results_data),
+        course_ids=sorted({result.course_id for result in results})
+    )
+
+    return {"message": f"{len(results_data)} results uploaded successfully"}
+
+RESULT_EXPORT_COLUMNS = [
+    ("Reg No", "users.reg_no"),
+    ("Student", "users.full_name"),
+    ("Department", "users.department"),
+    ("Course Code", "courses.course_code"),
+    ("Course Title", "courses.title"),
+    ("Session", "session"),
+    ("Semester", "semester"),
+    ("Score", "score"),
+    ("Grade", "grade"),
+    ("Uploaded At", "uploaded_at"),
+]
+
+@admin_router.get("/api/admin/results/export", dependencies=[Depends(replica_reads), Depends(rate_limit("export", settings.export_rate_limit))])
+def export_results(
+    admin: dict = Depends(get_admin_user),
+    session: Optional[str] = None,
+    semester: Optional[str] = None,
+    department: Optional[str] = None,
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format")
+):
+    """Stream one session's result sheet (the current one by default) as CSV/XLSX, paging by id"""
+    session = sessions.resolve(session)
+    table = sessions.results_table(session)
+    users_embed = "users!inner" if department else "users"
+
+    def build_query():
+        query = get_supabase().table(table).select(
+            "id, session, semester, score, grade, uploaded_at, "
+            f"{users_embed}(reg_no, full_name, department), "
+            "courses(course_code, title)"
+        ).eq("session", session)
+        if semester:
+            query = query.eq("semester", semester)
+        if department:
+            query = query.eq("users.department", department)
+        return query
+
+    return export_response(iter_keyset(build_query), RESULT_EXPORT_COLUMNS, export_format, "results")
+
+@router.get("/api/student/results")
+def get_student_results(
+    session: Optional[str] = None,
+    semester: Optional[str] = None,
+    page: int = 1,
+    limit: int = 50,
+    token: dict = Depends(get_token_payload)
+):
+    """
+    Get student results with GPA calculation, across all sessions unless one is
+    named. Sessions still in the results table are served from the results
+    cache; archived ones are read from the archive.
+    """
+    offset = (page - 1) * limit
+    student_id = token["user_id"]
+
+    if session and sessions.is_archived(session):
+        results = results_cache.get_archived_results(student_id, session)
+    elif session:
+        results = [r for r in results_cache.get_student_results(student_id) if r.get("session") == session]
+    else:
+        results = results_cache.get_student_results(student_id)
+        if sessions.archived_sessions.get():
+            # Archived rows keep their ids, so this is the order before archiving
+            results = sorted(results_cache.get_archived_results(student_id) + results, key=lambda r: r["id"])
+
+    if semester:
+        results = [r for r in results if r.get("semester") == semester]
+
+    total = len(results)
+    results = results[offset:offset + limit]
+
+    gpa = calculate_gpa(results)
+    
+    return {
+        "results": results,
+        "gpa": gpa,
+        "total_courses": total,
+        "page": page,
+        "limit": limit,
+        "total_pages": (total + limit - 1) // limit
+    }
@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Optional
+from app.core.deps import get_current_user, get_admin_user
+from app.core.enums import SearchScope, UserRole
+from app.core.read_routing import replica_reads
+from app.core.supabase import get_supabase
+from app.services.course_index import course_index
+
+router = APIRouter(tags=["Search"])
+admin_router = APIRouter(tags=["Search (Admin)"])
+
+# ============= SEARCH =============
+# Students and payments are searched in Postgres (pg_trgm indexes and the
+# search_* functions from migrations/0004_search.sql); courses come from the
+# in-process catalog index.
+
+def page_of(data: list, total: int, page: int, limit: int) -> dict:
+    return {
+        "data": data,
+        "total": total,
+        "page": page,
+        "limit": limit,
+        "total_pages": (total + limit - 1) // limit
+    }
+
+def search_rpc(function: str, params: dict, limit: int, offset: int):
+    rows = get_supabase().rpc(function, {**params, "p_limit": limit, "p_offset": offset}).execute().data or []
+    total = rows[0]["total"] if rows else 0
+    return [{k: v for k, v in row.items() if k != "total"} for row in rows], total
+
+def search_students(q: str, limit: int, offset: int):
+    return search_rpc("search_users", {"p_query": q, "p_role": UserRole.STUDENT.value}, limit, offset)
+
+def search_payments(q: str, status: Optional[str], limit: int, offset: int):
+    return search_rpc("search_payments", {"p_query": q, "p_status": status}, limit, offset)
+
+@admin_router.get("/api/admin/search", dependencies=[Depends(replica_reads)])
+def admin_search(
+    q: str = Query(..., min_length=2, max_length=100),
+    scope: SearchScope = SearchScope.ALL,
+    status: Optional[str] = None,
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100),
+    admin: dict = Depends(get_admin_user)
+):
+    """
+    Ranked prefix/fuzzy search on reg_no, full_name, email and course_code.
+    A single scope is paginated; scope=all returns the top `limit` hits of each.
+    """
+    offset = (page - 1) * limit
+
+    if scope == SearchScope.STUDENTS:
+        return page_of(*search_students(q, limit, offset), page, limit)
+    if scope == SearchScope.COURSES:
+        return page_of(*course_index.search(q, limit, offset), page, limit)
+    if scope == SearchScope.PAYMENTS:
+        return page_of(*search_payments(q, status, limit, offset), page, limit)
+
+    students, students_total = search_students(q, limit, 0)
+    courses, courses_total = course_index.search(q, limit, 0)
+    payments, payments_total = search_payments(q, status, limit, 0)
+    return {
+        "students": {"data": students, "total": students_total},
+        "courses": {"data": courses, "total": courses_total},
+        "payments": {"data": payments, "total": payments_total},
+    }
+
+@router.get("/api/courses/search")
+def search_courses(
+    q: str = Query(..., min_length=1, max_length=100),
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: dict = Depends(get_current_user)
+):
+    """Course catalog lookup by code or title, served from memory"""
+    return page_of(*course_index.search(q, limit, (page - 1) * limit), page, limit)
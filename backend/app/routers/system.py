@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException
+from app.core.config import settings
+from app.core.deps import get_admin_user
+from app.core.enums import AuditAction
+from app.core.http import pool_stats
+from app.core.read_routing import replica_health
+from app.core.resilience import breaker_stats
+from app.jobs import enqueue, get_job_store
+from app.jobs.handlers import STORAGE_GC
+from app.services import audit
+from app.services.audit import audit_buffer
+
+router = APIRouter(tags=["System"])
+admin_router = APIRouter(tags=["System (Admin)"])
+
+# ============= OPERATIONS =============
+
+@admin_router.get("/api/admin/system/metrics")
+def get_system_metrics(admin: dict = Depends(get_admin_user)):
+    """Per-process metrics: HTTP pool usage, TLS handshakes, circuit breakers, audit buffer, replica lag"""
+    metrics = {"upstream_http": pool_stats(), "breakers": breaker_stats(), "audit": audit_buffer.stats()}
+    if settings.supabase_read_url:
+        metrics["replica"] = replica_health.status()
+    return metrics
+
+# ============= STORAGE GARBAGE COLLECTION =============
+
+@admin_router.post("/api/admin/system/storage-gc")
+def start_storage_gc(dry_run: bool = True, admin: dict = Depends(get_admin_user)):
+    """Queue a scan for stored files nothing refers to; deletes them only with dry_run=false"""
+    job = enqueue(STORAGE_GC, {"dry_run": dry_run})
+    audit.record(admin, AuditAction.STORAGE_GC_STARTED, "job", job["id"], dry_run=dry_run)
+    return {"message": "Storage scan queued", "job_id": job["id"], "dry_run": dry_run}
+
+@admin_router.get("/api/admin/system/storage-gc/{job_id}")
+def get_storage_gc_status(job_id: int, admin: dict = Depends(get_admin_user)):
+    """Report of a storage scan: scanned, referenced, orphans (count, bytes, sample) and deleted"""
+    job = get_job_store().get(job_id)
+    if not job or job["kind"] != STORAGE_GC:
+        raise HTTPException(status_code=404, detail="Storage scan not found")
+
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "report": job.get("result") or {},
+        "last_error": job.get("last_error"),
+        "created_at": job.get("created_at"),
+        "finished_at": job.get("finished_at"),
+    }
@@ -0,0 +1,51 @@
+import os
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.deps import get_current_user
+from app.core.rate_limit import rate_limit
+from app.core.storage import LocalStorage, get_storage
+from app.core.uploads import issue_upload
+from app.schemas.upload import UploadTicketRequest
+
+router = APIRouter(tags=["Uploads"])
+
+# ============= SIGNED DIRECT UPLOADS =============
+
+@router.post("/api/uploads/sign", dependencies=[Depends(rate_limit("upload", settings.upload_rate_limit))])
+def sign_upload(data: UploadTicketRequest, current_user: dict = Depends(get_current_user)):
+    """
+    Ticket for uploading a file straight to storage: post `fields` plus the
+    file (as "file") to `upload_url`, then send `upload_token` and the storage
+    response to the matching finalize route.
+    """
+    return issue_upload(current_user, data.purpose)
+
+# ============= LOCAL STORAGE STAND-IN =============
+# Only active with STORAGE_BACKEND=local; plays the part of Cloudinary's
+# upload API and delivery URLs.
+
+def local_storage() -> LocalStorage:
+    storage = get_storage()
+    if not isinstance(storage, LocalStorage):
+        raise HTTPException(status_code=404, detail="Not found")
+    return storage
+
+@router.post("/api/uploads/local/{resource_type}/upload")
+async def local_upload(resource_type: str, request: Request):
+    storage = local_storage()
+    form = await request.form()
+    file = form.get("file")
+    if file is None or isinstance(file, str):
+        raise HTTPException(status_code=400, detail="Missing file")
+
+    fields = {k: v for k, v in form.items() if isinstance(v, str)}
+    return await run_in_threadpool(storage.receive, fields, file.file, file.filename, resource_type)
+
+@router.get("/api/uploads/local/files/{name:path}")
+async def local_file(name: str):
+    path = local_storage().path(name)
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="File not found")
+    return FileResponse(path)
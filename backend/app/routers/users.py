@@ -0,0 +1,274 @@
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from typing import Optional
+from datetime import datetime
+from app.core.config import settings
+from app.core.deps import get_current_user, get_admin_user
+from app.core.enums import AuditAction, UserRole, StudentStatus, AdminStatus, ExportFormat, UploadPurpose
+from app.core.projections import USER_NAME, USER_PROFILE, columns, embed
+from app.core.rate_limit import rate_limit
+from app.core.read_routing import replica_reads
+from app.core.security import hash_password, seal
+from app.core.storage import upload_file
+from app.core.supabase import get_supabase
+from app.core.uploads import finalize_upload
+from app.schemas.common import Page
+from app.schemas.upload import FinalizedUpload
+from app.schemas.user import UserCreate, AdminUserCreateRequest, UserUpdate, UserListItem
+from app.jobs import enqueue
+from app.jobs.handlers import USER_WELCOME_EMAIL
+from app.services import audit
+from app.utils.export import iter_keyset, export_response
+
+router = APIRouter(tags=["Users"])
+admin_router = APIRouter(tags=["Users (Admin)"])
+
+def get_next_admin_reg_no():
+    """Finds the highest existing ADMIN### and increments it."""
+    response = get_supabase().table("users")\
+        .select("reg_no")\
+        .ilike("reg_no", "ADMIN%")\
+        .order("reg_no", desc=True)\
+        .limit(1)\
+        .execute()
+    
+    if not response.data:
+        return "ADMIN001"
+    
+    latest_reg_no = response.data[0]["reg_no"]
+    
+    try:
+        current_number = int(latest_reg_no[5:])
+        next_number = current_number + 1
+        return f"ADMIN{next_number:03d}"
+    except (ValueError, IndexError):
+        return "ADMIN001"
+
+# ============= USER MANAGEMENT (ADMIN) =============
+# ADMIN USER - NEW ENDPOINT
+@admin_router.post("/api/admin/adminusers/create")
+def create_admin_user(
+    user_request: AdminUserCreateRequest, 
+    admin: dict = Depends(get_admin_user)
+):
+    # 1. Generate new unique registration number
+    new_reg_no = get_next_admin_reg_no()
+    
+    # 2. Check if this newly generated reg_no somehow already exists (safety check)
+    existing = get_supabase().table("users").select("id").eq("reg_no", new_reg_no).execute()
+    if existing.data:
+        # This should ideally not happen if sequence logic is correct
+        raise HTTPException(status_code=400, detail="Generated Registration number already exists, please retry.") 
+
+    raw_password = user_request.password
+    hashed_pwd = hash_password(user_request.password)
+    
+    user_data = {
+        "reg_no": new_reg_no,
+        "email": user_request.email,
+        "full_name": user_request.full_name,
+        "department": "Administration", 
+        "phone": user_request.phone,
+        "role": UserRole.ADMIN,
+        "password": hashed_pwd,
+        "status": AdminStatus.ACTIVE,
+        "created_by": admin["id"],
+        "created_at": datetime.utcnow().isoformat()
+    }
+    
+    response = get_supabase().table("users").insert(user_data).execute()
+    new_user = {k: v for k, v in response.data[0].items() if k != "password"}
+    audit.record(admin, AuditAction.USER_CREATED, "user", new_user["id"], reg_no=new_reg_no, role=UserRole.ADMIN)
+
+    enqueue(USER_WELCOME_EMAIL, {
+        "student_email": user_request.email,
+        "full_name": user_request.full_name,
+        "reg_no": new_reg_no,
+        "sealed_password": seal(raw_password)
+    })
+
+    return {"message": "Admin user created successfully", "user": new_user}
+
+# STUDENT
+@admin_router.post("/api/admin/users/create")
+def create_user(
+    user: UserCreate, 
+    admin: dict = Depends(get_admin_user)
+):
+    """Create new user (Task 4 & 7 & 8)"""
+    # Check if reg_no already exists
+    existing = get_supabase().table("users").select("id").eq("reg_no", user.reg_no).execute()
+    if existing.data:
+        raise HTTPException(status_code=400, detail="Registration number already exists")
+
+    raw_password = user.password
+    hashed_pwd = hash_password(user.password)
+    
+    user_data = {
+        "reg_no": user.reg_no,
+        "email": user.email,
+        "full_name": user.full_name,
+        "department": user.department,
+        "phone": user.phone,
+        "role": user.role,
+        "password": hashed_pwd,
+        "status": StudentStatus.ACTIVE if user.role == UserRole.STUDENT else None,
+        "created_by": admin["id"],
+        "created_at": datetime.utcnow().isoformat()
+    }
+    
+    response = get_supabase().table("users").insert(user_data).execute()
+    new_user = {k: v for k, v in response.data[0].items() if k != "password"}
+    audit.record(admin, AuditAction.USER_CREATED, "user", new_user["id"], reg_no=user.reg_no, role=user.role)
+
+    # Task 7: Send Welcome Email
+    enqueue(USER_WELCOME_EMAIL, {
+        "student_email": user.email,
+        "full_name": user.full_name,
+        "reg_no": user.reg_no,
+        "sealed_password": seal(raw_password)
+    })
+
+    return {"message": "User created successfully", "user": new_user}
+
+@admin_router.get("/api/admin/users", response_model=Page[UserListItem], dependencies=[Depends(replica_reads)])
+def get_all_users(
+    admin: dict = Depends(get_admin_user), 
+    role: Optional[str] = None,
+    page: int = 1,
+    limit: int = 50
+):
+    offset = (page - 1) * limit
+    
+    # Query is correct: creator:users!created_by uses the foreign key 'created_by' 
+    # on the current table to find the creator's full_name.
+    query = (
+        get_supabase().table("users")
+        .select(columns(USER_PROFILE, "registered_courses_count", embed("creator:users!created_by", USER_NAME)), count="exact")
+    )
+        
+    if role:
+        query = query.eq("role", role)
+    
+    response = (
+        query.range(offset, offset + limit - 1)
+        .order("created_at", desc=True)
+        .execute()
+    )
+    
+    users = []
+    for user in response.data:
+        # 1. Clean up user data
+        # Remove original created_by UUID and password
+        user_clean = {k: v for k, v in user.items() if k not in ["password", "created_by"]} 
+        
+        # 2. Registered courses come from the denormalised counter
+        user_clean["registered_courses_count"] = user.get("registered_courses_count") or 0
+        
+        # 3. Handle "creator" safely (Extracting the full_name of the creator)
+        creator = user.get("creator")
+        creator_name = "System" 
+        
+        if creator:
+            # PostgREST/Supabase sometimes returns a list [ {} ] or a single object {}
+            if isinstance(creator, dict):
+                creator_name = creator.get("full_name", "System")
+            elif isinstance(creator, list) and creator and isinstance(creator[0], dict):
+                creator_name = creator[0].get("full_name", "System")
+                
+        user_clean["created_by_name"] = creator_name
+
+        users.append(user_clean)
+
+    return {
+        "data": users,
+        "total": response.count,
+        "page": page,
+        "limit": limit,
+        "total_pages": (response.count + limit - 1) // limit
+    }
+
+USER_EXPORT_COLUMNS = [
+    ("Reg No", "reg_no"),
+    ("Full Name", "full_name"),
+    ("Email", "email"),
+    ("Department", "department"),
+    ("Phone", "phone"),
+    ("Role", "role"),
+    ("Status", "status"),
+    ("Created At", "created_at"),
+]
+
+@admin_router.get("/api/admin/users/export", dependencies=[Depends(replica_reads), Depends(rate_limit("export", settings.export_rate_limit))])
+def export_users(
+    admin: dict = Depends(get_admin_user),
+    role: Optional[str] = None,
+    status: Optional[str] = None,
+    department: Optional[str] = None,
+    export_format: ExportFormat = Query(ExportFormat.CSV, alias="format")
+):
+    """Stream the user list as CSV/XLSX, paging through the table by id"""
+    def build_query():
+        query = get_supabase().table("users").select("id, reg_no, full_name, email, department, phone, role, status, created_at")
+        if role:
+            query = query.eq("role", role)
+        if status:
+            query = query.eq("status", status)
+        if department:
+            query = query.eq("department", department)
+        return query
+
+    return export_response(iter_keyset(build_query), USER_EXPORT_COLUMNS, export_format, "users")
+
+@admin_router.patch("/api/admin/users/{user_id}/status")
+def update_user_status(user_id: str, status: StudentStatus, admin: dict = Depends(get_admin_user)):
+    """Update student status (active, suspended, graduated)"""
+    get_supabase().table("users").update({"status": status}).eq("id", user_id).execute()
+    audit.record(admin, AuditAction.USER_STATUS_CHANGED, "user", user_id, status=status)
+    return {"message": "Status updated successfully"}
+
+# ============= PROFILE =============
+
+@router.get("/api/profile")
+def get_profile(current_user: dict = Depends(get_current_user)):
+    """Get user profile"""
+    user_data = {k: v for k, v in current_user.items() if k != "password"}
+    return user_data
+
+@router.patch("/api/profile")
+def update_profile(data: UserUpdate, current_user: dict = Depends(get_current_user)):
+    """Update user profile"""
+    update_data = {k: v for k, v in data.dict().items() if v is not None}
+    get_supabase().table("users").update(update_data).eq("id", current_user["id"]).execute()
+    return {"message": "Profile updated successfully"}
+
+@router.post("/api/profile/upload-picture", dependencies=[Depends(rate_limit("upload", settings.upload_rate_limit))])
+def upload_profile_picture(
+    file: UploadFile = File(...),
+    current_user: dict = Depends(get_current_user)
+):
+    """Upload profile picture"""
+    # Upload to Cloudinary
+    upload_result = upload_file(
+        file.file,
+        folder="wmou/profile_pictures",
+        transformation=[{"width": 400, "height": 400, "crop": "fill"}]
+    )
+    
+    return set_profile_picture(current_user, upload_result["secure_url"])
+
+@router.post("/api/profile/picture/finalize")
+def finalize_profile_picture(data: FinalizedUpload, current_user: dict = Depends(get_current_user)):
+    """Use a picture uploaded directly to storage (ticket from /api/uploads/sign)"""
+    upload = finalize_upload(current_user, UploadPurpose.PROFILE_PICTURE, data.upload_token, data.upload.model_dump())
+    return set_profile_picture(current_user, upload["url"])
+
+def set_profile_picture(current_user: dict, url: str) -> dict:
+    # Update user profile
+    get_supabase().table("users").update({
+        "profile_picture_url": url
+    }).eq("id", current_user["id"]).execute()
+    
+    return {
+        "message": "Profile picture uploaded successfully",
+        "url": url
+    }
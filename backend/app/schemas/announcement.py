@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class AnnouncementCreate(BaseModel):
+    title: str
+    content: str
+    target_department: Optional[str] = None
+    turnstile_token: str
+    # Also email the announcement to every active student it targets
+    broadcast: bool = False
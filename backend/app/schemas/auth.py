@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+
+class LoginRequest(BaseModel):
+    reg_no: str
+    password: str
+
+class TokenResponse(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    user: dict
+
+class PasswordChange(BaseModel):
+    old_password: str
+    new_password: str
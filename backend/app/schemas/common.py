@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+class Page(BaseModel, Generic[T]):
+    data: List[T]
+    total: Optional[int] = None
+    page: int
+    limit: int
+    total_pages: int
@@ -1,12 +1,17 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import Optional
+from app.core.enums import Semester
 
 class CourseCreate(BaseModel):
     course_code: str
     title: str
     department: str
     session: str
-    semester: int
-    fee: int
+    semester: Semester
+    fee: float
+    capacity: Optional[int] = Field(default=None, ge=0)
 
-class CourseOut(CourseCreate):
-    id: str
+class CourseUpdate(BaseModel):
+    title: Optional[str] = None
+    fee: Optional[float] = None
+    capacity: Optional[int] = Field(default=None, ge=0)
@@ -0,0 +1,42 @@
+from pydantic import BaseModel
+from typing import List, Optional, Union
+
+Number = Union[int, float]
+
+class NameValue(BaseModel):
+    name: str
+    value: int
+
+class RevenuePoint(BaseModel):
+    name: str
+    amount: Number
+
+class MostEnrolled(BaseModel):
+    title: str
+    count: int
+
+class StudentMetrics(BaseModel):
+    total_active: int
+    new_students_30d: Optional[int] = None
+    by_department: List[NameValue]
+
+class CourseMetrics(BaseModel):
+    total_courses: int
+    most_enrolled: MostEnrolled
+    total_materials: Optional[int] = None
+
+class FinancialMetrics(BaseModel):
+    total_revenue: Number
+    pending_count: int
+    revenue_trend: List[RevenuePoint]
+
+class Activity(BaseModel):
+    status_distribution: List[NameValue]
+    latest_pending_payments: List[dict]
+    latest_announcements: List[dict]
+
+class AdminDashboard(BaseModel):
+    student_metrics: StudentMetrics
+    course_metrics: CourseMetrics
+    financial_metrics: FinancialMetrics
+    activity: Activity
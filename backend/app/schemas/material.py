@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import Optional
+from app.schemas.upload import FinalizedUpload
+
+class MaterialCreate(BaseModel):
+    course_id: int
+    title: str
+    file_url: str
+    file_type: str
+
+class MaterialFinalize(FinalizedUpload):
+    course_id: int
+    title: str
+    # Used when the type can't be told from the stored file's format
+    file_type: Optional[str] = None
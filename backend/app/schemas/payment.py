@@ -0,0 +1,38 @@
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional
+from app.schemas.upload import FinalizedUpload
+
+class PaymentProofUpload(BaseModel):
+    course_id: int
+    amount_paid: float
+    receipt_url: str
+
+class PaymentProofFinalize(FinalizedUpload):
+    course_id: int
+    amount_paid: float
+
+class BulkPaymentProofFinalize(FinalizedUpload):
+    course_ids: List[int]
+    total_amount: float
+
+class PaymentApproval(BaseModel):
+    approved: bool
+    rejection_reason: Optional[str] = None
+
+class PaymentListItem(BaseModel):
+    # Extra columns (embeds, newly added fields) pass through untouched
+    model_config = ConfigDict(extra="allow")
+
+    id: int
+    student_id: Optional[str] = None
+    course_id: Optional[int] = None
+    amount_paid: Optional[float] = None
+    receipt_url: Optional[str] = None
+    status: Optional[str] = None
+    created_at: Optional[str] = None
+    reviewed_at: Optional[str] = None
+    rejection_reason: Optional[str] = None
+    reviewed_by_name: str = "N/A"
+
+class PaymentBatchApproval(BaseModel):
+    payment_ids: List[int]
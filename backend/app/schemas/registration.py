@@ -1,8 +1,13 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from app.schemas.upload import FinalizedUpload
 
-class RegisterCourse(BaseModel):
-    course_id: str
+class CourseRegistrationRequest(BaseModel):
+    course_id: int
 
-class UploadPaymentProof(BaseModel):
-    proof_url: str
+class CartItemsAdd(BaseModel):
+    course_ids: List[int] = Field(..., min_length=1, max_length=20)
+
+class CartCheckoutFinalize(FinalizedUpload):
+    total_amount: float
+    session: Optional[str] = None
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+class ResultCreate(BaseModel):
+    student_id: str
+    course_id: int
+    score: float
+    grade: str
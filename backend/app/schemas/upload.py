@@ -0,0 +1,21 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional
+from app.core.enums import UploadPurpose
+
+class UploadTicketRequest(BaseModel):
+    purpose: UploadPurpose
+
+class UploadResult(BaseModel):
+    """The storage response to a direct upload, passed back unchanged by the client"""
+    model_config = ConfigDict(extra="allow")
+
+    public_id: str
+    version: int
+    signature: str
+    resource_type: Optional[str] = None
+    format: Optional[str] = None
+    bytes: Optional[int] = None
+
+class FinalizedUpload(BaseModel):
+    upload_token: str
+    upload: UploadResult
@@ -1,19 +1,40 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, EmailStr
 from typing import Optional
+from app.core.enums import UserRole
 
-class UserBase(BaseModel):
-    reg_no: Optional[str] = None
+class UserCreate(BaseModel):
+    reg_no: str
+    email: EmailStr
     full_name: str
-    email: Optional[str] = None
-    department: Optional[str] = None
-    user_type: str = "student"
+    department: str
+    phone: Optional[str] = None
+    role: UserRole = UserRole.STUDENT
+    password: str = "1234567"
+
+class AdminUserCreateRequest(BaseModel):
+    email: EmailStr
+    full_name: str
+    phone: Optional[str] = None
+    password: str = "1234567"
 
-class UserCreate(UserBase):
-    password: str
+class UserUpdate(BaseModel):
+    email: Optional[EmailStr] = None
+    full_name: Optional[str] = None
+    phone: Optional[str] = None
+    address: Optional[str] = None
 
-class UserLogin(BaseModel):
-    reg_no: str
-    password: str
+class UserListItem(BaseModel):
+    # Extra columns (embeds, newly added fields) pass through untouched
+    model_config = ConfigDict(extra="allow")
 
-class UserOut(UserBase):
     id: str
+    reg_no: Optional[str] = None
+    email: Optional[str] = None
+    full_name: Optional[str] = None
+    department: Optional[str] = None
+    phone: Optional[str] = None
+    role: Optional[str] = None
+    status: Optional[str] = None
+    created_at: Optional[str] = None
+    registered_courses_count: int = 0
+    created_by_name: str = "System"
@@ -0,0 +1,249 @@
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+from app.core.config import settings
+from app.core.enums import AnalyticsMetric, Granularity, PaymentStatus, UserRole
+from app.core.supabase import get_supabase
+from app.services.cache_versions import cache_versions
+
+# Time-series analytics (migrations/0008_analytics.sql).
+#
+# Totals are aggregated in Postgres with date_trunc, one row per bucket, so
+# no raw rows leave the database. Buckets are local wall-clock periods in
+# ANALYTICS_TIMEZONE, and a range is widened to whole buckets. A bucket that
+# ended more than SETTLE_TIME ago is closed: its value can no longer change
+# (revenue is bucketed by approval time, not submission time), so it is
+# cached. A request only goes to the database for the open period plus any
+# closed buckets this worker hasn't seen yet, with one call per contiguous run
+# of them. Each metric's earliest event is cached the same way.
+#
+# The exceptions (re-reviewing an approved payment, deleting an old
+# registration or user, archiving a session) bump the metric's shared version
+# (migrations/0018_analytics_cache_versions.sql), and every worker drops that
+# metric's cached buckets within CACHE_VERSION_CHECK_SECONDS.
+
+# Late commits and replica lag settle within this; after it a bucket is final.
+# The version triggers in 0018 use the same interval.
+SETTLE_TIME = timedelta(minutes=10)
+
+# Upper bound on buckets per request (about four years of days)
+MAX_POINTS = 1500
+
+# Tables, timestamp column and filters behind each metric, for first-event
+# lookups (payments of archived sessions live in course_payments_archive)
+PAYMENT_TABLES = ("course_payments", "course_payments_archive")
+METRIC_SOURCES = {
+    AnalyticsMetric.REVENUE: (PAYMENT_TABLES, "reviewed_at", {"status": PaymentStatus.APPROVED}),
+    AnalyticsMetric.PAYMENTS: (PAYMENT_TABLES, "created_at", {}),
+    AnalyticsMetric.NEW_STUDENTS: (("users",), "created_at", {"role": UserRole.STUDENT}),
+    AnalyticsMetric.REGISTRATIONS: (("course_registrations",), "registered_at", {}),
+}
+# Shared cache version (cache_versions) bumped when a metric's closed buckets change
+METRIC_VERSIONS = {
+    AnalyticsMetric.REVENUE: "analytics.payments",
+    AnalyticsMetric.PAYMENTS: "analytics.payments",
+    AnalyticsMetric.NEW_STUDENTS: "analytics.users",
+    AnalyticsMetric.REGISTRATIONS: "analytics.registrations",
+}
+
+Point = Tuple[float, int]  # (total, events)
+
+
+@lru_cache(maxsize=1)
+def local_zone() -> ZoneInfo:
+    return ZoneInfo(settings.analytics_timezone)
+
+def local_now() -> datetime:
+    return datetime.now(local_zone()).replace(tzinfo=None)
+
+# ---------- buckets (must agree with date_trunc in analytics_series) ----------
+
+def bucket_start(moment: datetime, granularity: Granularity) -> datetime:
+    day = datetime.combine(moment.date(), time())
+    if granularity == Granularity.DAY:
+        return day
+    if granularity == Granularity.WEEK:
+        return day - timedelta(days=day.weekday())
+    if granularity == Granularity.MONTH:
+        return day.replace(day=1)
+    start_month = settings.academic_session_start_month
+    year = day.year if day.month >= start_month else day.year - 1
+    return datetime(year, start_month, 1)
+
+def next_bucket(bucket: datetime, granularity: Granularity) -> datetime:
+    if granularity == Granularity.DAY:
+        return bucket + timedelta(days=1)
+    if granularity == Granularity.WEEK:
+        return bucket + timedelta(days=7)
+    if granularity == Granularity.MONTH:
+        return bucket.replace(year=bucket.year + bucket.month // 12, month=bucket.month % 12 + 1)
+    return bucket.replace(year=bucket.year + 1)
+
+def buckets(start: date, end: date, granularity: Granularity) -> List[datetime]:
+    """Buckets covering start..end (both inclusive)"""
+    result = []
+    bucket = bucket_start(datetime.combine(start, time()), granularity)
+    last = bucket_start(datetime.combine(end, time()), granularity)
+    while bucket <= last:
+        result.append(bucket)
+        bucket = next_bucket(bucket, granularity)
+    return result
+
+def label(bucket: datetime, granularity: Granularity) -> str:
+    if granularity == Granularity.DAY:
+        return bucket.date().isoformat()
+    if granularity == Granularity.WEEK:
+        year, week, _ = bucket.isocalendar()
+        return f"{year}-W{week:02d}"
+    if granularity == Granularity.MONTH:
+        return bucket.strftime("%b %Y")
+    return f"{bucket.year}/{bucket.year + 1}"
+
+# ---------- closed-period cache ----------
+
+class ClosedPeriodCache:
+    """
+    (metric, granularity, bucket) -> (total, events) for buckets that can no
+    longer change, plus each metric's first event date
+    """
+
+    def __init__(self, max_points: int):
+        self.max_points = max_points
+        self._points: "OrderedDict[tuple, Point]" = OrderedDict()
+        self._first: Dict[AnalyticsMetric, date] = {}
+        self._versions: Dict[AnalyticsMetric, Optional[int]] = {}
+        self._lock = threading.Lock()
+
+    def sync(self, metric: AnalyticsMetric, force: bool = False) -> Optional[int]:
+        """Drop the metric's entries if its shared version moved; returns the version now held"""
+        version = cache_versions.get(METRIC_VERSIONS[metric], force)
+        with self._lock:
+            if metric not in self._versions or self._versions[metric] != version:
+                for key in [k for k in self._points if k[0] == metric]:
+                    del self._points[key]
+                self._first.pop(metric, None)
+                self._versions[metric] = version
+        return version
+
+    def get(self, key: tuple) -> Optional[Point]:
+        with self._lock:
+            point = self._points.get(key)
+            if point is not None:
+                self._points.move_to_end(key)
+            return point
+
+    def put(self, key: tuple, point: Point, version: Optional[int]):
+        """Store a point read at `version`; skipped if the metric has moved on since the read"""
+        with self._lock:
+            if self._versions.get(key[0]) != version:
+                return
+            self._points[key] = point
+            self._points.move_to_end(key)
+            while len(self._points) > self.max_points:
+                self._points.popitem(last=False)
+
+    def get_first(self, metric: AnalyticsMetric) -> Optional[date]:
+        with self._lock:
+            return self._first.get(metric)
+
+    def put_first(self, metric: AnalyticsMetric, first: date, version: Optional[int]):
+        with self._lock:
+            if self._versions.get(metric) == version:
+                self._first[metric] = first
+
+
+closed_periods = ClosedPeriodCache(max_points=settings.analytics_cache_max_points)
+
+# ---------- queries ----------
+
+def _fetch(metric: AnalyticsMetric, granularity: Granularity, start: datetime, end: datetime) -> Dict[datetime, Point]:
+    """Aggregates for buckets in [start, end) in one database call"""
+    tz = local_zone()
+    rows = get_supabase().rpc("analytics_series", {
+        "p_metric": metric.value,
+        "p_granularity": granularity.value,
+        "p_start": start.replace(tzinfo=tz).isoformat(),
+        "p_end": end.replace(tzinfo=tz).isoformat(),
+        "p_tz": settings.analytics_timezone,
+        "p_session_start_month": settings.academic_session_start_month,
+    }).execute().data or []
+
+    return {
+        datetime.fromisoformat(row["bucket"]): (float(row["total"] or 0), int(row["events"] or 0))
+        for row in rows
+    }
+
+def series(metric: AnalyticsMetric, granularity: Granularity, start: date, end: date) -> List[dict]:
+    """One point per bucket from start to end, zero-filled"""
+    periods = buckets(start, end, granularity)
+    if len(periods) > MAX_POINTS:
+        raise ValueError(f"Range covers {len(periods)} {granularity.value} buckets; the limit is {MAX_POINTS}")
+
+    version = closed_periods.sync(metric)
+    settled = local_now() - SETTLE_TIME
+    values: Dict[datetime, Point] = {}
+    runs: List[List[datetime]] = []
+    for i, bucket in enumerate(periods):
+        closed = next_bucket(bucket, granularity) <= settled
+        point = closed_periods.get((metric, granularity, bucket)) if closed else None
+        if point is not None:
+            values[bucket] = point
+        elif runs and runs[-1][-1] == periods[i - 1]:
+            runs[-1].append(bucket)
+        else:
+            runs.append([bucket])
+
+    for run in runs:
+        fetched = _fetch(metric, granularity, run[0], next_bucket(run[-1], granularity))
+        for bucket in run:
+            point = fetched.get(bucket, (0.0, 0))
+            values[bucket] = point
+            if next_bucket(bucket, granularity) <= settled:
+                closed_periods.put((metric, granularity, bucket), point, version)
+
+    return [
+        {
+            "bucket": bucket.date().isoformat(),
+            "label": label(bucket, granularity),
+            "total": values[bucket][0],
+            "count": values[bucket][1],
+        }
+        for bucket in periods
+    ]
+
+def first_event(metric: AnalyticsMetric) -> Optional[date]:
+    """
+    Local date of the metric's earliest event (None when there are none yet).
+    Cached once found: only a change to a closed bucket can move it, and that
+    bumps the metric's version.
+    """
+    version = closed_periods.sync(metric)
+    cached = closed_periods.get_first(metric)
+    if cached is not None:
+        return cached
+
+    tables, column, filters = METRIC_SOURCES[metric]
+    firsts = []
+    for table in tables:
+        query = get_supabase().table(table).select(column)
+        for key, value in filters.items():
+            query = query.eq(key, value)
+        rows = query.not_.is_(column, "null").order(column).limit(1).execute().data
+        if rows:
+            firsts.append(datetime.fromisoformat(rows[0][column].replace("Z", "+00:00")))
+    if not firsts:
+        return None
+    first = min(firsts).astimezone(local_zone()).date()
+    closed_periods.put_first(metric, first, version)
+    return first
+
+def all_time(metric: AnalyticsMetric) -> Point:
+    """Total and event count since the first event, summed over (cached) session buckets"""
+    first = first_event(metric)
+    if first is None:
+        return 0.0, 0
+    points = series(metric, Granularity.SESSION, first, local_now().date())
+    return sum(p["total"] for p in points), sum(p["count"] for p in points)
@@ -0,0 +1,136 @@
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Set
+from app.core.config import settings
+from app.core.enums import PaymentStatus
+from app.core.storage import DELETE_BATCH_SIZE, StorageBackend, get_storage
+from app.core.supabase import get_supabase
+from app.core.uploads import UPLOAD_POLICIES
+from app.utils.export import iter_keyset
+
+# Garbage collection of stored files that nothing refers to any more.
+#
+# Files under the folders the app uploads into (UPLOAD_POLICIES) are listed
+# page by page from storage and diffed against every URL still held in
+# course_payments.receipt_url (and its session archive),
+# course_materials.file_url and users.profile_picture_url. What is left over
+# is orphaned: files of deleted materials and courses, replaced profile
+# pictures, and direct uploads that were never finalized. Receipts of payments rejected more than
+# GC_REJECTED_RECEIPT_DAYS ago stop counting as references; a receipt shared
+# by several payments of one checkout stays while any of them still needs it.
+#
+# Files younger than GC_MIN_AGE_HOURS are never touched, since their row may
+# not be written yet. Deletes go out DELETE_BATCH_SIZE at a time, one batch
+# every GC_DELETE_INTERVAL_SECONDS, to stay inside the storage API's rate
+# limit, and a run deletes at most GC_MAX_DELETES_PER_RUN files.
+
+# (table, column) pairs holding delivery URLs of stored files
+REFERENCES = (
+    ("course_payments", "receipt_url"),
+    ("course_payments_archive", "receipt_url"),
+    ("course_materials", "file_url"),
+    ("users", "profile_picture_url"),
+)
+
+# Orphan public ids listed in the report
+REPORT_SAMPLE = 50
+
+
+def _parse(value: str) -> datetime:
+    moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+def gc_folders() -> List[str]:
+    return sorted({policy.folder for policy in UPLOAD_POLICIES.values()})
+
+def referenced_ids(storage: StorageBackend) -> Set[str]:
+    """Public ids of every stored file a row still points at"""
+    rejected_cutoff = datetime.now(timezone.utc) - timedelta(days=settings.gc_rejected_receipt_days)
+    referenced = set()
+
+    for table, column in REFERENCES:
+        extra = ", status, reviewed_at" if table.startswith("course_payments") else ""
+
+        def build_query(table=table, column=column, extra=extra):
+            return get_supabase().table(table).select(f"id, {column}{extra}").not_.is_(column, "null")
+
+        for row in iter_keyset(build_query):
+            if (
+                row.get("status") == PaymentStatus.REJECTED
+                and row.get("reviewed_at")
+                and _parse(row["reviewed_at"]) < rejected_cutoff
+            ):
+                continue
+            public_id = storage.public_id(row[column])
+            if public_id:
+                referenced.add(public_id)
+
+    return referenced
+
+def stored_assets(storage: StorageBackend) -> Iterator[dict]:
+    """Every stored file under the GC folders, with its resource type"""
+    for folder in gc_folders():
+        for resource_type in storage.resource_types:
+            cursor = None
+            while True:
+                page, cursor = storage.list_resources(resource_type, f"{folder}/", cursor)
+                for asset in page:
+                    yield {**asset, "resource_type": resource_type}
+                if not cursor:
+                    break
+
+def collect(dry_run: bool = True, report: Optional[Callable[[dict], None]] = None) -> dict:
+    """
+    Find orphaned files and, unless dry_run, delete them. Returns counts,
+    orphan bytes and a sample of orphan ids; `report` receives the same
+    summary after the scan and after every delete batch.
+    """
+    storage = get_storage()
+    referenced = referenced_ids(storage)
+    youngest = datetime.now(timezone.utc) - timedelta(hours=settings.gc_min_age_hours)
+
+    summary = {
+        "dry_run": dry_run,
+        "referenced": len(referenced),
+        "scanned": 0,
+        "recent_skipped": 0,
+        "orphans": 0,
+        "orphan_bytes": 0,
+        "deleted": 0,
+        "sample": [],
+    }
+    doomed: Dict[str, List[str]] = {}
+    queued = 0
+
+    for asset in stored_assets(storage):
+        summary["scanned"] += 1
+        if asset["public_id"] in referenced:
+            continue
+        if asset.get("created_at") and _parse(asset["created_at"]) > youngest:
+            summary["recent_skipped"] += 1
+            continue
+
+        summary["orphans"] += 1
+        summary["orphan_bytes"] += asset.get("bytes") or 0
+        if len(summary["sample"]) < REPORT_SAMPLE:
+            summary["sample"].append(asset["public_id"])
+        if not dry_run and queued < settings.gc_max_deletes_per_run:
+            doomed.setdefault(asset["resource_type"], []).append(asset["public_id"])
+            queued += 1
+
+    if report:
+        report(summary)
+
+    first = True
+    for resource_type, public_ids in doomed.items():
+        for start in range(0, len(public_ids), DELETE_BATCH_SIZE):
+            if not first:
+                time.sleep(settings.gc_delete_interval_seconds)
+            first = False
+            batch = public_ids[start:start + DELETE_BATCH_SIZE]
+            storage.delete_many(batch, resource_type)
+            summary["deleted"] += len(batch)
+            if report:
+                report(summary)
+
+    return summary
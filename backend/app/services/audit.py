@@ -0,0 +1,121 @@
+import asyncio
+import contextvars
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import List, Optional
+from app.core.config import settings
+from app.core.supabase import get_primary_supabase
+
+# Audit trail of admin actions (migrations/0010_audit_log.sql).
+#
+# Handlers call record(), which only appends to an in-memory ring buffer. A
+# background task drains it every AUDIT_FLUSH_INTERVAL_SECONDS, writing up to
+# AUDIT_BATCH_SIZE events per insert, so a request never waits on audit I/O.
+# The buffer holds at most AUDIT_BUFFER_SIZE events: if the database stays
+# unreachable long enough to fill it, the oldest events are dropped and
+# counted rather than growing memory without bound. Whatever is still
+# buffered is flushed on shutdown.
+
+logger = logging.getLogger("app.audit")
+
+
+class AuditBuffer:
+    def __init__(self, capacity: int):
+        self._events: deque = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self.dropped = 0
+        self.written = 0
+        self.failed_flushes = 0
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def push(self, event: dict):
+        with self._lock:
+            if len(self._events) == self._events.maxlen:
+                self.dropped += 1
+            self._events.append(event)
+
+    def take(self, limit: int) -> List[dict]:
+        with self._lock:
+            return [self._events.popleft() for _ in range(min(limit, len(self._events)))]
+
+    def put_back(self, events: List[dict]):
+        """Return a batch that failed to write, ahead of newer events, as far as there is room"""
+        with self._lock:
+            room = self._events.maxlen - len(self._events)
+            kept = events[len(events) - room:] if room < len(events) else events
+            self.dropped += len(events) - len(kept)
+            self._events.extendleft(reversed(kept))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "buffered": len(self._events),
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed_flushes": self.failed_flushes,
+            }
+
+
+audit_buffer = AuditBuffer(settings.audit_buffer_size)
+_flusher: Optional[asyncio.Task] = None
+
+
+def record(actor: Optional[dict], action: str, target_type: Optional[str] = None, target_id=None, **details):
+    """Queue an audit event; never blocks on the database"""
+    audit_buffer.push({
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "actor_id": actor["id"] if actor else None,
+        "action": action,
+        "target_type": target_type,
+        "target_id": None if target_id is None else str(target_id),
+        "details": details,
+    })
+    start_flusher()
+
+def flush() -> int:
+    """Write everything buffered, one insert per batch; returns the number of events written"""
+    written = 0
+    while True:
+        batch = audit_buffer.take(settings.audit_batch_size)
+        if not batch:
+            return written
+        try:
+            get_primary_supabase().rpc("audit_log_append", {"p_events": batch}).execute()
+        except Exception:
+            audit_buffer.put_back(batch)
+            audit_buffer.failed_flushes += 1
+            logger.exception("audit flush failed; %s events kept for retry", len(batch))
+            return written
+        audit_buffer.written += len(batch)
+        written += len(batch)
+
+async def _run_flusher():
+    while True:
+        await asyncio.sleep(settings.audit_flush_interval_seconds)
+        if len(audit_buffer):
+            await asyncio.to_thread(flush)
+
+def start_flusher():
+    """Start the background flusher on the running event loop, once"""
+    global _flusher
+    if _flusher is not None and not _flusher.done():
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Called from a worker thread; the next call on the loop starts it
+        return
+    # A fresh context, so the task does not inherit the request's read routing
+    _flusher = loop.create_task(_run_flusher(), context=contextvars.Context())
+
+async def stop_flusher():
+    """Stop the background flusher and write what is left"""
+    global _flusher
+    if _flusher is not None:
+        _flusher.cancel()
+        _flusher = None
+    await asyncio.to_thread(flush)
@@ -0,0 +1,51 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional
+from app.core.config import settings
+from app.core.supabase import get_primary_supabase
+
+# Shared version counters for per-process caches
+# (migrations/0013_cache_versions.sql).
+#
+# A cache held in one worker's memory never sees writes handled by another
+# worker or serverless instance. Database triggers bump a named counter in
+# cache_versions whenever the rows behind a cache change; each process
+# re-reads all counters at most every CACHE_VERSION_CHECK_SECONDS (one small
+# query, always on the primary), and a cache whose counter moved drops its
+# entries. Stale reads after a write elsewhere are bounded by that interval
+# rather than by the cache's TTL. If the counters cannot be read, the last
+# known values stand and the caches fall back to their TTLs.
+
+logger = logging.getLogger("app.cache_versions")
+
+
+class CacheVersions:
+    def __init__(self, check_seconds: float):
+        self.check_seconds = check_seconds
+        self._versions: Dict[str, int] = {}
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        try:
+            rows = get_primary_supabase().table("cache_versions").select("name, version").execute().data
+        except Exception:
+            logger.exception("cache version check failed; keeping the last known versions")
+            rows = None
+        with self._lock:
+            if rows is not None:
+                self._versions = {row["name"]: row["version"] for row in rows}
+            self._checked_at = time.monotonic()
+
+    def get(self, name: str, force: bool = False) -> Optional[int]:
+        """The counter for `name`, re-read if the last check is older than check_seconds (or if forced)"""
+        with self._lock:
+            due = self._checked_at is None or time.monotonic() - self._checked_at >= self.check_seconds
+        if force or due:
+            self.refresh()
+        with self._lock:
+            return self._versions.get(name)
+
+
+cache_versions = CacheVersions(settings.cache_version_check_seconds)
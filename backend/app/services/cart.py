@@ -0,0 +1,91 @@
+from typing import List, Optional
+from app.core.supabase import get_supabase
+
+# Registration cart (migrations/0006_registration_cart.sql). Validation and
+# checkout run in the database so a whole cart costs one round-trip however
+# many courses it holds.
+
+MAX_CART_ITEMS = 20
+
+OK = "ok"
+EMPTY = "empty"
+INVALID = "invalid"
+AMOUNT_MISMATCH = "amount_mismatch"
+
+# Problems reported by validate_registration, worst first
+COURSE_NOT_FOUND = "course_not_found"
+CONFLICTS = ("duplicate", "already_registered", "payment_approved", "payment_pending")
+
+PROBLEM_MESSAGES = {
+    "course_not_found": "Course not found",
+    "duplicate": "Course listed more than once",
+    "wrong_department": "Course is not offered to your department",
+    "wrong_session": "Course belongs to a different session",
+    "already_registered": "Already registered for this course",
+    "payment_approved": "Payment for this course is already approved",
+    "payment_pending": "A payment for this course is awaiting review",
+}
+
+def validate(student_id: str, course_ids: Optional[List[int]] = None, session: Optional[str] = None) -> dict:
+    """Lines (course, fee, problem) for the given courses, or the student's cart when None"""
+    lines = get_supabase().rpc(
+        "validate_registration",
+        {"p_student_id": student_id, "p_course_ids": course_ids, "p_session": session}
+    ).execute().data or []
+
+    for line in lines:
+        if line["problem"]:
+            line["message"] = PROBLEM_MESSAGES.get(line["problem"], line["problem"])
+
+    return {
+        "items": lines,
+        "total": sum(line["fee"] or 0 for line in lines),
+        "problems": [line for line in lines if line["problem"]],
+    }
+
+def checkout(
+    student_id: str,
+    receipt_url: str,
+    expected_total: float,
+    course_ids: Optional[List[int]] = None,
+    session: Optional[str] = None
+) -> dict:
+    """Re-validate under a per-student lock and insert every payment at once"""
+    return get_supabase().rpc(
+        "checkout_registration",
+        {
+            "p_student_id": student_id,
+            "p_receipt_url": receipt_url,
+            "p_expected_total": expected_total,
+            "p_course_ids": course_ids,
+            "p_session": session,
+        }
+    ).execute().data
+
+def problem_status_code(problems: List[dict]) -> int:
+    codes = {p["problem"] for p in problems}
+    if COURSE_NOT_FOUND in codes:
+        return 404
+    if codes & set(CONFLICTS):
+        return 409
+    return 400
+
+def cart_size(student_id: str) -> int:
+    return get_supabase().table("cart_items")\
+        .select("course_id", count="exact")\
+        .eq("student_id", student_id)\
+        .limit(1)\
+        .execute()\
+        .count or 0
+
+def add_items(student_id: str, course_ids: List[int]):
+    rows = [{"student_id": student_id, "course_id": course_id} for course_id in dict.fromkeys(course_ids)]
+    get_supabase().table("cart_items")\
+        .upsert(rows, on_conflict="student_id,course_id", ignore_duplicates=True)\
+        .execute()
+
+def remove_item(student_id: str, course_id: int):
+    get_supabase().table("cart_items").delete().eq("student_id", student_id).eq("course_id", course_id).execute()
+
+def clear(student_id: str):
+    get_supabase().table("cart_items").delete().eq("student_id", student_id).execute()
@@ -0,0 +1,108 @@
+import difflib
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.projections import COURSE
+from app.core.supabase import get_supabase
+from app.utils.export import iter_keyset
+
+# In-process prefix index over the course catalog.
+#
+# The catalog is small (hundreds of rows) and read far more often than it
+# changes, so course search never touches the database: every course code,
+# title and title word is kept in one sorted array of (key, rank, course) and a
+# prefix lookup is a bisect plus a short forward scan. Course writes invalidate
+# the index in this process; other workers pick changes up after
+# COURSE_INDEX_TTL_SECONDS.
+
+# Lower is better: exact code, code prefix, title prefix, title word prefix
+EXACT_CODE, CODE_PREFIX, TITLE_PREFIX, WORD_PREFIX, FUZZY = range(5)
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    return " ".join(WORD_RE.findall((text or "").lower()))
+
+def compact(text: str) -> str:
+    """Course codes are matched without spaces, so "CSC 101" == "csc101"."""
+    return "".join(WORD_RE.findall((text or "").lower()))
+
+
+class CourseIndex:
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._keys: List[str] = []
+        self._entries: List[Tuple[str, int, int]] = []
+        self._courses: Dict[int, dict] = {}
+        self._codes: Dict[str, int] = {}
+        self._built_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._built_at = None
+
+    def _load(self) -> List[dict]:
+        return list(iter_keyset(lambda: get_supabase().table("courses").select(COURSE)))
+
+    def _build(self, courses: List[dict]):
+        entries = []
+        codes = {}
+        for course in courses:
+            course_id = course["id"]
+            code = compact(course.get("course_code"))
+            title = normalize(course.get("title"))
+            if code:
+                entries.append((code, CODE_PREFIX, course_id))
+                codes[code] = course_id
+            if title:
+                entries.append((title, TITLE_PREFIX, course_id))
+                for word in set(title.split()[1:]):
+                    entries.append((word, WORD_PREFIX, course_id))
+        entries.sort()
+
+        self._entries = entries
+        self._keys = [key for key, _, _ in entries]
+        self._courses = {course["id"]: course for course in courses}
+        self._codes = codes
+
+    def _ensure_fresh(self):
+        with self._lock:
+            if self._built_at is not None and time.monotonic() - self._built_at < self.ttl_seconds:
+                return
+            self._build(self._load())
+            self._built_at = time.monotonic()
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> Tuple[List[dict], int]:
+        """Ranked matches for `query` and the total count; typo'd codes fall back to fuzzy matching"""
+        self._ensure_fresh()
+        entries, keys, courses, codes = self._entries, self._keys, self._courses, self._codes
+
+        best: Dict[int, int] = {}
+        code_query = compact(query)
+        for term, exact_code in ((normalize(query), False), (code_query, True)):
+            if not term:
+                continue
+            i = bisect_left(keys, term)
+            while i < len(keys) and keys[i].startswith(term):
+                _, rank, course_id = entries[i]
+                if rank == CODE_PREFIX and exact_code and keys[i] == term:
+                    rank = EXACT_CODE
+                if rank < best.get(course_id, FUZZY + 1):
+                    best[course_id] = rank
+                i += 1
+
+        if not best and len(code_query) >= 3:
+            for code in difflib.get_close_matches(code_query, codes.keys(), n=limit, cutoff=0.75):
+                best[codes[code]] = FUZZY
+
+        ranked = sorted(best.items(), key=lambda item: (item[1], compact(courses[item[0]].get("course_code"))))
+        page = [{**courses[course_id], "rank": rank} for course_id, rank in ranked[offset:offset + limit]]
+        return page, len(ranked)
+
+
+course_index = CourseIndex(settings.course_index_ttl_seconds)
@@ -0,0 +1,84 @@
+import hashlib
+import os
+import tempfile
+from typing import Optional
+import orjson
+from app.core.storage import get_storage
+from app.jobs import enqueue, get_job_store
+from app.jobs.store import DEAD, DONE
+from app.services.pdf_render import TEMPLATE_VERSION, render_pdf
+
+# PDF documents (transcripts, registration slips).
+#
+# The API gathers the data and queues a render on the durable job queue
+# (app/jobs); `python -m app.worker` renders the PDF and puts it in storage
+# (get_storage(), so Cloudinary in production). Status and download requests
+# can therefore land on any instance, serverless ones included. Files are
+# content-addressed: the id is a hash of the kind, template version and data,
+# so regenerating a document whose data hasn't changed finds the stored file
+# and queues nothing. Files are stored per student, which is also the
+# ownership check.
+
+RENDER_JOB = "document.render"
+DOCUMENTS_FOLDER = "wmou_portal/documents"
+
+READY = "ready"
+PENDING = "pending"
+FAILED = "failed"
+MISSING = "missing"
+
+
+def document_id(kind: str, data: dict) -> str:
+    payload = orjson.dumps({"kind": kind, "v": TEMPLATE_VERSION, "data": data}, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(payload).hexdigest()
+
+def document_public_id(student_id: str, doc_id: str) -> str:
+    # Raw assets keep the extension in their public id
+    return f"{DOCUMENTS_FOLDER}/{student_id}/{doc_id}.pdf"
+
+def stored_document(student_id: str, doc_id: str) -> Optional[dict]:
+    """Storage's record of a rendered document, or None"""
+    return get_storage().resource(document_public_id(student_id, doc_id), "raw")
+
+def document_url(student_id: str, doc_id: str) -> Optional[str]:
+    """Delivery URL of a rendered document, or None if it is not stored (yet)"""
+    stored = stored_document(student_id, doc_id)
+    if stored is None:
+        return None
+    return get_storage().url({
+        "public_id": document_public_id(student_id, doc_id),
+        "version": stored["version"],
+        "resource_type": "raw",
+    })
+
+def _latest_job(student_id: str, doc_id: str) -> Optional[dict]:
+    return get_job_store().find_latest(RENDER_JOB, {"document_id": doc_id, "student_id": student_id})
+
+def request_document(student_id: str, kind: str, data: dict) -> dict:
+    """Return the stored document if this exact content was rendered before, else queue it"""
+    doc_id = document_id(kind, data)
+    if stored_document(student_id, doc_id) is not None:
+        return {"document_id": doc_id, "status": READY}
+
+    job = _latest_job(student_id, doc_id)
+    # A finished job whose file is gone (or a dead one) is rendered again
+    if job is None or job["status"] in (DONE, DEAD):
+        enqueue(RENDER_JOB, {"student_id": student_id, "document_id": doc_id, "kind": kind, "data": data})
+    return {"document_id": doc_id, "status": PENDING}
+
+def document_status(student_id: str, doc_id: str) -> str:
+    if stored_document(student_id, doc_id) is not None:
+        return READY
+
+    job = _latest_job(student_id, doc_id)
+    if job is None or job["status"] == DONE:
+        return MISSING
+    return FAILED if job["status"] == DEAD else PENDING
+
+def render_and_store(student_id: str, doc_id: str, kind: str, data: dict) -> dict:
+    """Render a queued document and upload it (runs in the worker)"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = render_pdf(kind, data, os.path.join(directory, f"{doc_id}.pdf"))
+        with open(path, "rb") as file:
+            result = get_storage().upload(file, "raw", public_id=document_public_id(student_id, doc_id))
+    return {"document_id": doc_id, "bytes": result.get("bytes")}
@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+from typing import List
+from app.core.enums import PaymentStatus
+from app.core.supabase import get_supabase
+from app.services.registrations import reserve_seats, COURSE_FULL
+
+# Payments updated per request when approving in bulk (keeps the id list in the URL short)
+APPROVAL_CHUNK_SIZE = 200
+
+def approve_payments(payment_ids: List[int], admin_id: str) -> dict:
+    """
+    Batch approval path: reserve seats for every pending payment in one RPC per
+    chunk, then flip all of them to approved with a single UPDATE ... IN (...).
+    Payments whose course is full are left pending and reported back.
+    """
+    approved, course_full = [], []
+
+    for start in range(0, len(payment_ids), APPROVAL_CHUNK_SIZE):
+        chunk = payment_ids[start:start + APPROVAL_CHUNK_SIZE]
+
+        pending = (
+            get_supabase().table("course_payments")
+            .select(
+                "id, student_id, course_id, "
+                "student:users!course_payments_student_id_fkey(email, full_name), "
+                "courses(title)"
+            )
+            .in_("id", chunk)
+            .eq("status", PaymentStatus.PENDING)
+            .execute()
+            .data
+        )
+        if not pending:
+            continue
+
+        seats = reserve_seats([(p["student_id"], p["course_id"]) for p in pending])
+
+        ready = []
+        for p in pending:
+            if seats.get((p["student_id"], p["course_id"])) == COURSE_FULL:
+                course_full.append(p["id"])
+            else:
+                ready.append(p)
+
+        if ready:
+            get_supabase().table("course_payments").update({
+                "status": PaymentStatus.APPROVED,
+                "reviewed_at": datetime.now(timezone.utc).isoformat(),
+                "reviewed_by": admin_id
+            }).in_("id", [p["id"] for p in ready]).execute()
+            approved.extend(ready)
+
+    return {"approved": approved, "course_full": course_full}
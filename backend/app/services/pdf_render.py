@@ -0,0 +1,87 @@
+import os
+from typing import List
+from xml.sax.saxutils import escape
+
+# Runs inside the job worker (app/services/documents.py): keep this module
+# free of app imports, and import reportlab lazily so the API never loads it.
+
+TEMPLATE_VERSION = 1
+WMOU_BLUE = "#1e3a5f"
+
+def _table(rows: List[list], col_widths: List[float]):
+    from reportlab.lib import colors
+    from reportlab.platypus import Table, TableStyle
+
+    table = Table(rows, colWidths=col_widths, repeatRows=1)
+    table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor(WMOU_BLUE)),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), 9),
+        ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#cbd5e1")),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f8fafc")]),
+    ]))
+    return table
+
+def _header(story: list, title: str, student: dict):
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, Spacer
+
+    styles = getSampleStyleSheet()
+    story.append(Paragraph("WMOU Portal", styles["Title"]))
+    story.append(Paragraph(title, styles["Heading2"]))
+    story.append(Paragraph(
+        f"<b>Name:</b> {escape(student.get('full_name') or '')} &nbsp;&nbsp; "
+        f"<b>Reg No:</b> {escape(student.get('reg_no') or '')} &nbsp;&nbsp; "
+        f"<b>Department:</b> {escape(student.get('department') or '')}",
+        styles["Normal"]
+    ))
+    story.append(Spacer(1, 12))
+
+def _transcript(story: list, data: dict):
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, Spacer
+
+    styles = getSampleStyleSheet()
+    _header(story, "Academic Transcript", data["student"])
+
+    for term in data["terms"]:
+        story.append(Paragraph(f"{term['session']} - {term['semester']}", styles["Heading3"]))
+        rows = [["Course Code", "Title", "Score", "Grade"]]
+        rows += [[r["course_code"], r["title"], r["score"], r["grade"]] for r in term["results"]]
+        story.append(_table(rows, [80, 260, 60, 60]))
+        story.append(Paragraph(f"<b>GPA:</b> {term['gpa']}", styles["Normal"]))
+        story.append(Spacer(1, 10))
+
+    story.append(Paragraph(f"<b>CGPA:</b> {data['cgpa']}", styles["Heading3"]))
+
+def _registration_slip(story: list, data: dict):
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, Spacer
+
+    styles = getSampleStyleSheet()
+    _header(story, f"Course Registration Slip - {data['session']} {data['semester']}", data["student"])
+
+    rows = [["Course Code", "Title", "Fee", "Registered"]]
+    rows += [[c["course_code"], c["title"], f"{c['fee']:,.2f}", c["registered_at"]] for c in data["courses"]]
+    story.append(_table(rows, [80, 240, 70, 90]))
+    story.append(Spacer(1, 10))
+    story.append(Paragraph(f"<b>Total courses:</b> {len(data['courses'])}", styles["Normal"]))
+
+RENDERERS = {
+    "transcript": _transcript,
+    "registration-slip": _registration_slip,
+}
+
+def render_pdf(kind: str, data: dict, path: str) -> str:
+    """Render a document to `path` (written to a temp file first, then moved into place)"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate
+
+    story: list = []
+    RENDERERS[kind](story, data)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    SimpleDocTemplate(tmp_path, pagesize=A4, title=kind).build(story)
+    os.replace(tmp_path, path)
+    return path
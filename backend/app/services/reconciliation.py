@@ -0,0 +1,275 @@
+import csv
+import io
+import re
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.core.enums import PaymentStatus
+from app.core.supabase import get_supabase
+from app.utils.export import iter_keyset
+
+# Bank statement reconciliation.
+#
+# Statement lines are matched to pending course_payments with hash joins:
+# pending payments are indexed once by (reg_no, amount) and by amount alone,
+# each bucket sorted by date, so every statement line costs a dict lookup plus
+# a bisect over its date window instead of a scan of all pending payments.
+# Payments submitted together with one receipt (upload-proof-bulk) are matched
+# as a single group against their combined amount.
+
+HIGH = "high"
+MEDIUM = "medium"
+LOW = "low"
+
+DATE_HEADERS = ("date", "transaction date", "value date", "trans date", "posting date")
+AMOUNT_HEADERS = ("amount", "credit", "deposit", "credit amount", "amount paid")
+DESCRIPTION_HEADERS = ("description", "narration", "details", "remarks", "reference", "memo")
+DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d-%b-%Y", "%d %b %Y", "%m/%d/%Y", "%Y/%m/%d")
+
+TOKEN_RE = re.compile(r"[A-Z0-9/\-]+")
+
+
+@dataclass
+class StatementLine:
+    line_no: int
+    date: date
+    amount: int  # kobo, so amounts compare exactly
+    description: str
+
+
+@dataclass
+class PaymentGroup:
+    payment_ids: List[int]
+    student_id: str
+    reg_no: Optional[str]
+    amount: int
+    date: date
+
+
+@dataclass
+class Match:
+    line: StatementLine
+    group: PaymentGroup
+    confidence: str
+    reason: str
+
+
+@dataclass
+class ReconciliationResult:
+    matches: List[Match] = field(default_factory=list)
+    unmatched_lines: List[StatementLine] = field(default_factory=list)
+
+
+# ---------- parsing ----------
+
+def to_kobo(value) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(round(float(value) * 100))
+    cleaned = re.sub(r"[^\d.\-]", "", str(value))
+    if cleaned in ("", "-", "."):
+        return None
+    return int(round(float(cleaned) * 100))
+
+def to_date(value) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not value:
+        return None
+    text = str(value).strip()
+    try:
+        return datetime.fromisoformat(text.replace("Z", "+00:00")).date()
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+def _find_column(headers: List[str], candidates: Tuple[str, ...]) -> Optional[int]:
+    for candidate in candidates:
+        if candidate in headers:
+            return headers.index(candidate)
+    return None
+
+def _read_rows(filename: str, content: bytes) -> Iterable[list]:
+    if filename.lower().endswith((".xlsx", ".xlsm")):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+        yield from workbook.active.iter_rows(values_only=True)
+        workbook.close()
+    else:
+        yield from csv.reader(io.StringIO(content.decode("utf-8-sig")))
+
+def parse_statement(filename: str, content: bytes) -> List[StatementLine]:
+    """Read a CSV/XLSX bank statement; keeps credit lines with a usable date and amount"""
+    rows = _read_rows(filename, content)
+    header = next(rows, None)
+    if not header:
+        raise ValueError("Statement is empty")
+
+    headers = [str(h or "").strip().lower() for h in header]
+    date_col = _find_column(headers, DATE_HEADERS)
+    amount_col = _find_column(headers, AMOUNT_HEADERS)
+    description_col = _find_column(headers, DESCRIPTION_HEADERS)
+    if date_col is None or amount_col is None:
+        raise ValueError("Statement needs a date column and an amount/credit column")
+
+    lines = []
+    for line_no, row in enumerate(rows, start=2):
+        if not row or len(row) <= max(date_col, amount_col):
+            continue
+        amount = to_kobo(row[amount_col])
+        line_date = to_date(row[date_col])
+        if not amount or amount <= 0 or line_date is None:
+            continue
+        description = str(row[description_col] or "") if description_col is not None and description_col < len(row) else ""
+        lines.append(StatementLine(line_no, line_date, amount, description))
+
+    return lines
+
+
+# ---------- pending payments ----------
+
+def load_pending_groups() -> List[PaymentGroup]:
+    """Pending payments grouped by receipt (one bank transfer may cover several courses)"""
+    def build_query():
+        return (
+            get_supabase().table("course_payments")
+            .select("id, student_id, amount_paid, receipt_url, created_at, student:users!course_payments_student_id_fkey(reg_no)")
+            .eq("status", PaymentStatus.PENDING)
+        )
+
+    groups: Dict[Tuple[str, str], PaymentGroup] = {}
+    for row in iter_keyset(build_query):
+        key = (row["student_id"], row.get("receipt_url") or f"payment:{row['id']}")
+        group = groups.get(key)
+        if group is None:
+            student = row.get("student") or {}
+            groups[key] = PaymentGroup(
+                payment_ids=[row["id"]],
+                student_id=row["student_id"],
+                reg_no=(student.get("reg_no") or "").upper() or None,
+                amount=to_kobo(row.get("amount_paid")) or 0,
+                date=to_date(row.get("created_at")) or date.min,
+            )
+        else:
+            group.payment_ids.append(row["id"])
+            group.amount += to_kobo(row.get("amount_paid")) or 0
+
+    return list(groups.values())
+
+
+# ---------- matching ----------
+
+class _DateIndex:
+    """Groups in one hash bucket, sorted by date for window lookups"""
+    __slots__ = ("ordinals", "groups")
+
+    def __init__(self, groups: List[PaymentGroup]):
+        groups.sort(key=lambda g: g.date)
+        self.groups = groups
+        self.ordinals = [g.date.toordinal() for g in groups]
+
+    def window(self, center: date, days: int) -> List[PaymentGroup]:
+        lo = bisect_left(self.ordinals, center.toordinal() - days)
+        hi = bisect_right(self.ordinals, center.toordinal() + days)
+        return self.groups[lo:hi]
+
+def _build_index(groups: List[PaymentGroup], key) -> Dict:
+    buckets = defaultdict(list)
+    for group in groups:
+        buckets[key(group)].append(group)
+    return {k: _DateIndex(v) for k, v in buckets.items()}
+
+def match_statement(lines: List[StatementLine], groups: List[PaymentGroup], window_days: int = 3) -> ReconciliationResult:
+    """
+    Confidence levels:
+      high   - reg_no in the narration, exact amount, date in window, single candidate
+      medium - reg_no and amount agree but several candidates fit; closest date wins
+      low    - no reg_no, but exactly one pending payment has that amount in the window
+    Each pending payment is claimed at most once.
+    """
+    by_student_amount = _build_index([g for g in groups if g.reg_no], lambda g: (g.reg_no, g.amount))
+    by_amount = _build_index(groups, lambda g: g.amount)
+    reg_nos = {g.reg_no for g in groups if g.reg_no}
+
+    claimed = set()
+    result = ReconciliationResult()
+
+    def closest(candidates: List[PaymentGroup], line: StatementLine) -> List[PaymentGroup]:
+        free = [g for g in candidates if id(g) not in claimed]
+        free.sort(key=lambda g: abs(g.date.toordinal() - line.date.toordinal()))
+        return free
+
+    for line in lines:
+        tokens = set(TOKEN_RE.findall(line.description.upper())) & reg_nos
+        match = None
+
+        for reg_no in tokens:
+            index = by_student_amount.get((reg_no, line.amount))
+            if index is None:
+                continue
+            candidates = closest(index.window(line.date, window_days), line)
+            if candidates:
+                confidence = HIGH if len(candidates) == 1 else MEDIUM
+                match = Match(line, candidates[0], confidence, f"reg_no {reg_no} and amount match")
+                break
+
+        if match is None and not tokens:
+            index = by_amount.get(line.amount)
+            if index is not None:
+                candidates = closest(index.window(line.date, window_days), line)
+                if len(candidates) == 1:
+                    match = Match(line, candidates[0], LOW, "amount and date match, no reg_no in narration")
+
+        if match is None:
+            result.unmatched_lines.append(line)
+        else:
+            claimed.add(id(match.group))
+            result.matches.append(match)
+
+    return result
+
+def summarize(result: ReconciliationResult) -> dict:
+    """JSON-friendly view of a reconciliation run"""
+    counts = defaultdict(int)
+    for m in result.matches:
+        counts[m.confidence] += 1
+
+    return {
+        "matched": len(result.matches),
+        "unmatched": len(result.unmatched_lines),
+        "by_confidence": dict(counts),
+        "proposals": [
+            {
+                "line_no": m.line.line_no,
+                "date": m.line.date.isoformat(),
+                "amount": m.line.amount / 100,
+                "description": m.line.description,
+                "payment_ids": m.group.payment_ids,
+                "reg_no": m.group.reg_no,
+                "payment_date": m.group.date.isoformat(),
+                "confidence": m.confidence,
+                "reason": m.reason,
+            }
+            for m in result.matches
+        ],
+        "unmatched_lines": [
+            {
+                "line_no": line.line_no,
+                "date": line.date.isoformat(),
+                "amount": line.amount / 100,
+                "description": line.description,
+            }
+            for line in result.unmatched_lines
+        ],
+    }
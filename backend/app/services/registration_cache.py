@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import FrozenSet, Iterable, Optional, Tuple
+from app.core.config import settings
+from app.core.supabase import get_supabase
+from app.services.cache_versions import cache_versions
+
+# Per-student set of registered course ids, for material access checks.
+#
+# A student browsing materials asks "am I registered for this course?" on
+# every page. The set of their registrations is loaded with one query the
+# first time and answered from memory afterwards. Seat reservation and
+# release (app/services/registrations.py) drop the affected students' sets in
+# this worker. A course missing from a cached set triggers one reload before
+# access is refused, so a registration approved through another worker is
+# picked up immediately. A removal anywhere (seat release, a course or user
+# delete, a fix by hand) bumps the shared "registrations" version
+# (migrations/0015_registration_cache_version.sql), and every other worker
+# drops its sets within CACHE_VERSION_CHECK_SECONDS; entries also expire after
+# REGISTRATION_CACHE_TTL_SECONDS.
+
+
+class RegistrationCache:
+    def __init__(self, max_students: int, ttl_seconds: int):
+        self.max_students = max_students
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, FrozenSet[int]]]" = OrderedDict()
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def sync(self) -> Optional[int]:
+        """Drop every entry if the shared registrations version moved; returns the version now held"""
+        version = cache_versions.get("registrations")
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+        return version
+
+    def get(self, student_id: str) -> Optional[FrozenSet[int]]:
+        with self._lock:
+            entry = self._entries.get(student_id)
+            if entry is None:
+                return None
+            stored_at, courses = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[student_id]
+                return None
+            self._entries.move_to_end(student_id)
+            return courses
+
+    def put(self, student_id: str, courses: FrozenSet[int], version: Optional[int]):
+        """Store a set read at `version`; skipped if the cache has moved on since the read"""
+        with self._lock:
+            if version != self._version:
+                return
+            self._entries[student_id] = (time.monotonic(), courses)
+            self._entries.move_to_end(student_id)
+            while len(self._entries) > self.max_students:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, student_ids: Iterable[str]):
+        with self._lock:
+            for student_id in student_ids:
+                self._entries.pop(student_id, None)
+
+
+registration_cache = RegistrationCache(settings.registration_cache_max_students, settings.registration_cache_ttl_seconds)
+
+
+def load_registered_courses(student_id: str, version: Optional[int]) -> FrozenSet[int]:
+    rows = get_supabase().table("course_registrations")\
+        .select("course_id")\
+        .eq("student_id", student_id)\
+        .execute()\
+        .data
+    courses = frozenset(row["course_id"] for row in rows)
+    registration_cache.put(student_id, courses, version)
+    return courses
+
+def is_registered(student_id: str, course_id: int) -> bool:
+    version = registration_cache.sync()
+    courses = registration_cache.get(student_id)
+    if courses is not None and course_id in courses:
+        return True
+    return course_id in load_registered_courses(student_id, version)
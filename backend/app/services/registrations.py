@@ -0,0 +1,45 @@
+from typing import Dict, List, Tuple
+from app.core.supabase import get_supabase
+from app.services.registration_cache import registration_cache
+
+# Seat bookkeeping lives in the database (migrations/0001_course_seat_counters.sql)
+# so the counters and capacity check update atomically with the registration row.
+# Each change also drops the student's cached registration set (material access).
+
+REGISTERED = "registered"
+ALREADY_REGISTERED = "already_registered"
+COURSE_FULL = "full"
+COURSE_NOT_FOUND = "course_not_found"
+
+def reserve_seat(student_id: str, course_id: int) -> str:
+    """Register the student if the course has room; returns one of the status constants above"""
+    response = get_supabase().rpc(
+        "register_student_for_course",
+        {"p_student_id": student_id, "p_course_id": course_id}
+    ).execute()
+    registration_cache.invalidate([student_id])
+    return response.data
+
+def release_seat(student_id: str, course_id: int) -> bool:
+    """Remove a registration and free its seat; False if the student wasn't registered"""
+    response = get_supabase().rpc(
+        "release_course_seat",
+        {"p_student_id": student_id, "p_course_id": course_id}
+    ).execute()
+    registration_cache.invalidate([student_id])
+    return bool(response.data)
+
+def reserve_seats(pairs: List[Tuple[str, int]]) -> Dict[Tuple[str, int], str]:
+    """reserve_seat for many (student_id, course_id) pairs in a single round-trip"""
+    if not pairs:
+        return {}
+
+    response = get_supabase().rpc(
+        "register_students_batch",
+        {
+            "p_student_ids": [student_id for student_id, _ in pairs],
+            "p_course_ids": [course_id for _, course_id in pairs],
+        }
+    ).execute()
+    registration_cache.invalidate(student_id for student_id, _ in pairs)
+    return {(row["student_id"], row["course_id"]): row["status"] for row in response.data}
@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+import orjson
+from app.core.config import settings
+from app.core.projections import COURSE_SUMMARY, RESULT, columns, embed
+from app.core.supabase import get_supabase
+from app.services.cache_versions import cache_versions
+from app.utils.export import iter_keyset
+
+# Per-student results cache.
+#
+# Results only change when an admin runs a bulk upload, but every student reads
+# theirs repeatedly during a results release. Each student's full result list is
+# kept as one orjson-encoded blob (compact, and decoding is cheaper than a
+# database round-trip), refilled eagerly for exactly the students a bulk upload
+# touched. Any change to the results table bumps the shared "results" version
+# (app/services/cache_versions.py), and every other worker drops its entries
+# within CACHE_VERSION_CHECK_SECONDS; entries also expire after
+# RESULTS_CACHE_TTL_SECONDS.
+
+RESULTS_PROJECTION = columns(RESULT, embed("courses", COURSE_SUMMARY))
+# Student ids per IN (...) filter when refilling after an upload
+REFILL_CHUNK_SIZE = 200
+
+
+class ResultsCache:
+    def __init__(self, max_students: int, ttl_seconds: int):
+        self.max_students = max_students
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def sync(self, force: bool = False) -> Optional[int]:
+        """Drop every entry if the shared results version moved; returns the version now held"""
+        version = cache_versions.get("results", force)
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+        return version
+
+    def get(self, student_id: str) -> Optional[List[dict]]:
+        with self._lock:
+            entry = self._entries.get(student_id)
+            if entry is None:
+                return None
+            stored_at, blob = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[student_id]
+                return None
+            self._entries.move_to_end(student_id)
+        return orjson.loads(blob)
+
+    def put(self, student_id: str, results: List[dict], version: Optional[int]):
+        """Store results read at `version`; skipped if the cache has moved on since the read"""
+        blob = orjson.dumps(results)
+        with self._lock:
+            if version != self._version:
+                return
+            self._entries[student_id] = (time.monotonic(), blob)
+            self._entries.move_to_end(student_id)
+            while len(self._entries) > self.max_students:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "students": len(self._entries),
+                "bytes": sum(len(blob) for _, blob in self._entries.values()),
+            }
+
+
+results_cache = ResultsCache(settings.results_cache_max_students, settings.results_cache_ttl_seconds)
+
+
+def _fetch(student_ids: List[str]) -> Dict[str, List[dict]]:
+    def build_query():
+        return get_supabase().table("results").select(RESULTS_PROJECTION).in_("student_id", student_ids)
+
+    grouped: Dict[str, List[dict]] = {student_id: [] for student_id in student_ids}
+    for row in iter_keyset(build_query):
+        grouped[row["student_id"]].append(row)
+    return grouped
+
+def get_archived_results(student_id: str, session: Optional[str] = None) -> List[dict]:
+    """A student's results in archived sessions (not cached; read for old sessions and transcripts)"""
+    def build_query():
+        query = get_supabase().table("results_archive").select(RESULTS_PROJECTION).eq("student_id", student_id)
+        if session:
+            query = query.eq("session", session)
+        return query
+
+    return list(iter_keyset(build_query))
+
+def get_student_results(student_id: str) -> List[dict]:
+    """All results for a student, from cache when possible"""
+    version = results_cache.sync()
+    cached = results_cache.get(student_id)
+    if cached is not None:
+        return cached
+
+    results = _fetch([student_id])[student_id]
+    results_cache.put(student_id, results, version)
+    return results
+
+def refresh_students(student_ids: Iterable[str]) -> int:
+    """Reload and cache results for the given students (called after a bulk upload)"""
+    unique_ids = list(dict.fromkeys(student_ids))
+    # The upload has just bumped the version: adopt it now so the refill is kept
+    version = results_cache.sync(force=True)
+    for start in range(0, len(unique_ids), REFILL_CHUNK_SIZE):
+        for student_id, results in _fetch(unique_ids[start:start + REFILL_CHUNK_SIZE]).items():
+            results_cache.put(student_id, results, version)
+    return len(unique_ids)
@@ -0,0 +1,68 @@
+import threading
+import time
+from typing import FrozenSet, Optional
+from app.core.config import settings
+from app.core.enums import Granularity
+from app.core.supabase import get_supabase
+from app.services import analytics
+
+# Academic sessions and the payments/results archive
+# (migrations/0011_session_archive.sql).
+#
+# Lists default to the current session: CURRENT_SESSION when set, otherwise
+# the session today falls in ("2026/2027" from September 2026 with
+# ACADEMIC_SESSION_START_MONTH=9). A closed session moved out by
+# `python -m app.archive` lives in course_payments_archive / results_archive,
+# and a request naming it is served from there. The list of archived
+# sessions is small and changes once a year, so each worker re-reads it at
+# most every ARCHIVED_SESSIONS_TTL seconds.
+
+ARCHIVED_SESSIONS_TTL = 300
+
+
+def current_session() -> str:
+    if settings.current_session:
+        return settings.current_session
+    now = analytics.local_now()
+    return analytics.label(analytics.bucket_start(now, Granularity.SESSION), Granularity.SESSION)
+
+def resolve(session: Optional[str]) -> str:
+    """The session a request asked for, or the current one"""
+    return session or current_session()
+
+
+class ArchivedSessions:
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._sessions: FrozenSet[str] = frozenset()
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> FrozenSet[str]:
+        with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl_seconds:
+                return self._sessions
+
+        rows = get_supabase().table("archived_sessions").select("session").execute().data
+        with self._lock:
+            self._sessions = frozenset(row["session"] for row in rows)
+            self._loaded_at = time.monotonic()
+            return self._sessions
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+
+archived_sessions = ArchivedSessions(ARCHIVED_SESSIONS_TTL)
+
+
+def is_archived(session: str) -> bool:
+    # The current session is never archived; skip the lookup for it
+    return session != current_session() and session in archived_sessions.get()
+
+def payments_table(session: str) -> str:
+    return "course_payments_archive" if is_archived(session) else "course_payments"
+
+def results_table(session: str) -> str:
+    return "results_archive" if is_archived(session) else "results"
@@ -1,8 +1,13 @@
+import html
 import smtplib
+import time
+from email import policy
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from app.core.config import settings 
 from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Callable, Iterable, List, Optional, Tuple
 
 class EmailService:
     def __init__(self):
@@ -40,12 +45,8 @@ class EmailService:
         </html>
         """
 
-    def send_email(self, to_email: str, subject: str, body_html: str):
-        """Send email notification using the standard SMTP mechanism."""
-        if not self.smtp_user or not self.smtp_password:
-            print("Email not configured. Skipping email send.")
-            return
-        
+    def build_message(self, to_email: str, subject: str, body_html: str) -> MIMEMultipart:
+        """Wrap the body in the branded template as a ready-to-send message."""
         msg = MIMEMultipart()
         msg['From'] = self.smtp_user
         msg['To'] = to_email
@@ -54,6 +55,15 @@ class EmailService:
         # Attach the full branded HTML body
         full_body = self.get_branded_template(subject, body_html)
         msg.attach(MIMEText(full_body, 'html'))
+        return msg
+
+    def send_email(self, to_email: str, subject: str, body_html: str):
+        """Send email notification using the standard SMTP mechanism."""
+        if not self.smtp_user or not self.smtp_password:
+            print("Email not configured. Skipping email send.")
+            return
+        
+        msg = self.build_message(to_email, subject, body_html)
         
         try:
             with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
@@ -64,10 +74,126 @@ class EmailService:
         except Exception as e:
             print(f"Failed to send email to {to_email}: {str(e)}")
 
+    def send_batch(self, messages: List[Tuple[str, str, str]]) -> List[Optional[str]]:
+        """
+        Send (to_email, subject, body_html) messages over one SMTP connection.
+        Returns one entry per message: None when sent, otherwise the error, so the
+        job worker can retry just the failures. Connection/login errors raise.
+        """
+        if not self.smtp_user or not self.smtp_password:
+            print("Email not configured. Skipping email send.")
+            return [None] * len(messages)
+
+        errors: List[Optional[str]] = []
+        with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
+            server.starttls()
+            server.login(self.smtp_user, self.smtp_password)
+            for to_email, subject, body_html in messages:
+                try:
+                    server.send_message(self.build_message(to_email, subject, body_html))
+                    errors.append(None)
+                except smtplib.SMTPServerDisconnected:
+                    raise
+                except smtplib.SMTPException as e:
+                    errors.append(f"{to_email}: {e}")
+        return errors
+
+
+    @property
+    def is_configured(self) -> bool:
+        return bool(self.smtp_user and self.smtp_password)
+
+    def render_bulk(self, subject: str, body_html: str) -> bytes:
+        """
+        Serialise a branded message once, without a To header, for send_bulk.
+        Rendering per recipient is what makes large broadcasts CPU-bound.
+        """
+        msg = MIMEMultipart()
+        msg['From'] = self.smtp_user
+        msg['Subject'] = subject
+        msg.attach(MIMEText(self.get_branded_template(subject, body_html), 'html'))
+        return msg.as_bytes(policy=policy.SMTP)
+
+    def _open_connection(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=30)
+        server.starttls()
+        server.login(self.smtp_user, self.smtp_password)
+        return server
+
+    def send_bulk(
+        self,
+        messages: Iterable[Tuple[str, bytes]],
+        rate_per_second: float,
+        per_connection: int,
+        on_progress: Callable[[dict], None]
+    ) -> dict:
+        """
+        Send pre-rendered (to_email, render_bulk() bytes) messages. One SMTP
+        connection carries `per_connection` messages before it is recycled,
+        sends are paced to `rate_per_second`, and `on_progress` receives the
+        running stats after every connection's worth of mail. Refused
+        recipients are counted and skipped; losing the server twice in a row
+        raises so the job is retried.
+        """
+        stats = {"sent": 0, "failed": 0, "errors": [], "elapsed_seconds": 0.0, "per_second": 0.0}
+        interval = 1 / rate_per_second if rate_per_second > 0 else 0
+        started = next_send = time.monotonic()
+        server = None
+
+        def publish():
+            elapsed = time.monotonic() - started
+            stats["elapsed_seconds"] = round(elapsed, 1)
+            stats["per_second"] = round(stats["sent"] / elapsed, 2) if elapsed else 0.0
+            on_progress(stats)
+
+        try:
+            for count, (to_email, raw) in enumerate(messages, start=1):
+                if "\r" in to_email or "\n" in to_email:
+                    stats["failed"] += 1
+                    continue
+
+                wait = next_send - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                next_send = max(next_send, time.monotonic()) + interval
+
+                data = b"To: " + to_email.encode() + b"\r\n" + raw
+                for attempt in (1, 2):
+                    if server is None:
+                        server = self._open_connection()
+                    try:
+                        server.sendmail(self.smtp_user, [to_email], data)
+                        stats["sent"] += 1
+                        break
+                    except smtplib.SMTPServerDisconnected:
+                        server = None
+                        if attempt == 2:
+                            raise
+                    except smtplib.SMTPException as e:
+                        stats["failed"] += 1
+                        if len(stats["errors"]) < 20:
+                            stats["errors"].append(f"{to_email}: {e}")
+                        break
+
+                if count % per_connection == 0:
+                    if server is not None:
+                        server.quit()
+                        server = None
+                    publish()
+        finally:
+            if server is not None:
+                try:
+                    server.quit()
+                except smtplib.SMTPException:
+                    pass
+
+        publish()
+        return stats
+
 
     # --- New Method for User Creation (Task 7) ---
-    def send_user_welcome(self, student_email: str, full_name: str, reg_no: str, password: str):
-        """Sends welcome email with registration details (Task 7)"""
+    def user_welcome_message(self, full_name: str, reg_no: str, password: str) -> Tuple[str, str]:
+        """Subject and body of the welcome email (Task 7)"""
         subject = "Welcome to WMOU Portal! Your Account Details"
         body_content = f"""
         <p>Dear <strong>{full_name}</strong>,</p>
@@ -83,7 +209,26 @@ class EmailService:
             We highly recommend you change your password immediately upon first login.
         </p>
         """
-        self.send_email(student_email, subject, body_content)
+        return subject, body_content
+
+    def send_user_welcome(self, student_email: str, full_name: str, reg_no: str, password: str):
+        """Sends welcome email with registration details (Task 7)"""
+        self.send_email(student_email, *self.user_welcome_message(full_name, reg_no, password))
+
+
+    def announcement_message(self, title: str, content: str, department: Optional[str]) -> Tuple[str, str]:
+        """Subject and body of an announcement broadcast (one render per department)"""
+        audience = f"{department} Student" if department else "Student"
+        paragraphs = "".join(
+            f"<p>{html.escape(part).replace(chr(10), '<br>')}</p>"
+            for part in content.split("\n\n") if part.strip()
+        )
+        body_content = f"""
+        <p>Dear {html.escape(audience)},</p>
+        {paragraphs}
+        <p style="font-style: italic; color: #666;">You can also read this announcement on the portal.</p>
+        """
+        return f"Announcement: {title}", body_content
 
 
     # --- Updated Payment Methods (Task 6) ---
@@ -99,8 +244,8 @@ class EmailService:
         """
         self.send_email(student_email, subject, body_content)
     
-    def send_payment_approval(self, student_email: str, course_name: str, approved: bool, rejection_reason: str = None):
-        """Send payment approval/rejection email."""
+    def payment_approval_message(self, course_name: str, approved: bool, rejection_reason: str = None) -> Tuple[str, str]:
+        """Subject and body of the payment approval/rejection email."""
         if approved:
             subject = "Payment Approved! 🎉"
             color = "#22c55e" # Green
@@ -125,4 +270,14 @@ class EmailService:
                 """
             body_content += "<p>Please contact the admin or resubmit a clearer/corrected proof of payment.</p>"
             
-        self.send_email(student_email, subject, body_content)
\ No newline at end of file
+        return subject, body_content
+
+    def send_payment_approval(self, student_email: str, course_name: str, approved: bool, rejection_reason: str = None):
+        """Send payment approval/rejection email."""
+        self.send_email(student_email, *self.payment_approval_message(course_name, approved, rejection_reason))
+
+
+@lru_cache(maxsize=1)
+def get_email_service() -> EmailService:
+    """Shared EmailService, created the first time an email is queued."""
+    return EmailService()
@@ -1,11 +1,14 @@
-import pandas as pd
 from typing import List, Dict
 
+# pandas is imported inside each parser so it only loads for the upload routes
+
 def parse_students_excel(file_path: str) -> List[Dict]:
     """
     Parse Excel file with student data
     Expected columns: reg_no, email, full_name, department, phone
     """
+    import pandas as pd
+
     df = pd.read_excel(file_path)
     
     # Validate required columns
@@ -40,6 +43,8 @@ def parse_results_excel(file_path: str) -> List[Dict]:
     Parse Excel file with results
     Expected columns: reg_no, course_code, score, grade
     """
+    import pandas as pd
+
     df = pd.read_excel(file_path)
     
     # Validate required columns
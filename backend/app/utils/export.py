@@ -0,0 +1,122 @@
+import csv
+import io
+import os
+import tempfile
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+from fastapi.responses import StreamingResponse
+from app.core.enums import ExportFormat
+
+# Rows fetched per round-trip while walking a table for export
+EXPORT_BATCH_SIZE = 1000
+# CSV rows buffered before a chunk is flushed to the client
+CSV_FLUSH_ROWS = 500
+# Size of the chunks read back from the finished XLSX file
+XLSX_CHUNK_SIZE = 64 * 1024
+
+Column = Tuple[str, str]
+
+
+def iter_keyset(
+    query_factory: Callable,
+    batch_size: int = EXPORT_BATCH_SIZE,
+    key: str = "id",
+    start_after=None
+) -> Iterator[dict]:
+    """
+    Walk a table with keyset pagination (WHERE key > last ORDER BY key LIMIT n).
+    `query_factory` must return a fresh filtered query builder on every call,
+    since supabase builders are mutated by each filter applied to them.
+    `start_after` resumes a walk from a previously seen key.
+    """
+    last_key = start_after
+    while True:
+        query = query_factory()
+        if last_key is not None:
+            query = query.gt(key, last_key)
+
+        rows = query.order(key).limit(batch_size).execute().data or []
+        if not rows:
+            return
+
+        yield from rows
+
+        if len(rows) < batch_size:
+            return
+        last_key = rows[-1][key]
+
+
+def resolve(row: dict, path: str):
+    """Resolve a dotted path such as "courses.course_code" against an embedded row."""
+    value = row
+    for part in path.split("."):
+        if isinstance(value, list):
+            value = value[0] if value else None
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def stream_csv(rows: Iterable[dict], columns: List[Column]) -> Iterator[bytes]:
+    """Yield CSV-encoded chunks, holding at most CSV_FLUSH_ROWS rows in memory."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for header, _ in columns])
+
+    pending = 0
+    for row in rows:
+        writer.writerow([resolve(row, path) for _, path in columns])
+        pending += 1
+        if pending >= CSV_FLUSH_ROWS:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate(0)
+            pending = 0
+
+    yield buffer.getvalue().encode("utf-8")
+
+
+def stream_xlsx(rows: Iterable[dict], columns: List[Column], sheet_title: str = "Export") -> Iterator[bytes]:
+    """
+    Write rows through openpyxl's write-only mode (rows are spooled to disk, not
+    kept in memory) and stream the finished workbook back in fixed-size chunks.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_title)
+    sheet.append([header for header, _ in columns])
+    for row in rows:
+        sheet.append([resolve(row, path) for _, path in columns])
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        workbook.save(path)
+        with open(path, "rb") as f:
+            while chunk := f.read(XLSX_CHUNK_SIZE):
+                yield chunk
+    finally:
+        os.remove(path)
+
+
+EXPORT_MEDIA_TYPES: Dict[str, str] = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def export_response(rows: Iterable[dict], columns: List[Column], export_format: ExportFormat, filename: str) -> StreamingResponse:
+    """Stream rows as a CSV/XLSX download without materialising the whole table"""
+    if export_format == ExportFormat.XLSX:
+        body = stream_xlsx(rows, columns, sheet_title=filename)
+    else:
+        body = stream_csv(rows, columns)
+
+    stamp = datetime.utcnow().strftime("%Y%m%d")
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[export_format.value],
+        headers={"Content-Disposition": f'attachment; filename="{filename}_{stamp}.{export_format.value}"'}
+    )
@@ -1,4 +1,5 @@
 import re
+from typing import List
 
 def validate_reg_no(reg_no: str) -> bool:
     pattern = r'^[A-Z0-9]{6,10}$'
@@ -23,4 +24,12 @@ def calculate_grade(score: float) -> str:
     elif score >= 40:
         return 'E'
     else:
-        return 'F'
\ No newline at end of file
+        return 'F'
+
+def calculate_gpa(results: List[dict]) -> float:
+    """Calculate GPA from results"""
+    grade_points = {"A": 5.0, "B": 4.0, "C": 3.0, "D": 2.0, "E": 1.0, "F": 0.0}
+    if not results:
+        return 0.0
+    total_points = sum(grade_points.get(r["grade"], 0.0) for r in results)
+    return round(total_points / len(results), 2)
@@ -0,0 +1,146 @@
+import argparse
+import logging
+import os
+import random
+import socket
+import time
+import traceback
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from app.core.config import settings
+from app.jobs import HANDLERS, JobPaused, JobProgress, get_job_store
+import app.jobs.handlers  # noqa: F401  (registers the job kinds)
+
+# Background job worker:
+#
+#   python -m app.worker --concurrency 4 --batch-size 50
+#
+# Each poll claims up to --batch-size due jobs, groups them by kind (batch
+# handlers get the whole group in one call) and runs the groups on a thread
+# pool. Failures are retried with exponential backoff and jitter; a job that
+# has used up max_attempts is dead-lettered (status 'dead') for inspection,
+# with the payload of sensitive kinds wiped.
+#
+# Where no long-running process is available (Vercel), a cron request to
+# /api/internal/jobs/run calls drain() instead (app/routers/jobs.py). It only
+# claims kinds registered with cron=True and gives handlers a deadline of
+# JOB_DRAIN_SECONDS: a broadcast checkpoints and pauses, and jobs not started
+# in time go back to the queue, in both cases without using up an attempt.
+# Storage GC cannot pause and runs only in this worker process.
+
+logger = logging.getLogger("app.worker")
+
+MAX_BACKOFF_SECONDS = 3600
+
+
+def retry_at(attempts: int) -> datetime:
+    delay = min(30 * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS)
+    return datetime.now(timezone.utc) + timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def _fail(store, job: dict, error: str, sensitive: bool = False):
+    dead = job["attempts"] >= job["max_attempts"]
+    store.fail(job["id"], error, None if dead else retry_at(job["attempts"]), clear_payload=dead and sensitive)
+    logger.warning("job %s (%s) %s: %s", job["id"], job["kind"], "dead-lettered" if dead else "will retry", error)
+
+
+def run_group(kind: str, jobs: List[dict], deadline: Optional[float] = None):
+    store = get_job_store()
+    handler = HANDLERS.get(kind)
+    if handler is None:
+        for job in jobs:
+            _fail(store, job, f"No handler registered for {kind}")
+        return
+
+    try:
+        if handler.batch:
+            errors = handler.func([job["payload"] for job in jobs])
+            done = [job["id"] for job, error in zip(jobs, errors) if error is None]
+            if done:
+                store.complete(done, clear_payload=handler.sensitive)
+            for job, error in zip(jobs, errors):
+                if error is not None:
+                    _fail(store, job, error, handler.sensitive)
+        else:
+            for job in jobs:
+                progress = JobProgress(store, job, deadline)
+                if progress.out_of_time():
+                    store.release(job["id"], job["attempts"])
+                    continue
+                try:
+                    result = handler.func(job["payload"], progress)
+                    store.complete([job["id"]], result, clear_payload=handler.sensitive)
+                except JobPaused:
+                    store.release(job["id"], job["attempts"])
+                    logger.info("job %s (%s) paused; resumes on the next run", job["id"], job["kind"])
+                except Exception:
+                    _fail(store, job, traceback.format_exc(), handler.sensitive)
+    except Exception:
+        # The whole batch failed (e.g. SMTP login); every job gets retried
+        error = traceback.format_exc()
+        for job in jobs:
+            _fail(store, job, error, handler.sensitive)
+
+
+def run_batch(pool: ThreadPoolExecutor, worker_id: str, batch_size: int,
+              kinds: Optional[List[str]] = None, deadline: Optional[float] = None) -> int:
+    """Claim and run one batch; returns the number of jobs claimed"""
+    jobs = get_job_store().claim(worker_id, batch_size, settings.job_lease_seconds, kinds)
+
+    groups = defaultdict(list)
+    for job in jobs:
+        groups[job["kind"]].append(job)
+    futures = [pool.submit(run_group, kind, group, deadline) for kind, group in groups.items()]
+    for future in futures:
+        future.result()
+    return len(jobs)
+
+
+def run(concurrency: int, batch_size: int, poll_interval: float, once: bool = False):
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    logger.info("worker %s started (concurrency=%s, batch_size=%s)", worker_id, concurrency, batch_size)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while True:
+            claimed = run_batch(pool, worker_id, batch_size)
+            if once:
+                return
+            if claimed < batch_size:
+                time.sleep(poll_interval)
+
+
+def drain(max_seconds: float) -> dict:
+    """Run batches until the queue has nothing due or max_seconds have passed (cron entry point)"""
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:cron"
+    kinds = [kind for kind, handler in HANDLERS.items() if handler.cron]
+    started = time.monotonic()
+    deadline = started + max_seconds
+    processed = batches = 0
+
+    with ThreadPoolExecutor(max_workers=settings.worker_concurrency) as pool:
+        while time.monotonic() < deadline:
+            claimed = run_batch(pool, worker_id, settings.worker_batch_size, kinds, deadline)
+            processed += claimed
+            batches += 1
+            if claimed < settings.worker_batch_size:
+                break
+
+    return {"processed": processed, "batches": batches, "seconds": round(time.monotonic() - started, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run background jobs")
+    parser.add_argument("--concurrency", type=int, default=settings.worker_concurrency)
+    parser.add_argument("--batch-size", type=int, default=settings.worker_batch_size)
+    parser.add_argument("--poll-interval", type=float, default=settings.worker_poll_interval)
+    parser.add_argument("--once", action="store_true", help="Process one batch and exit (cron-style)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    run(args.concurrency, args.batch_size, args.poll_interval, args.once)
+
+
+if __name__ == "__main__":
+    main()
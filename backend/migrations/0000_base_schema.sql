@@ -0,0 +1,82 @@
+-- Tables the API reads and writes, as they exist in the Supabase project.
+-- On the live database every statement here is a no-op; on a fresh local
+-- Postgres this file creates enough schema for the later migrations and for
+-- `python -m app.check_query_plans`.
+
+create table if not exists users (
+    id uuid primary key default gen_random_uuid(),
+    reg_no text not null unique,
+    email text,
+    full_name text,
+    department text,
+    phone text,
+    address text,
+    role text not null default 'student',
+    status text,
+    password text not null,
+    profile_picture_url text,
+    created_by uuid references users (id),
+    created_at timestamptz not null default now()
+);
+
+create table if not exists courses (
+    id bigint generated by default as identity primary key,
+    course_code text not null,
+    title text not null,
+    department text,
+    session text,
+    semester text,
+    fee numeric,
+    created_at timestamptz not null default now()
+);
+
+create table if not exists course_registrations (
+    id bigint generated by default as identity primary key,
+    student_id uuid not null references users (id) on delete cascade,
+    course_id bigint not null references courses (id) on delete cascade,
+    registered_at timestamptz not null default now()
+);
+
+create table if not exists course_payments (
+    id bigint generated by default as identity primary key,
+    student_id uuid not null references users (id) on delete cascade,
+    course_id bigint not null references courses (id) on delete cascade,
+    amount_paid numeric not null,
+    receipt_url text,
+    status text not null default 'pending',
+    rejection_reason text,
+    reviewed_by uuid references users (id),
+    reviewed_at timestamptz,
+    created_at timestamptz not null default now()
+);
+
+create table if not exists course_materials (
+    id bigint generated by default as identity primary key,
+    course_id bigint not null references courses (id) on delete cascade,
+    title text,
+    file_url text,
+    file_type text,
+    uploaded_by uuid references users (id),
+    uploaded_at timestamptz not null default now()
+);
+
+create table if not exists results (
+    id bigint generated by default as identity primary key,
+    student_id uuid not null references users (id) on delete cascade,
+    course_id bigint not null references courses (id) on delete cascade,
+    session text,
+    semester text,
+    score numeric,
+    grade text,
+    uploaded_at timestamptz not null default now()
+);
+
+create table if not exists announcements (
+    id bigint generated by default as identity primary key,
+    title text not null,
+    content text not null,
+    target_department text,
+    turnstile_token text,
+    created_by uuid references users (id),
+    created_at timestamptz not null default now()
+);
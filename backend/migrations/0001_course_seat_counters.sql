@@ -0,0 +1,80 @@
+-- Denormalised enrollment counters and optional seat limits.
+--
+-- courses.enrolled_count and users.registered_courses_count replace the
+-- course_registrations(count) aggregates the listing endpoints used to run on
+-- every read. The seat functions below are called through supabase.rpc();
+-- the counters themselves are kept by triggers on course_registrations
+-- (0012_seat_counter_triggers.sql).
+
+alter table courses add column if not exists enrolled_count integer not null default 0;
+alter table courses add column if not exists capacity integer check (capacity is null or capacity >= 0);
+alter table users add column if not exists registered_courses_count integer not null default 0;
+
+-- Backfill from the existing registrations
+update courses c
+set enrolled_count = (select count(*) from course_registrations r where r.course_id = c.id);
+
+update users u
+set registered_courses_count = (select count(*) from course_registrations r where r.student_id = u.id);
+
+-- Reserve a seat and register the student in one transaction.
+-- Returns 'registered', 'already_registered', 'full' or 'course_not_found'.
+create or replace function register_student_for_course(p_student_id uuid, p_course_id bigint)
+returns text
+language plpgsql
+as $$
+declare
+    v_capacity integer;
+    v_enrolled integer;
+begin
+    -- Row lock on the course serialises concurrent reservations for it
+    select capacity, enrolled_count into v_capacity, v_enrolled
+    from courses where id = p_course_id
+    for update;
+
+    if not found then
+        return 'course_not_found';
+    end if;
+
+    if exists (
+        select 1 from course_registrations
+        where student_id = p_student_id and course_id = p_course_id
+    ) then
+        return 'already_registered';
+    end if;
+
+    if v_capacity is not null and v_enrolled >= v_capacity then
+        return 'full';
+    end if;
+
+    insert into course_registrations (student_id, course_id, registered_at)
+    values (p_student_id, p_course_id, now());
+
+    update courses set enrolled_count = enrolled_count + 1 where id = p_course_id;
+    update users set registered_courses_count = registered_courses_count + 1 where id = p_student_id;
+
+    return 'registered';
+end;
+$$;
+
+-- Drop a registration and give its seat back. Returns false if there was none.
+create or replace function release_course_seat(p_student_id uuid, p_course_id bigint)
+returns boolean
+language plpgsql
+as $$
+begin
+    perform 1 from courses where id = p_course_id for update;
+
+    delete from course_registrations
+    where student_id = p_student_id and course_id = p_course_id;
+
+    if not found then
+        return false;
+    end if;
+
+    update courses set enrolled_count = greatest(enrolled_count - 1, 0) where id = p_course_id;
+    update users set registered_courses_count = greatest(registered_courses_count - 1, 0) where id = p_student_id;
+
+    return true;
+end;
+$$;
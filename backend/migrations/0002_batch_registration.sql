@@ -0,0 +1,23 @@
+-- Register many (student, course) pairs in one round-trip, e.g. when a batch of
+-- payments is approved. Each pair goes through register_student_for_course, so
+-- capacity checks and counters behave exactly as for single approvals.
+
+create or replace function register_students_batch(p_student_ids uuid[], p_course_ids bigint[])
+returns table (student_id uuid, course_id bigint, status text)
+language plpgsql
+as $$
+declare
+    i integer;
+begin
+    if coalesce(array_length(p_student_ids, 1), 0) <> coalesce(array_length(p_course_ids, 1), 0) then
+        raise exception 'p_student_ids and p_course_ids must have the same length';
+    end if;
+
+    for i in 1 .. coalesce(array_length(p_student_ids, 1), 0) loop
+        student_id := p_student_ids[i];
+        course_id := p_course_ids[i];
+        status := register_student_for_course(p_student_ids[i], p_course_ids[i]);
+        return next;
+    end loop;
+end;
+$$;
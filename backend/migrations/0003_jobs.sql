@@ -0,0 +1,45 @@
+-- Durable background job queue (app/jobs). The API inserts rows; workers
+-- started with `python -m app.worker` claim them with claim_jobs().
+
+create table if not exists jobs (
+    id bigint generated always as identity primary key,
+    kind text not null,
+    payload jsonb not null default '{}'::jsonb,
+    status text not null default 'queued' check (status in ('queued', 'running', 'done', 'dead')),
+    attempts integer not null default 0,
+    max_attempts integer not null default 5,
+    run_at timestamptz not null default now(),
+    locked_at timestamptz,
+    locked_by text,
+    last_error text,
+    result jsonb,
+    created_at timestamptz not null default now(),
+    finished_at timestamptz
+);
+
+-- Only queued/running rows are ever scanned by claim_jobs
+create index if not exists jobs_claimable_idx on jobs (run_at) where status in ('queued', 'running');
+create index if not exists jobs_dead_idx on jobs (created_at desc) where status = 'dead';
+
+-- Claim up to p_limit due jobs. Rows stuck in 'running' past the lease (worker
+-- crashed or was frozen) become claimable again. SKIP LOCKED lets any number of
+-- workers poll concurrently without handing out the same job twice.
+create or replace function claim_jobs(p_worker text, p_limit integer, p_lease_seconds integer)
+returns setof jobs
+language sql
+as $$
+    update jobs
+    set status = 'running',
+        locked_at = now(),
+        locked_by = p_worker,
+        attempts = attempts + 1
+    where id in (
+        select id from jobs
+        where (status = 'queued' and run_at <= now())
+           or (status = 'running' and locked_at < now() - make_interval(secs => p_lease_seconds))
+        order by run_at
+        limit p_limit
+        for update skip locked
+    )
+    returning *;
+$$;
@@ -0,0 +1,132 @@
+-- Admin search (/api/admin/search): prefix and fuzzy matching on users and
+-- payments through pg_trgm. GIN trigram indexes serve ILIKE 'term%' as well as
+-- the similarity operators, so neither path scans the users table.
+
+create extension if not exists pg_trgm;
+
+create index if not exists users_reg_no_trgm_idx on users using gin (reg_no gin_trgm_ops);
+create index if not exists users_email_trgm_idx on users using gin (email gin_trgm_ops);
+create index if not exists users_full_name_trgm_idx on users using gin (full_name gin_trgm_ops);
+create index if not exists courses_course_code_trgm_idx on courses using gin (course_code gin_trgm_ops);
+
+-- LIKE pattern matching anything that starts with the search term
+create or replace function search_prefix(p_query text)
+returns text
+language sql
+immutable
+as $$
+    select replace(replace(replace(lower(trim(p_query)), '\', '\\'), '%', '\%'), '_', '\_') || '%';
+$$;
+
+-- Ranked user search. Rank: exact reg_no 1.0, reg_no prefix 0.9, email prefix
+-- 0.8, otherwise the trigram word similarity of the name (typos, partial
+-- names). `total` is the number of matches before paging.
+create or replace function search_users(
+    p_query text,
+    p_role text default null,
+    p_limit integer default 20,
+    p_offset integer default 0
+)
+returns table (
+    id uuid,
+    reg_no text,
+    full_name text,
+    email text,
+    department text,
+    role text,
+    status text,
+    rank real,
+    total bigint
+)
+language sql
+stable
+as $$
+    with hits as (
+        select u.id, u.reg_no, u.full_name, u.email, u.department, u.role::text as role, u.status::text as status,
+               greatest(
+                   case
+                       when lower(u.reg_no) = lower(trim(p_query)) then 1.0
+                       when u.reg_no ilike search_prefix(p_query) then 0.9
+                       when u.email ilike search_prefix(p_query) then 0.8
+                       else 0
+                   end,
+                   word_similarity(lower(trim(p_query)), u.full_name) * 0.75
+               )::real as rank
+        from users u
+        where (p_role is null or u.role::text = p_role)
+          and (u.reg_no ilike search_prefix(p_query)
+               or u.email ilike search_prefix(p_query)
+               or lower(trim(p_query)) <% u.full_name)
+    )
+    select hits.*, count(*) over () as total
+    from hits
+    order by rank desc, reg_no
+    limit p_limit offset p_offset;
+$$;
+
+-- Payments whose student (reg_no, email, name) or course_code matches. Matching
+-- students and courses are found through the trigram indexes first; payments
+-- are then joined by student_id / course_id.
+create or replace function search_payments(
+    p_query text,
+    p_status text default null,
+    p_limit integer default 20,
+    p_offset integer default 0
+)
+returns table (
+    id bigint,
+    student_id uuid,
+    course_id bigint,
+    amount_paid numeric,
+    status text,
+    created_at timestamptz,
+    reg_no text,
+    full_name text,
+    course_code text,
+    course_title text,
+    rank real,
+    total bigint
+)
+language sql
+stable
+as $$
+    with students as (
+        select u.id,
+               greatest(
+                   case
+                       when lower(u.reg_no) = lower(trim(p_query)) then 1.0
+                       when u.reg_no ilike search_prefix(p_query) then 0.9
+                       when u.email ilike search_prefix(p_query) then 0.8
+                       else 0
+                   end,
+                   word_similarity(lower(trim(p_query)), u.full_name) * 0.75
+               )::real as rank
+        from users u
+        where u.reg_no ilike search_prefix(p_query)
+           or u.email ilike search_prefix(p_query)
+           or lower(trim(p_query)) <% u.full_name
+    ),
+    matched_courses as (
+        select c.id, (case when lower(c.course_code) = lower(trim(p_query)) then 1.0 else 0.85 end)::real as rank
+        from courses c
+        where c.course_code ilike search_prefix(p_query)
+    ),
+    hits as (
+        select p.id, s.rank from course_payments p join students s on s.id = p.student_id
+        union all
+        select p.id, mc.rank from course_payments p join matched_courses mc on mc.id = p.course_id
+    ),
+    best as (
+        select hits.id, max(hits.rank) as rank from hits group by hits.id
+    )
+    select p.id, p.student_id, p.course_id, p.amount_paid::numeric, p.status::text, p.created_at,
+           u.reg_no, u.full_name, c.course_code, c.title,
+           best.rank, count(*) over () as total
+    from best
+    join course_payments p on p.id = best.id
+    join users u on u.id = p.student_id
+    join courses c on c.id = p.course_id
+    where p_status is null or p.status::text = p_status
+    order by best.rank desc, p.created_at desc
+    limit p_limit offset p_offset;
+$$;
@@ -0,0 +1,103 @@
+-- Indexes for the query shapes the API issues. Each index names the endpoints
+-- it serves; `python -m app.check_query_plans` EXPLAINs those queries and fails
+-- if one of them still falls back to a sequential scan.
+
+-- ---------- course_payments ----------
+
+-- Latest payment per (student, course): registered-courses and
+-- courses-with-payment-status. The student_id prefix also serves payment
+-- history and the student dashboard counts.
+create index if not exists course_payments_student_course_created_idx
+    on course_payments (student_id, course_id, created_at desc);
+
+-- Admin payment list filtered by status, newest first
+create index if not exists course_payments_status_created_idx
+    on course_payments (status, created_at desc);
+
+-- Admin payment list without a filter, newest first
+create index if not exists course_payments_created_idx
+    on course_payments (created_at desc);
+
+-- Pending payments only (dashboard "latest pending", reconciliation, batch
+-- approval). Stays small because reviewed payments leave it.
+create index if not exists course_payments_pending_idx
+    on course_payments (created_at desc)
+    where status = 'pending';
+
+-- Course deletes cascade here, and search_payments joins by course
+create index if not exists course_payments_course_idx
+    on course_payments (course_id);
+
+-- ---------- course_registrations ----------
+
+-- One registration per student and course. Remove duplicates left by the old
+-- check-then-insert registration path (oldest row wins) before adding the
+-- constraint, then recount the counters from migration 0001.
+do $$
+begin
+    if not exists (
+        select 1 from pg_constraint where conname = 'course_registrations_student_course_key'
+    ) then
+        delete from course_registrations r
+        using course_registrations older
+        where older.student_id = r.student_id
+          and older.course_id = r.course_id
+          and older.id < r.id;
+
+        update courses c
+        set enrolled_count = (select count(*) from course_registrations r where r.course_id = c.id);
+
+        update users u
+        set registered_courses_count = (select count(*) from course_registrations r where r.student_id = u.id);
+
+        alter table course_registrations
+            add constraint course_registrations_student_course_key unique (student_id, course_id);
+    end if;
+end;
+$$;
+
+-- Enrolled students per course (course deletes, seat release)
+create index if not exists course_registrations_course_idx
+    on course_registrations (course_id);
+
+-- ---------- results ----------
+
+-- Student results and transcripts, optionally narrowed to a session/semester
+create index if not exists results_student_session_semester_idx
+    on results (student_id, session, semester);
+
+-- Results export filtered by session/semester
+create index if not exists results_session_semester_idx
+    on results (session, semester);
+
+-- ---------- announcements ----------
+
+-- Student feed: their department's announcements plus the global ones
+-- (target_department is null), newest first
+create index if not exists announcements_department_created_idx
+    on announcements (target_department, created_at desc);
+
+create index if not exists announcements_created_idx
+    on announcements (created_at desc);
+
+-- ---------- users ----------
+
+-- Login and the duplicate check on create look users up by reg_no
+create unique index if not exists users_reg_no_key on users (reg_no);
+
+-- Admin user list filtered by role, newest first
+create index if not exists users_role_created_idx
+    on users (role, created_at desc);
+
+-- Students per department (dashboard, exports, announcement broadcasts)
+create index if not exists users_role_department_idx
+    on users (role, department);
+
+-- ---------- courses / materials ----------
+
+-- Course catalog for a department's session and semester
+create index if not exists courses_department_session_semester_idx
+    on courses (department, session, semester);
+
+create index if not exists course_materials_course_idx
+    on course_materials (course_id);
@@ -0,0 +1,138 @@
+-- Registration cart. Students collect courses (across semesters of a session)
+-- in cart_items, then check out once: the whole cart is validated in one
+-- set-based query and every payment row is created by a single INSERT.
+
+create table if not exists cart_items (
+    student_id uuid not null references users (id) on delete cascade,
+    course_id bigint not null references courses (id) on delete cascade,
+    added_at timestamptz not null default now(),
+    primary key (student_id, course_id)
+);
+
+-- One row per requested course (p_course_ids, or the student's cart when
+-- null) with a `problem` when it cannot be paid for:
+--   course_not_found, duplicate, wrong_department, wrong_session,
+--   already_registered, payment_approved, payment_pending
+create or replace function validate_registration(
+    p_student_id uuid,
+    p_course_ids bigint[] default null,
+    p_session text default null
+)
+returns table (
+    course_id bigint,
+    course_code text,
+    title text,
+    fee numeric,
+    session text,
+    semester text,
+    problem text
+)
+language sql
+stable
+as $$
+    with requested as (
+        select r.course_id, r.ord, count(*) over (partition by r.course_id) as copies
+        from unnest(coalesce(
+            p_course_ids,
+            array(select ci.course_id from cart_items ci where ci.student_id = p_student_id order by ci.added_at, ci.course_id)
+        )) with ordinality as r(course_id, ord)
+    ),
+    student as (
+        select u.department from users u where u.id = p_student_id
+    ),
+    registered as (
+        select cr.course_id from course_registrations cr
+        where cr.student_id = p_student_id and cr.course_id in (select rq.course_id from requested rq)
+    ),
+    paid as (
+        -- approved beats pending when a course has both
+        select cp.course_id, min(case cp.status when 'approved' then 1 else 2 end) as state
+        from course_payments cp
+        where cp.student_id = p_student_id
+          and cp.status in ('approved', 'pending')
+          and cp.course_id in (select rq.course_id from requested rq)
+        group by cp.course_id
+    ),
+    checked as (
+        select distinct on (rq.course_id)
+            rq.course_id, rq.ord, c.course_code, c.title, coalesce(c.fee, 0) as fee, c.session, c.semester,
+            case
+                when c.id is null then 'course_not_found'
+                when rq.copies > 1 then 'duplicate'
+                when c.department is not null and c.department is distinct from (select s.department from student s)
+                    then 'wrong_department'
+                when p_session is not null and c.session is distinct from p_session then 'wrong_session'
+                when exists (select 1 from registered g where g.course_id = rq.course_id) then 'already_registered'
+                when (select p.state from paid p where p.course_id = rq.course_id) = 1 then 'payment_approved'
+                when (select p.state from paid p where p.course_id = rq.course_id) = 2 then 'payment_pending'
+            end as problem
+        from requested rq
+        left join courses c on c.id = rq.course_id
+        order by rq.course_id, rq.ord
+    )
+    select k.course_id, k.course_code, k.title, k.fee, k.session, k.semester, k.problem
+    from checked k
+    order by k.ord;
+$$;
+
+-- Validate and create the pending payments in one transaction. Checkouts for
+-- the same student are serialised, so two concurrent requests cannot both
+-- pass validation. With p_course_ids null the cart is used and then emptied.
+-- Returns {"status": "ok" | "empty" | "invalid" | "amount_mismatch", ...}.
+create or replace function checkout_registration(
+    p_student_id uuid,
+    p_receipt_url text,
+    p_expected_total numeric,
+    p_course_ids bigint[] default null,
+    p_session text default null
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_lines integer;
+    v_total numeric;
+    v_problems jsonb;
+    v_payments jsonb;
+begin
+    perform pg_advisory_xact_lock(hashtext('registration_checkout:' || p_student_id::text));
+
+    select count(*),
+           coalesce(sum(v.fee), 0),
+           coalesce(
+               jsonb_agg(jsonb_build_object('course_id', v.course_id, 'course_code', v.course_code, 'problem', v.problem))
+                   filter (where v.problem is not null),
+               '[]'::jsonb
+           )
+    into v_lines, v_total, v_problems
+    from validate_registration(p_student_id, p_course_ids, p_session) v;
+
+    if v_lines = 0 then
+        return jsonb_build_object('status', 'empty');
+    end if;
+    if jsonb_array_length(v_problems) > 0 then
+        return jsonb_build_object('status', 'invalid', 'problems', v_problems);
+    end if;
+    if abs(v_total - p_expected_total) > 0.01 then
+        return jsonb_build_object('status', 'amount_mismatch', 'expected_total', v_total);
+    end if;
+
+    with inserted as (
+        insert into course_payments (student_id, course_id, amount_paid, receipt_url, status, created_at)
+        select p_student_id, c.id, coalesce(c.fee, 0), p_receipt_url, 'pending', now()
+        from courses c
+        where c.id = any(coalesce(
+            p_course_ids,
+            array(select ci.course_id from cart_items ci where ci.student_id = p_student_id)
+        ))
+        returning id, course_id, amount_paid, receipt_url, status, created_at
+    )
+    select jsonb_agg(to_jsonb(inserted) order by inserted.id) into v_payments from inserted;
+
+    if p_course_ids is null then
+        delete from cart_items where student_id = p_student_id;
+    end if;
+
+    return jsonb_build_object('status', 'ok', 'total', v_total, 'payments', v_payments);
+end;
+$$;
@@ -0,0 +1,17 @@
+-- Replication lag as seen by a read replica, polled by the API
+-- (app/core/read_routing.py) before routing reads there. Returns 0 on the
+-- primary, and on a replica that has replayed everything it has received, so
+-- an idle primary does not look like lag.
+
+create or replace function replica_lag_seconds()
+returns double precision
+language sql
+stable
+as $$
+    select case
+        when not pg_is_in_recovery() then 0
+        when pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() then 0
+        -- Behind, and nothing replayed yet since startup: count from startup
+        else extract(epoch from now() - coalesce(pg_last_xact_replay_timestamp(), pg_postmaster_start_time()))
+    end::double precision;
+$$;
@@ -0,0 +1,70 @@
+-- Time-series aggregates for the analytics API (app/services/analytics.py).
+-- One function covers every metric: the branches for other metrics are
+-- skipped by a one-time filter, so each call reads a single index range.
+--
+-- Buckets are local wall-clock starts in p_tz. 'session' buckets are academic
+-- sessions that begin on the first of p_session_start_month.
+--
+--   revenue        sum/count of approved payments, by approval time
+--   payments       sum/count of submitted payments (any status), by submission
+--   new_students   student accounts, by creation
+--   registrations  course registrations, by registration
+
+-- Revenue by approval time
+create index if not exists course_payments_approved_reviewed_idx
+    on course_payments (reviewed_at)
+    where status = 'approved';
+
+-- Registrations over time
+create index if not exists course_registrations_registered_idx
+    on course_registrations (registered_at);
+
+create or replace function analytics_series(
+    p_metric text,
+    p_granularity text,
+    p_start timestamptz,
+    p_end timestamptz,
+    p_tz text default 'UTC',
+    p_session_start_month int default 9
+)
+returns table (bucket timestamp, total numeric, events bigint)
+language sql
+stable
+as $$
+    with events as (
+        select reviewed_at as at, amount_paid as amount
+        from course_payments
+        where p_metric = 'revenue' and status = 'approved'
+          and reviewed_at >= p_start and reviewed_at < p_end
+        union all
+        select created_at, amount_paid
+        from course_payments
+        where p_metric = 'payments'
+          and created_at >= p_start and created_at < p_end
+        union all
+        select created_at, null
+        from users
+        where p_metric = 'new_students' and role = 'student'
+          and created_at >= p_start and created_at < p_end
+        union all
+        select registered_at, null
+        from course_registrations
+        where p_metric = 'registrations'
+          and registered_at >= p_start and registered_at < p_end
+    ),
+    local_events as (
+        select at at time zone p_tz as at, amount from events
+    )
+    select
+        case
+            when p_granularity = 'session' then
+                date_trunc('year', at - make_interval(months => p_session_start_month - 1))
+                    + make_interval(months => p_session_start_month - 1)
+            else date_trunc(p_granularity, at)
+        end as bucket,
+        coalesce(sum(amount), 0) as total,
+        count(*) as events
+    from local_events
+    group by 1
+    order by 1;
+$$;
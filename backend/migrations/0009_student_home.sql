@@ -0,0 +1,72 @@
+-- Student home screen in one round-trip: profile, payment counts by status,
+-- registration count, recent results and announcements (with an unread
+-- count), built by the database as a single jsonb document. Replaces the
+-- user lookup plus four count/list queries of GET /api/student/dashboard and
+-- the separate announcements call.
+
+-- Announcements created after this are unread for the student
+alter table users add column if not exists announcements_seen_at timestamptz;
+
+create or replace function student_home(
+    p_student_id uuid,
+    p_results_limit int default 5,
+    p_announcements_limit int default 5
+)
+returns jsonb
+language sql
+stable
+as $$
+    select jsonb_build_object(
+        'profile', (
+            select to_jsonb(p) from (
+                select u.id, u.reg_no, u.email, u.full_name, u.department, u.phone, u.address,
+                       u.role, u.status, u.profile_picture_url, u.created_by, u.created_at
+            ) p
+        ),
+        'payments', (
+            select coalesce(jsonb_object_agg(s.status, s.n), '{}'::jsonb)
+            from (
+                select cp.status, count(*) as n
+                from course_payments cp
+                where cp.student_id = u.id
+                group by cp.status
+            ) s
+        ),
+        'registered_courses', (
+            select count(*) from course_registrations cr where cr.student_id = u.id
+        ),
+        'recent_results', (
+            select coalesce(jsonb_agg(r order by r.uploaded_at desc), '[]'::jsonb)
+            from (
+                select res.id, res.course_id, res.session, res.semester, res.score, res.grade, res.uploaded_at,
+                       jsonb_build_object('course_code', c.course_code, 'title', c.title) as courses
+                from results res
+                left join courses c on c.id = res.course_id
+                where res.student_id = u.id
+                order by res.uploaded_at desc
+                limit p_results_limit
+            ) r
+        ),
+        'announcements', jsonb_build_object(
+            'unread', (
+                select count(*)
+                from announcements a
+                where (a.target_department = u.department or a.target_department is null)
+                  and a.created_at > coalesce(u.announcements_seen_at, '-infinity')
+            ),
+            'latest', (
+                select coalesce(jsonb_agg(l order by l.created_at desc), '[]'::jsonb)
+                from (
+                    select a.id, a.title, a.content, a.target_department, a.created_at,
+                           a.created_at > coalesce(u.announcements_seen_at, '-infinity') as unread
+                    from announcements a
+                    where a.target_department = u.department or a.target_department is null
+                    order by a.created_at desc
+                    limit p_announcements_limit
+                ) l
+            )
+        )
+    )
+    from users u
+    where u.id = p_student_id;
+$$;
@@ -0,0 +1,101 @@
+-- Append-only audit trail of admin actions (app/services/audit.py). The API
+-- buffers events in memory and writes them in batches through
+-- audit_log_append(), which creates the month's partition on first use.
+--
+-- Rows cannot be updated or deleted. Retention is handled by detaching or
+-- dropping whole monthly partitions (audit_log_yYYYYmMM), which the row
+-- triggers do not block.
+
+create table if not exists audit_log (
+    id bigint generated always as identity,
+    created_at timestamptz not null,
+    actor_id uuid,
+    action text not null,
+    target_type text,
+    target_id text,
+    details jsonb not null default '{}'::jsonb,
+    primary key (created_at, id)
+) partition by range (created_at);
+
+-- Admin queries: newest first, optionally narrowed to an actor, an action or a target
+create index if not exists audit_log_actor_idx on audit_log (actor_id, created_at desc, id desc);
+create index if not exists audit_log_action_idx on audit_log (action, created_at desc, id desc);
+create index if not exists audit_log_target_idx on audit_log (target_type, target_id, created_at desc, id desc);
+
+-- Partition for the UTC month containing p_month
+create or replace function audit_log_ensure_partition(p_month date)
+returns void
+language plpgsql
+as $$
+declare
+    v_start date := date_trunc('month', p_month)::date;
+    v_name text := format('audit_log_y%sm%s', to_char(v_start, 'YYYY'), to_char(v_start, 'MM'));
+begin
+    if to_regclass(v_name) is not null then
+        return;
+    end if;
+    execute format(
+        'create table %I partition of audit_log for values from (%L) to (%L)',
+        v_name,
+        v_start::timestamp at time zone 'UTC',
+        (v_start + interval '1 month')::timestamp at time zone 'UTC'
+    );
+exception when duplicate_table then
+    -- Another worker created it first
+    null;
+end;
+$$;
+
+-- Insert a batch of events ([{created_at, actor_id, action, target_type,
+-- target_id, details}, ...]) in one statement; returns the number written
+create or replace function audit_log_append(p_events jsonb)
+returns integer
+language plpgsql
+as $$
+declare
+    v_month date;
+    v_count integer;
+begin
+    for v_month in
+        select distinct date_trunc('month', (e->>'created_at')::timestamptz at time zone 'UTC')::date
+        from jsonb_array_elements(p_events) e
+    loop
+        perform audit_log_ensure_partition(v_month);
+    end loop;
+
+    insert into audit_log (created_at, actor_id, action, target_type, target_id, details)
+    select (e->>'created_at')::timestamptz,
+           (e->>'actor_id')::uuid,
+           e->>'action',
+           e->>'target_type',
+           e->>'target_id',
+           coalesce(e->'details', '{}'::jsonb)
+    from jsonb_array_elements(p_events) e;
+
+    get diagnostics v_count = row_count;
+    return v_count;
+end;
+$$;
+
+create or replace function audit_log_immutable()
+returns trigger
+language plpgsql
+as $$
+begin
+    raise exception 'audit_log is append-only';
+end;
+$$;
+
+drop trigger if exists audit_log_no_update on audit_log;
+create trigger audit_log_no_update
+    before update or delete on audit_log
+    for each row execute function audit_log_immutable();
+
+drop trigger if exists audit_log_no_truncate on audit_log;
+create trigger audit_log_no_truncate
+    before truncate on audit_log
+    for each statement execute function audit_log_immutable();
+
+-- This month and the next are ready before the first write
+select audit_log_ensure_partition(current_date);
+select audit_log_ensure_partition((current_date + interval '1 month')::date);
@@ -0,0 +1,253 @@
+-- Session archive for payments and results. Closed academic sessions are
+-- moved out of the hot tables by archive_session(), run by
+-- `python -m app.archive` (see app/archive.py); the API reads the current
+-- session by default and goes to the archive tables only when a request
+-- names an archived session (app/services/sessions.py).
+--
+-- The archive tables keep the hot tables' ids, and their foreign keys are
+-- named like the hot tables' (course_payments_archive_student_id_fkey, ...),
+-- so the API's embeds work on either. restore_session() moves a session back.
+
+-- ---------- session on payments ----------
+
+-- A payment's session is its course's; stored on the row so lists can be
+-- narrowed to a session without joining courses
+alter table course_payments add column if not exists session text;
+
+create or replace function course_payments_set_session()
+returns trigger
+language plpgsql
+as $$
+begin
+    select c.session into new.session from courses c where c.id = new.course_id;
+    return new;
+end;
+$$;
+
+drop trigger if exists course_payments_set_session on course_payments;
+create trigger course_payments_set_session
+    before insert or update of course_id on course_payments
+    for each row execute function course_payments_set_session();
+
+update course_payments p
+set session = c.session
+from courses c
+where c.id = p.course_id
+  and p.session is distinct from c.session;
+
+-- Admin list (optionally by status) and student history within a session
+create index if not exists course_payments_session_created_idx
+    on course_payments (session, created_at desc);
+create index if not exists course_payments_session_status_created_idx
+    on course_payments (session, status, created_at desc);
+create index if not exists course_payments_student_session_created_idx
+    on course_payments (student_id, session, created_at desc);
+
+-- ---------- archive tables ----------
+
+create table if not exists course_payments_archive (
+    id bigint primary key,
+    student_id uuid not null,
+    course_id bigint not null,
+    amount_paid numeric not null,
+    receipt_url text,
+    status text not null,
+    rejection_reason text,
+    reviewed_by uuid,
+    reviewed_at timestamptz,
+    created_at timestamptz not null,
+    session text not null,
+    archived_at timestamptz not null default now(),
+    constraint course_payments_archive_student_id_fkey foreign key (student_id) references users (id) on delete cascade,
+    constraint course_payments_archive_course_id_fkey foreign key (course_id) references courses (id) on delete cascade,
+    constraint course_payments_archive_reviewed_by_fkey foreign key (reviewed_by) references users (id)
+);
+
+create index if not exists course_payments_archive_session_created_idx
+    on course_payments_archive (session, created_at desc);
+create index if not exists course_payments_archive_student_session_created_idx
+    on course_payments_archive (student_id, session, created_at desc);
+-- Analytics over archived sessions (analytics_series below)
+create index if not exists course_payments_archive_approved_reviewed_idx
+    on course_payments_archive (reviewed_at)
+    where status = 'approved';
+create index if not exists course_payments_archive_created_idx
+    on course_payments_archive (created_at);
+
+create table if not exists results_archive (
+    id bigint primary key,
+    student_id uuid not null,
+    course_id bigint not null,
+    session text not null,
+    semester text,
+    score numeric,
+    grade text,
+    uploaded_at timestamptz not null,
+    archived_at timestamptz not null default now(),
+    constraint results_archive_student_id_fkey foreign key (student_id) references users (id) on delete cascade,
+    constraint results_archive_course_id_fkey foreign key (course_id) references courses (id) on delete cascade
+);
+
+create index if not exists results_archive_student_session_semester_idx
+    on results_archive (student_id, session, semester);
+create index if not exists results_archive_session_semester_idx
+    on results_archive (session, semester);
+
+create table if not exists archived_sessions (
+    session text primary key,
+    archived_at timestamptz not null default now(),
+    payments bigint not null default 0,
+    results bigint not null default 0
+);
+
+-- ---------- rollover ----------
+
+-- Move one session's payments and results to the archive in a single
+-- transaction. Refuses while the session still has pending payments, since
+-- those can only be reviewed in the hot table. Safe to re-run: later rows of
+-- an archived session are moved and added to the counts.
+create or replace function archive_session(p_session text)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_pending bigint;
+    v_payments bigint;
+    v_results bigint;
+begin
+    select count(*) into v_pending
+    from course_payments
+    where session = p_session and status = 'pending';
+    if v_pending > 0 then
+        return jsonb_build_object('session', p_session, 'status', 'pending_payments', 'pending', v_pending);
+    end if;
+
+    with moved as (
+        delete from course_payments where session = p_session
+        returning id, student_id, course_id, amount_paid, receipt_url, status, rejection_reason,
+                  reviewed_by, reviewed_at, created_at, session
+    )
+    insert into course_payments_archive (
+        id, student_id, course_id, amount_paid, receipt_url, status, rejection_reason,
+        reviewed_by, reviewed_at, created_at, session
+    )
+    select * from moved;
+    get diagnostics v_payments = row_count;
+
+    with moved as (
+        delete from results where session = p_session
+        returning id, student_id, course_id, session, semester, score, grade, uploaded_at
+    )
+    insert into results_archive (id, student_id, course_id, session, semester, score, grade, uploaded_at)
+    select * from moved;
+    get diagnostics v_results = row_count;
+
+    insert into archived_sessions (session, payments, results)
+    values (p_session, v_payments, v_results)
+    on conflict (session) do update
+    set payments = archived_sessions.payments + excluded.payments,
+        results = archived_sessions.results + excluded.results,
+        archived_at = now();
+
+    return jsonb_build_object('session', p_session, 'status', 'archived', 'payments', v_payments, 'results', v_results);
+end;
+$$;
+
+-- Undo archive_session(): move the session's rows back into the hot tables
+create or replace function restore_session(p_session text)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_payments bigint;
+    v_results bigint;
+begin
+    with moved as (
+        delete from course_payments_archive where session = p_session
+        returning id, student_id, course_id, amount_paid, receipt_url, status, rejection_reason,
+                  reviewed_by, reviewed_at, created_at
+    )
+    insert into course_payments (
+        id, student_id, course_id, amount_paid, receipt_url, status, rejection_reason,
+        reviewed_by, reviewed_at, created_at
+    )
+    select * from moved;
+    get diagnostics v_payments = row_count;
+
+    with moved as (
+        delete from results_archive where session = p_session
+        returning id, student_id, course_id, session, semester, score, grade, uploaded_at
+    )
+    insert into results (id, student_id, course_id, session, semester, score, grade, uploaded_at)
+    select * from moved;
+    get diagnostics v_results = row_count;
+
+    delete from archived_sessions where session = p_session;
+
+    return jsonb_build_object('session', p_session, 'status', 'restored', 'payments', v_payments, 'results', v_results);
+end;
+$$;
+
+-- ---------- analytics ----------
+
+-- analytics_series (0008) also reads the archive, so moving a session does
+-- not change any total
+create or replace function analytics_series(
+    p_metric text,
+    p_granularity text,
+    p_start timestamptz,
+    p_end timestamptz,
+    p_tz text default 'UTC',
+    p_session_start_month int default 9
+)
+returns table (bucket timestamp, total numeric, events bigint)
+language sql
+stable
+as $$
+    with events as (
+        select reviewed_at as at, amount_paid as amount
+        from course_payments
+        where p_metric = 'revenue' and status = 'approved'
+          and reviewed_at >= p_start and reviewed_at < p_end
+        union all
+        select reviewed_at, amount_paid
+        from course_payments_archive
+        where p_metric = 'revenue' and status = 'approved'
+          and reviewed_at >= p_start and reviewed_at < p_end
+        union all
+        select created_at, amount_paid
+        from course_payments
+        where p_metric = 'payments'
+          and created_at >= p_start and created_at < p_end
+        union all
+        select created_at, amount_paid
+        from course_payments_archive
+        where p_metric = 'payments'
+          and created_at >= p_start and created_at < p_end
+        union all
+        select created_at, null
+        from users
+        where p_metric = 'new_students' and role = 'student'
+          and created_at >= p_start and created_at < p_end
+        union all
+        select registered_at, null
+        from course_registrations
+        where p_metric = 'registrations'
+          and registered_at >= p_start and registered_at < p_end
+    ),
+    local_events as (
+        select at at time zone p_tz as at, amount from events
+    )
+    select
+        case
+            when p_granularity = 'session' then
+                date_trunc('year', at - make_interval(months => p_session_start_month - 1))
+                    + make_interval(months => p_session_start_month - 1)
+            else date_trunc(p_granularity, at)
+        end as bucket,
+        coalesce(sum(amount), 0) as total,
+        count(*) as events
+    from local_events
+    group by 1
+    order by 1;
+$$;
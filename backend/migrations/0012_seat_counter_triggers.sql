@@ -0,0 +1,131 @@
+-- Keep courses.enrolled_count and users.registered_courses_count (0001) in
+-- step with course_registrations whatever removes or adds a row: the seat
+-- RPCs, a course or user delete cascading into its registrations, or a fix
+-- made by hand. The counters used to be bumped inside
+-- register_student_for_course and release_course_seat only, so any other
+-- path left them wrong.
+--
+-- The triggers are per statement and apply one grouped update per course and
+-- per student, so deleting a course with hundreds of registrations costs two
+-- updates rather than hundreds.
+
+create or replace function course_registrations_sync_counts()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op in ('DELETE', 'UPDATE') then
+        update courses c
+        set enrolled_count = greatest(c.enrolled_count - d.n, 0)
+        from (select course_id, count(*) as n from old_rows group by course_id) d
+        where c.id = d.course_id;
+
+        update users u
+        set registered_courses_count = greatest(u.registered_courses_count - d.n, 0)
+        from (select student_id, count(*) as n from old_rows group by student_id) d
+        where u.id = d.student_id;
+    end if;
+
+    if tg_op in ('INSERT', 'UPDATE') then
+        update courses c
+        set enrolled_count = c.enrolled_count + d.n
+        from (select course_id, count(*) as n from new_rows group by course_id) d
+        where c.id = d.course_id;
+
+        update users u
+        set registered_courses_count = u.registered_courses_count + d.n
+        from (select student_id, count(*) as n from new_rows group by student_id) d
+        where u.id = d.student_id;
+    end if;
+
+    return null;
+end;
+$$;
+
+drop trigger if exists course_registrations_count_insert on course_registrations;
+create trigger course_registrations_count_insert
+    after insert on course_registrations
+    referencing new table as new_rows
+    for each statement execute function course_registrations_sync_counts();
+
+drop trigger if exists course_registrations_count_delete on course_registrations;
+create trigger course_registrations_count_delete
+    after delete on course_registrations
+    referencing old table as old_rows
+    for each statement execute function course_registrations_sync_counts();
+
+drop trigger if exists course_registrations_count_update on course_registrations;
+create trigger course_registrations_count_update
+    after update on course_registrations
+    referencing old table as old_rows new table as new_rows
+    for each statement execute function course_registrations_sync_counts();
+
+-- The seat RPCs keep their locking and capacity check; the triggers now do
+-- the counting.
+create or replace function register_student_for_course(p_student_id uuid, p_course_id bigint)
+returns text
+language plpgsql
+as $$
+declare
+    v_capacity integer;
+    v_enrolled integer;
+begin
+    -- Row lock on the course serialises concurrent reservations for it
+    select capacity, enrolled_count into v_capacity, v_enrolled
+    from courses where id = p_course_id
+    for update;
+
+    if not found then
+        return 'course_not_found';
+    end if;
+
+    if exists (
+        select 1 from course_registrations
+        where student_id = p_student_id and course_id = p_course_id
+    ) then
+        return 'already_registered';
+    end if;
+
+    if v_capacity is not null and v_enrolled >= v_capacity then
+        return 'full';
+    end if;
+
+    insert into course_registrations (student_id, course_id, registered_at)
+    values (p_student_id, p_course_id, now());
+
+    return 'registered';
+end;
+$$;
+
+create or replace function release_course_seat(p_student_id uuid, p_course_id bigint)
+returns boolean
+language plpgsql
+as $$
+begin
+    perform 1 from courses where id = p_course_id for update;
+
+    delete from course_registrations
+    where student_id = p_student_id and course_id = p_course_id;
+
+    return found;
+end;
+$$;
+
+-- Correct any drift left by the paths the old functions missed
+update courses c
+set enrolled_count = r.n
+from (
+    select c2.id, count(r2.course_id) as n
+    from courses c2 left join course_registrations r2 on r2.course_id = c2.id
+    group by c2.id
+) r
+where c.id = r.id and c.enrolled_count <> r.n;
+
+update users u
+set registered_courses_count = r.n
+from (
+    select u2.id, count(r2.student_id) as n
+    from users u2 left join course_registrations r2 on r2.student_id = u2.id
+    group by u2.id
+) r
+where u.id = r.id and u.registered_courses_count <> r.n;
@@ -0,0 +1,33 @@
+-- Shared version counters for the API's per-process caches
+-- (app/services/cache_versions.py). Triggers bump a counter whenever the rows
+-- behind a cache change, through the API or otherwise; every worker re-reads
+-- the counters every few seconds and drops a cache whose counter moved.
+
+create table if not exists cache_versions (
+    name text primary key,
+    version bigint not null default 0,
+    updated_at timestamptz not null default now()
+);
+
+-- Statement trigger: bump the counter named by the trigger's argument
+create or replace function bump_cache_version()
+returns trigger
+language plpgsql
+as $$
+begin
+    insert into cache_versions (name, version)
+    values (tg_argv[0], 1)
+    on conflict (name) do update
+    set version = cache_versions.version + 1,
+        updated_at = now();
+    return null;
+end;
+$$;
+
+insert into cache_versions (name) values ('results') on conflict (name) do nothing;
+
+-- Per-student results cache (app/services/results_cache.py)
+drop trigger if exists results_cache_version on results;
+create trigger results_cache_version
+    after insert or update or delete or truncate on results
+    for each statement execute function bump_cache_version('results');
@@ -0,0 +1,7 @@
+-- PDF renders run on the job queue (app/services/documents.py). Status
+-- requests look up the newest render job for a document by the ids in its
+-- payload; this keeps that lookup off a scan of the whole jobs table.
+
+create index if not exists jobs_document_render_idx
+    on jobs ((payload->>'document_id'), (payload->>'student_id'), id desc)
+    where kind = 'document.render';
@@ -0,0 +1,12 @@
+-- Shared version for the per-student registration cache
+-- (app/services/registration_cache.py; counters from 0013). Only removals
+-- and changes bump it: a registration added elsewhere is already picked up by
+-- the reload a cache miss triggers, and bumping on every insert would drop
+-- every worker's cache for each seat reserved during registration week.
+
+insert into cache_versions (name) values ('registrations') on conflict (name) do nothing;
+
+drop trigger if exists course_registrations_cache_version on course_registrations;
+create trigger course_registrations_cache_version
+    after update or delete or truncate on course_registrations
+    for each statement execute function bump_cache_version('registrations');
@@ -0,0 +1,32 @@
+-- claim_jobs() can be limited to some job kinds. The cron drain
+-- (app/routers/jobs.py) runs in a time-boxed serverless function and only
+-- claims the kinds that finish or pause within it; the rest wait for
+-- `python -m app.worker`. p_kinds null claims every kind, as before.
+
+drop function if exists claim_jobs(text, integer, integer);
+
+create or replace function claim_jobs(
+    p_worker text,
+    p_limit integer,
+    p_lease_seconds integer,
+    p_kinds text[] default null
+)
+returns setof jobs
+language sql
+as $$
+    update jobs
+    set status = 'running',
+        locked_at = now(),
+        locked_by = p_worker,
+        attempts = attempts + 1
+    where id in (
+        select id from jobs
+        where ((status = 'queued' and run_at <= now())
+               or (status = 'running' and locked_at < now() - make_interval(secs => p_lease_seconds)))
+          and (p_kinds is null or kind = any(p_kinds))
+        order by run_at
+        limit p_limit
+        for update skip locked
+    )
+    returning *;
+$$;
@@ -0,0 +1,70 @@
+-- student_home (0009) counted payments in course_payments only, so archiving
+-- a session (0011) made a student's approved and pending counts drop. The
+-- counts now cover the archive too; everything else is unchanged.
+
+create or replace function student_home(
+    p_student_id uuid,
+    p_results_limit int default 5,
+    p_announcements_limit int default 5
+)
+returns jsonb
+language sql
+stable
+as $$
+    select jsonb_build_object(
+        'profile', (
+            select to_jsonb(p) from (
+                select u.id, u.reg_no, u.email, u.full_name, u.department, u.phone, u.address,
+                       u.role, u.status, u.profile_picture_url, u.created_by, u.created_at
+            ) p
+        ),
+        'payments', (
+            select coalesce(jsonb_object_agg(s.status, s.n), '{}'::jsonb)
+            from (
+                select all_payments.status, count(*) as n
+                from (
+                    select cp.status::text as status from course_payments cp where cp.student_id = u.id
+                    union all
+                    select ca.status::text from course_payments_archive ca where ca.student_id = u.id
+                ) all_payments
+                group by all_payments.status
+            ) s
+        ),
+        'registered_courses', (
+            select count(*) from course_registrations cr where cr.student_id = u.id
+        ),
+        'recent_results', (
+            select coalesce(jsonb_agg(r order by r.uploaded_at desc), '[]'::jsonb)
+            from (
+                select res.id, res.course_id, res.session, res.semester, res.score, res.grade, res.uploaded_at,
+                       jsonb_build_object('course_code', c.course_code, 'title', c.title) as courses
+                from results res
+                left join courses c on c.id = res.course_id
+                where res.student_id = u.id
+                order by res.uploaded_at desc
+                limit p_results_limit
+            ) r
+        ),
+        'announcements', jsonb_build_object(
+            'unread', (
+                select count(*)
+                from announcements a
+                where (a.target_department = u.department or a.target_department is null)
+                  and a.created_at > coalesce(u.announcements_seen_at, '-infinity')
+            ),
+            'latest', (
+                select coalesce(jsonb_agg(l order by l.created_at desc), '[]'::jsonb)
+                from (
+                    select a.id, a.title, a.content, a.target_department, a.created_at,
+                           a.created_at > coalesce(u.announcements_seen_at, '-infinity') as unread
+                    from announcements a
+                    where a.target_department = u.department or a.target_department is null
+                    order by a.created_at desc
+                    limit p_announcements_limit
+                ) l
+            )
+        )
+    )
+    from users u
+    where u.id = p_student_id;
+$$;
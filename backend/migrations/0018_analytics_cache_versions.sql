@@ -0,0 +1,177 @@
+-- Shared versions for the closed-period analytics cache
+-- (app/services/analytics.py; counters from 0013). A closed bucket is one
+-- that ended more than 10 minutes ago (SETTLE_TIME); the API caches it for
+-- good. Any change that lands in a closed bucket bumps the counter of the
+-- table it came from, and every worker drops that table's metrics:
+--   analytics.payments       revenue and payments (course_payments)
+--   analytics.registrations  registrations (course_registrations)
+--   analytics.users          new students (users)
+-- Ordinary traffic (new payments, approvals, registrations, sign-ups, profile
+-- edits) only touches the open period and bumps nothing, so the cache keeps
+-- its hit rate. Archiving a session (0011) bumps analytics.payments once.
+
+insert into cache_versions (name) values
+    ('analytics.payments'), ('analytics.registrations'), ('analytics.users')
+on conflict (name) do nothing;
+
+create or replace function increment_cache_version(p_name text)
+returns void
+language sql
+as $$
+    insert into cache_versions (name, version)
+    values (p_name, 1)
+    on conflict (name) do update
+    set version = cache_versions.version + 1,
+        updated_at = now();
+$$;
+
+-- ---------- course_payments ----------
+
+create or replace function course_payments_analytics_version()
+returns trigger
+language plpgsql
+as $$
+declare
+    v_settled timestamptz := now() - interval '10 minutes';
+begin
+    if tg_op = 'INSERT' then
+        perform 1 from new_rows where least(created_at, reviewed_at) < v_settled limit 1;
+    elsif tg_op = 'DELETE' then
+        perform 1 from old_rows where least(created_at, reviewed_at) < v_settled limit 1;
+    else
+        perform 1
+        from old_rows o join new_rows n on n.id = o.id
+        where (o.status, o.amount_paid, o.created_at, o.reviewed_at)
+                  is distinct from (n.status, n.amount_paid, n.created_at, n.reviewed_at)
+          and least(o.created_at, o.reviewed_at, n.created_at, n.reviewed_at) < v_settled
+        limit 1;
+    end if;
+    if found then
+        perform increment_cache_version('analytics.payments');
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists course_payments_analytics_insert on course_payments;
+create trigger course_payments_analytics_insert
+    after insert on course_payments
+    referencing new table as new_rows
+    for each statement execute function course_payments_analytics_version();
+
+drop trigger if exists course_payments_analytics_delete on course_payments;
+create trigger course_payments_analytics_delete
+    after delete on course_payments
+    referencing old table as old_rows
+    for each statement execute function course_payments_analytics_version();
+
+drop trigger if exists course_payments_analytics_update on course_payments;
+create trigger course_payments_analytics_update
+    after update on course_payments
+    referencing old table as old_rows new table as new_rows
+    for each statement execute function course_payments_analytics_version();
+
+drop trigger if exists course_payments_analytics_truncate on course_payments;
+create trigger course_payments_analytics_truncate
+    after truncate on course_payments
+    for each statement execute function bump_cache_version('analytics.payments');
+
+-- ---------- course_registrations ----------
+
+create or replace function course_registrations_analytics_version()
+returns trigger
+language plpgsql
+as $$
+declare
+    v_settled timestamptz := now() - interval '10 minutes';
+begin
+    if tg_op = 'INSERT' then
+        perform 1 from new_rows where registered_at < v_settled limit 1;
+    elsif tg_op = 'DELETE' then
+        perform 1 from old_rows where registered_at < v_settled limit 1;
+    else
+        perform 1
+        from old_rows o join new_rows n on n.id = o.id
+        where o.registered_at is distinct from n.registered_at
+          and least(o.registered_at, n.registered_at) < v_settled
+        limit 1;
+    end if;
+    if found then
+        perform increment_cache_version('analytics.registrations');
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists course_registrations_analytics_insert on course_registrations;
+create trigger course_registrations_analytics_insert
+    after insert on course_registrations
+    referencing new table as new_rows
+    for each statement execute function course_registrations_analytics_version();
+
+drop trigger if exists course_registrations_analytics_delete on course_registrations;
+create trigger course_registrations_analytics_delete
+    after delete on course_registrations
+    referencing old table as old_rows
+    for each statement execute function course_registrations_analytics_version();
+
+drop trigger if exists course_registrations_analytics_update on course_registrations;
+create trigger course_registrations_analytics_update
+    after update on course_registrations
+    referencing old table as old_rows new table as new_rows
+    for each statement execute function course_registrations_analytics_version();
+
+drop trigger if exists course_registrations_analytics_truncate on course_registrations;
+create trigger course_registrations_analytics_truncate
+    after truncate on course_registrations
+    for each statement execute function bump_cache_version('analytics.registrations');
+
+-- ---------- users ----------
+
+create or replace function users_analytics_version()
+returns trigger
+language plpgsql
+as $$
+declare
+    v_settled timestamptz := now() - interval '10 minutes';
+begin
+    if tg_op = 'INSERT' then
+        perform 1 from new_rows where role::text = 'student' and created_at < v_settled limit 1;
+    elsif tg_op = 'DELETE' then
+        perform 1 from old_rows where role::text = 'student' and created_at < v_settled limit 1;
+    else
+        perform 1
+        from old_rows o join new_rows n on n.id = o.id
+        where (o.role, o.created_at) is distinct from (n.role, n.created_at)
+          and least(o.created_at, n.created_at) < v_settled
+        limit 1;
+    end if;
+    if found then
+        perform increment_cache_version('analytics.users');
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists users_analytics_insert on users;
+create trigger users_analytics_insert
+    after insert on users
+    referencing new table as new_rows
+    for each statement execute function users_analytics_version();
+
+drop trigger if exists users_analytics_delete on users;
+create trigger users_analytics_delete
+    after delete on users
+    referencing old table as old_rows
+    for each statement execute function users_analytics_version();
+
+drop trigger if exists users_analytics_update on users;
+create trigger users_analytics_update
+    after update on users
+    referencing old table as old_rows new table as new_rows
+    for each statement execute function users_analytics_version();
+
+drop trigger if exists users_analytics_truncate on users;
+create trigger users_analytics_truncate
+    after truncate on users
+    for each statement execute function bump_cache_version('analytics.users');
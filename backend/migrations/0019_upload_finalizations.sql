@@ -0,0 +1,42 @@
+-- Direct uploads can be finalized once (app/core/uploads.py). Each upload
+-- ticket names its own public id; finalizing records it here, and a second
+-- finalize of the same ticket (a replay, or a double submit) is refused, so
+-- one uploaded receipt cannot back several payment rows.
+--
+-- Rows are only needed while their ticket is still valid: once the token has
+-- expired it is rejected before this table is consulted, so expired rows are
+-- purged as new uploads are claimed.
+
+create table if not exists upload_finalizations (
+    public_id text primary key,
+    user_id uuid not null,
+    purpose text not null,
+    expires_at timestamptz not null,
+    finalized_at timestamptz not null default now()
+);
+
+create index if not exists upload_finalizations_expires_idx on upload_finalizations (expires_at);
+
+-- True if this call recorded the upload, false if it was already finalized
+create or replace function claim_upload(
+    p_public_id text,
+    p_user_id uuid,
+    p_purpose text,
+    p_expires_at timestamptz
+)
+returns boolean
+language plpgsql
+as $$
+declare
+    claimed boolean;
+begin
+    delete from upload_finalizations where expires_at < now();
+
+    insert into upload_finalizations (public_id, user_id, purpose, expires_at)
+    values (p_public_id, p_user_id, p_purpose, p_expires_at)
+    on conflict (public_id) do nothing
+    returning true into claimed;
+
+    return coalesce(claimed, false);
+end;
+$$;